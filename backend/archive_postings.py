@@ -0,0 +1,70 @@
+"""Move long-inactive postings out of the hot collections.
+
+Usage (from ``backend/``, e.g. nightly from cron)::
+
+    python archive_postings.py --dry-run
+    python archive_postings.py --days 90 --batch-size 500
+
+A job or project whose status is no longer ``active`` and that has not been
+updated for ``--days`` (default ``ARCHIVE_AFTER_DAYS``) is copied to
+``jobs_archive`` / ``projects_archive`` and then deleted from the live
+collection. The copy is an upsert and the delete re-checks the filter, so a
+posting reactivated mid-run stays live and re-running is safe. Its submission
+counts move with it; the applications/proposals are left in place.
+"""
+import argparse
+import asyncio
+import sys
+from datetime import datetime, timedelta, timezone
+
+from pymongo import ReplaceOne
+
+from server import ARCHIVE_AFTER_DAYS, client, db, ensure_indexes
+
+ARCHIVES = {"jobs": "jobs_archive", "projects": "projects_archive"}
+
+
+def inactive_filter(cutoff: datetime) -> dict:
+    return {"status": {"$ne": "active"}, "updated_at": {"$lt": cutoff}}
+
+
+async def archive_collection(database, name: str, cutoff: datetime, batch_size: int) -> int:
+    source, target = database[name], database[ARCHIVES[name]]
+    query = inactive_filter(cutoff)
+    moved = 0
+    while True:
+        batch = await source.find(query).sort("updated_at", 1).limit(batch_size).to_list(batch_size)
+        if not batch:
+            return moved
+        ids = [doc["id"] for doc in batch]
+        await target.bulk_write([ReplaceOne({"id": doc["id"]}, doc, upsert=True) for doc in batch], ordered=False)
+        result = await source.delete_many({**query, "id": {"$in": ids}})
+        moved += result.deleted_count
+
+
+async def archive(database, days: float, batch_size: int, dry_run: bool):
+    cutoff = datetime.now(timezone.utc) - timedelta(days=days)
+    if not dry_run:
+        await ensure_indexes(database)
+    for name in ARCHIVES:
+        if dry_run:
+            count = await database[name].count_documents(inactive_filter(cutoff))
+            print(f"{name:<10} {count} posting(s) inactive since before {cutoff:%Y-%m-%d}")
+        else:
+            moved = await archive_collection(database, name, cutoff, batch_size)
+            print(f"{name:<10} moved {moved} posting(s) to {ARCHIVES[name]}")
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--days", type=float, default=ARCHIVE_AFTER_DAYS)
+    parser.add_argument("--batch-size", type=int, default=500)
+    parser.add_argument("--dry-run", action="store_true")
+    args = parser.parse_args()
+    asyncio.run(archive(db, args.days, args.batch_size, args.dry_run))
+    client.close()
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
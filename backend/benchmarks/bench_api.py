@@ -0,0 +1,386 @@
+"""Reproducible load and latency benchmark for the API.
+
+Seeds a database with a configurable volume of users, jobs, projects,
+applications and notifications, then drives a weighted mix of routes through
+the ASGI app with N concurrent clients and reports throughput and p50/p95/p99
+per route. Run from ``backend/``::
+
+    python benchmarks/bench_api.py --requests 5000 --concurrency 32
+    python benchmarks/bench_api.py --write-baseline benchmarks/baseline.json
+    python benchmarks/bench_api.py --baseline benchmarks/baseline.json
+
+By default the data lives in the in-memory stand-in from ``fake_mongo`` so the
+numbers measure the application's own overhead; pass ``--mongo-url`` to run
+against a real (throwaway) database instead. With ``--baseline`` the run exits
+non-zero when a route's p95 or the overall throughput regresses by more than
+``--tolerance``.
+"""
+import argparse
+import asyncio
+import json
+import math
+import os
+import random
+import sys
+import time
+from collections import defaultdict
+from datetime import datetime, timedelta, timezone
+from pathlib import Path
+from urllib.parse import urlencode
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+os.environ.setdefault("MONGO_URL", "mongodb://localhost:27017")
+os.environ.setdefault("DB_NAME", "wallxy_bench")
+os.environ.setdefault("SLOW_REQUEST_MS", "60000")
+
+import orjson  # noqa: E402
+
+import server  # noqa: E402
+from fake_mongo import FakeDatabase  # noqa: E402
+
+PASSWORD = "bench-password"
+CATEGORIES = ["Architecture", "Interior Design", "Civil Engineering", "MEP", "BIM", "Landscape"]
+JOB_TYPES = ["Full-time", "Part-time", "Contract"]
+LEVELS = ["Entry-level", "Mid-level", "Senior", "Lead"]
+LOCATIONS = ["Mumbai", "Delhi", "Bengaluru", "Pune", "Remote"]
+SKILLS = ["AutoCAD", "Revit", "SketchUp", "Rhino", "3ds Max", "Lumion", "ETABS", "STAAD", "Navisworks"]
+STATUSES = ["pending", "reviewed", "accepted", "rejected"]
+USER_TYPES = ["employer", "client", "jobseeker", "freelancer"]
+
+# route name -> (weight, statuses that count as success). Logins and sign-ups
+# may be shed with 503 by the password-hashing pool, which is by design.
+MIX = {
+    "list_jobs": (25, {200, 304}),
+    "list_jobs_filtered": (6, {200, 304}),
+    "job_facets": (4, {200}),
+    "job_detail": (15, {200}),
+    "list_projects": (10, {200, 304}),
+    "project_detail": (8, {200}),
+    "search": (4, {200}),
+    "apply": (6, {200, 400}),
+    "my_applications": (6, {200}),
+    "notifications": (8, {200}),
+    "unread_count": (8, {200}),
+    "login": (2, {200, 503}),
+    "register": (2, {200, 503}),
+}
+
+
+# ============ ASGI client ============
+
+async def call(app, method, path, token=None, query=None, body=None):
+    headers = [(b"host", b"bench")]
+    payload = b""
+    if body is not None:
+        payload = orjson.dumps(body)
+        headers.append((b"content-type", b"application/json"))
+    if token:
+        headers.append((b"authorization", f"Bearer {token}".encode()))
+    scope = {
+        "type": "http", "asgi": {"version": "3.0"}, "http_version": "1.1", "method": method,
+        "scheme": "http", "path": path, "raw_path": path.encode(), "root_path": "",
+        "query_string": urlencode(query or {}).encode(), "headers": headers,
+        "client": ("127.0.0.1", 0), "server": ("bench", 80),
+    }
+    done = asyncio.Event()
+    received = False
+    status = None
+    chunks = []
+
+    async def receive():
+        nonlocal received
+        if not received:
+            received = True
+            return {"type": "http.request", "body": payload, "more_body": False}
+        await done.wait()
+        return {"type": "http.disconnect"}
+
+    async def send(message):
+        nonlocal status
+        if message["type"] == "http.response.start":
+            status = message["status"]
+        elif message["type"] == "http.response.body":
+            chunks.append(message.get("body", b""))
+            if not message.get("more_body"):
+                done.set()
+
+    await app(scope, receive, send)
+    return status, b"".join(chunks)
+
+
+# ============ Seeding ============
+
+def user_doc(i, user_type, hashed, now):
+    return {
+        "id": f"user-{i}", "email": f"user{i}@wallxy-bench.com", "full_name": f"Bench User {i}",
+        "user_type": user_type, "password": hashed, "skills": random.sample(SKILLS, 3),
+        "experience_level": random.choice(LEVELS), "location": random.choice(LOCATIONS), "hourly_rate": float(random.randint(10, 120)),
+        "created_at": now, "updated_at": now,
+    }
+
+
+async def seed(db, args):
+    now = datetime.now(timezone.utc)
+    hashed = server.hash_password(PASSWORD)
+    users = [user_doc(i, USER_TYPES[i % len(USER_TYPES)], hashed, now - timedelta(days=30)) for i in range(args.users)]
+    by_type = defaultdict(list)
+    for user in users:
+        by_type[user["user_type"]].append(user)
+
+    jobs, projects = [], []
+    for i in range(args.jobs):
+        created = now - timedelta(minutes=i)
+        salary_min = float(random.randint(2, 20) * 100000)
+        jobs.append({
+            "id": f"job-{i}", "employer_id": random.choice(by_type["employer"])["id"],
+            "title": f"{random.choice(SKILLS)} {random.choice(['Architect', 'Designer', 'Engineer'])} {i}",
+            "company_name": f"Studio {i % 97}", "description": "Design coordination and drawings. " * 8,
+            "category": random.choice(CATEGORIES), "job_type": random.choice(JOB_TYPES),
+            "experience_level": random.choice(LEVELS), "salary_min": salary_min,
+            "salary_max": salary_min * 1.5, "location": random.choice(LOCATIONS),
+            "requirements": ["Portfolio"], "skills": random.sample(SKILLS, 3), "status": "active", "views": 0,
+            "applicants_count": 0, "created_at": created, "updated_at": created,
+        })
+    for i in range(args.projects):
+        created = now - timedelta(minutes=i)
+        budget_min = float(random.randint(1, 50) * 1000)
+        projects.append({
+            "id": f"project-{i}", "client_id": random.choice(by_type["client"])["id"],
+            "title": f"{random.choice(SKILLS)} drawings for site {i}", "description": "Scope of work. " * 8,
+            "category": random.choice(CATEGORIES), "budget_type": random.choice(["Fixed", "Hourly"]),
+            "budget_min": budget_min, "budget_max": budget_min * 2, "duration": "1-3 months",
+            "skills": random.sample(SKILLS, 3), "status": "active", "views": 0, "proposals_count": 0,
+            "created_at": created, "updated_at": created,
+        })
+
+    applications, pairs = [], set()
+    seekers = by_type["jobseeker"]
+    while len(applications) < min(args.applications, len(seekers) * len(jobs)):
+        job, seeker = random.choice(jobs), random.choice(seekers)
+        if (job["id"], seeker["id"]) in pairs:
+            continue
+        pairs.add((job["id"], seeker["id"]))
+        created = now - timedelta(seconds=len(applications))
+        job["applicants_count"] += 1
+        applications.append({
+            "id": f"application-{len(applications)}", "job_id": job["id"], "applicant_id": seeker["id"],
+            "employer_id": job["employer_id"],
+            "cover_letter": "I would like to apply.", "status": random.choice(STATUSES),
+            "created_at": created, "updated_at": created,
+        })
+
+    notifications = []
+    for i in range(args.notifications):
+        created = now - timedelta(seconds=i)
+        notifications.append({
+            "id": f"notification-{i}", "user_id": random.choice(users)["id"], "title": "New application",
+            "message": "Someone applied to your posting", "type": "application",
+            "is_read": random.random() < 0.5, "created_at": created,
+        })
+
+    counts = defaultdict(lambda: defaultdict(int))
+    for application in applications:
+        counts[application["job_id"]][application["status"]] += 1
+    for posting in jobs + projects:
+        posting["status_counts"] = dict(counts[posting["id"]])
+        posting["last_activity_at"] = posting["created_at"]
+
+    await server.ensure_indexes(db)
+    for name, docs in (("users", users), ("jobs", jobs), ("projects", projects), ("applications", applications),
+                       ("notifications", notifications)):
+        for start in range(0, len(docs), 1000):
+            await db[name].insert_many(docs[start:start + 1000], ordered=False)
+    await server.build_search_index(db)
+    return users, by_type, jobs, projects
+
+
+# ============ Load ============
+
+class Workload:
+    def __init__(self, app, by_type, jobs, projects):
+        self.app = app
+        self.jobs = jobs
+        self.projects = projects
+        self.seekers = by_type["jobseeker"]
+        self.tokens = {user["id"]: server.create_access_token(server.token_claims(server.User(**user)))
+                       for users in by_type.values() for user in users}
+        self.all_users = [user for users in by_type.values() for user in users]
+        self.registered = 0
+        names = list(MIX)
+        self.names, self.weights = names, [MIX[name][0] for name in names]
+
+    def token(self, user):
+        return self.tokens[user["id"]]
+
+    async def run(self, name):
+        app = self.app
+        if name == "list_jobs":
+            return await call(app, "GET", "/api/jobs")
+        if name == "list_jobs_filtered":
+            return await call(app, "GET", "/api/jobs", query={"category": random.choice(CATEGORIES),
+                                                              "location": random.choice(LOCATIONS),
+                                                              "salary_min": random.randint(2, 20) * 100000})
+        if name == "job_facets":
+            return await call(app, "GET", "/api/jobs/facets")
+        if name == "job_detail":
+            return await call(app, "GET", f"/api/jobs/{random.choice(self.jobs)['id']}")
+        if name == "list_projects":
+            return await call(app, "GET", "/api/projects")
+        if name == "project_detail":
+            return await call(app, "GET", f"/api/projects/{random.choice(self.projects)['id']}")
+        if name == "search":
+            return await call(app, "GET", "/api/search", query={"q": random.choice(SKILLS)})
+        if name == "apply":
+            seeker = random.choice(self.seekers)
+            return await call(app, "POST", "/api/applications", self.token(seeker),
+                              body={"job_id": random.choice(self.jobs)["id"], "cover_letter": "Interested"})
+        if name == "my_applications":
+            return await call(app, "GET", "/api/applications/my", self.token(random.choice(self.seekers)))
+        if name == "notifications":
+            return await call(app, "GET", "/api/notifications", self.token(random.choice(self.all_users)))
+        if name == "unread_count":
+            return await call(app, "GET", "/api/notifications/unread-count", self.token(random.choice(self.all_users)))
+        if name == "login":
+            return await call(app, "POST", "/api/auth/login",
+                              body={"email": random.choice(self.all_users)["email"], "password": PASSWORD})
+        if name == "register":
+            self.registered += 1
+            return await call(app, "POST", "/api/auth/register", body={
+                "email": f"new{self.registered}-{time.time_ns()}@wallxy-bench.com", "password": PASSWORD,
+                "full_name": "New Bench User", "user_type": random.choice(USER_TYPES)})
+        raise ValueError(name)
+
+    async def drive(self, total, concurrency):
+        latencies = defaultdict(list)
+        errors = defaultdict(int)
+        remaining = total
+
+        async def client():
+            nonlocal remaining
+            while remaining > 0:
+                remaining -= 1
+                name = random.choices(self.names, self.weights)[0]
+                start = time.perf_counter()
+                status, body = await self.run(name)
+                latencies[name].append((time.perf_counter() - start) * 1000)
+                if status not in MIX[name][1]:
+                    errors[name] += 1
+                    if errors[name] == 1:
+                        print(f"{name}: unexpected {status} {body[:200]!r}", file=sys.stderr)
+
+        start = time.perf_counter()
+        await asyncio.gather(*(client() for _ in range(concurrency)))
+        return latencies, errors, time.perf_counter() - start
+
+
+# ============ Reporting ============
+
+def percentile(sorted_values, q):
+    return sorted_values[max(0, math.ceil(q * len(sorted_values)) - 1)]
+
+
+def summarize(latencies, errors, elapsed):
+    routes = {}
+    for name in MIX:
+        values = sorted(latencies.get(name, []))
+        if not values:
+            continue
+        routes[name] = {
+            "count": len(values), "errors": errors.get(name, 0), "rps": round(len(values) / elapsed, 1),
+            "p50": round(percentile(values, 0.50), 3), "p95": round(percentile(values, 0.95), 3),
+            "p99": round(percentile(values, 0.99), 3),
+        }
+    total = sum(r["count"] for r in routes.values())
+    return {"elapsed_s": round(elapsed, 3), "total_rps": round(total / elapsed, 1), "routes": routes}
+
+
+def print_report(result):
+    print(f"{'route':<20}{'count':>7}{'errors':>8}{'req/s':>9}{'p50 ms':>10}{'p95 ms':>10}{'p99 ms':>10}")
+    for name, r in result["routes"].items():
+        print(f"{name:<20}{r['count']:>7}{r['errors']:>8}{r['rps']:>9.1f}{r['p50']:>10.3f}{r['p95']:>10.3f}{r['p99']:>10.3f}")
+    print(f"total: {result['total_rps']:.1f} req/s over {result['elapsed_s']:.2f}s")
+
+
+def compare(result, baseline, tolerance, slack_ms):
+    if baseline["config"] != result["config"]:
+        print(f"baseline was recorded with {baseline['config']}, this run used {result['config']}", file=sys.stderr)
+        return ["config mismatch"]
+    failures = []
+    for name, base in baseline["routes"].items():
+        current = result["routes"].get(name)
+        if current is None:
+            continue
+        limit = base["p95"] * (1 + tolerance) + slack_ms
+        if current["p95"] > limit:
+            failures.append(f"{name}: p95 {current['p95']:.3f}ms > {limit:.3f}ms (baseline {base['p95']:.3f}ms)")
+    floor = baseline["total_rps"] * (1 - tolerance)
+    if result["total_rps"] < floor:
+        failures.append(f"throughput {result['total_rps']:.1f} req/s < {floor:.1f} (baseline {baseline['total_rps']:.1f})")
+    return failures
+
+
+async def main(args):
+    random.seed(args.seed)
+    if args.mongo_url:
+        from motor.motor_asyncio import AsyncIOMotorClient
+        db = AsyncIOMotorClient(args.mongo_url)[args.db_name]
+        for name in await db.list_collection_names():
+            await db[name].drop()
+    else:
+        db = FakeDatabase(latency=args.db_latency_ms / 1000)
+    server.db = db
+
+    start = time.perf_counter()
+    users, by_type, jobs, projects = await seed(db, args)
+    print(f"seeded {len(users)} users, {len(jobs)} jobs, {len(projects)} projects, "
+          f"{args.applications} applications, {args.notifications} notifications "
+          f"in {time.perf_counter() - start:.1f}s")
+
+    server.view_counter.start(db)
+    server.domain_events.start()
+    workload = Workload(server.app, by_type, jobs, projects)
+    await workload.drive(args.warmup, args.concurrency)
+    latencies, errors, elapsed = await workload.drive(args.requests, args.concurrency)
+    await server.domain_events.stop()
+    await server.view_counter.stop(db)
+    server.password_pool.shutdown()
+
+    result = summarize(latencies, errors, elapsed)
+    result["config"] = {key: getattr(args, key) for key in
+                        ("users", "jobs", "projects", "applications", "notifications", "requests",
+                         "concurrency", "seed", "db_latency_ms")}
+    result["config"]["backend"] = "mongo" if args.mongo_url else "fake"
+    print_report(result)
+
+    if args.write_baseline:
+        Path(args.write_baseline).write_text(json.dumps(result, indent=2) + "\n")
+        print(f"baseline written to {args.write_baseline}")
+    status = 1 if any(r["errors"] for r in result["routes"].values()) else 0
+    if args.baseline:
+        failures = compare(result, json.loads(Path(args.baseline).read_text()), args.tolerance, args.slack_ms)
+        for failure in failures:
+            print(f"REGRESSION {failure}", file=sys.stderr)
+        status = status or (1 if failures else 0)
+    return status
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--users", type=int, default=400)
+    parser.add_argument("--jobs", type=int, default=2000)
+    parser.add_argument("--projects", type=int, default=1000)
+    parser.add_argument("--applications", type=int, default=5000)
+    parser.add_argument("--notifications", type=int, default=5000)
+    parser.add_argument("--requests", type=int, default=3000)
+    parser.add_argument("--warmup", type=int, default=200)
+    parser.add_argument("--concurrency", type=int, default=32)
+    parser.add_argument("--seed", type=int, default=1)
+    parser.add_argument("--db-latency-ms", type=float, default=0.0,
+                        help="simulated round trip per call to the in-memory database")
+    parser.add_argument("--mongo-url", help="run against this MongoDB instead (its database is wiped)")
+    parser.add_argument("--db-name", default="wallxy_bench")
+    parser.add_argument("--baseline", help="compare against this JSON baseline and fail on regressions")
+    parser.add_argument("--write-baseline", help="write this run's results as a JSON baseline")
+    parser.add_argument("--tolerance", type=float, default=0.25, help="allowed relative regression")
+    parser.add_argument("--slack-ms", type=float, default=2.0, help="absolute p95 slack on top of --tolerance")
+    sys.exit(asyncio.run(main(parser.parse_args())))
@@ -0,0 +1,142 @@
+"""Submit latency with notification generation moved to the domain-event queue.
+
+Run from ``backend/``::
+
+    python benchmarks/bench_domain_events.py --db-latency-ms 1
+
+Drives ``POST /api/applications`` and ``PUT /api/applications/{id}`` through
+the ASGI app in ``--rounds`` alternating rounds, with ``domain_events.publish``
+replaced by a no-op (the request path without any notification work) and with
+the real queue, so neither mode always runs first or on a warmer process. It
+reports the latency of both modes side by side, then drains the queue and exits
+non-zero unless every submission and status change produced exactly one
+notification. Latency is reported, not gated: wall-clock ratios are too noisy
+for a pass/fail check (tests/test_domain_events.py covers the behaviour).
+"""
+import argparse
+import asyncio
+import os
+import sys
+import time
+from datetime import datetime, timezone
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+os.environ.setdefault("MONGO_URL", "mongodb://localhost:27017")
+os.environ.setdefault("DB_NAME", "wallxy_bench")
+os.environ.setdefault("SLOW_REQUEST_MS", "60000")
+
+import orjson  # noqa: E402
+
+import server  # noqa: E402
+from bench_api import call, percentile  # noqa: E402
+from fake_mongo import FakeDatabase  # noqa: E402
+
+
+async def seed(db, employers, seekers, jobs):
+    now = datetime.now(timezone.utc)
+    users = [{"id": f"employer-{i}", "email": f"employer{i}@wallxy-bench.com", "full_name": f"Employer {i}",
+              "user_type": "employer", "password": "x", "created_at": now, "updated_at": now}
+             for i in range(employers)]
+    users += [{"id": f"seeker-{i}", "email": f"seeker{i}@wallxy-bench.com", "full_name": f"Seeker {i}",
+               "user_type": "jobseeker", "password": "x", "created_at": now, "updated_at": now}
+              for i in range(seekers)]
+    postings = [{"id": f"job-{i}", "employer_id": f"employer-{i % employers}", "title": f"Job {i}",
+                 "company_name": "Studio", "description": "d", "category": "Architecture", "job_type": "Full-time",
+                 "experience_level": "Mid-level", "salary_min": 1.0, "salary_max": 2.0, "location": "Pune",
+                 "status": "active", "applicants_count": 0, "created_at": now, "updated_at": now}
+                for i in range(jobs)]
+    await server.ensure_indexes(db)
+    await db.users.insert_many(users)
+    await db.jobs.insert_many(postings)
+    tokens = {user["id"]: server.create_access_token(server.token_claims(server.User(**user))) for user in users}
+    return tokens
+
+
+async def drive(tokens, employers, requests, concurrency, job_offset, jobs):
+    """Each seeker applies to distinct jobs, then the employer reviews the application."""
+    submit, review = [], []
+    pending = list(range(requests))
+
+    async def client():
+        while pending:
+            n = pending.pop()
+            seeker = f"seeker-{n % concurrency}"
+            job_index = (job_offset + n // concurrency) % jobs
+            start = time.perf_counter()
+            status, body = await call(server.app, "POST", "/api/applications", tokens[seeker],
+                                      body={"job_id": f"job-{job_index}", "cover_letter": "Interested"})
+            submit.append((time.perf_counter() - start) * 1000)
+            if status != 200:
+                raise RuntimeError(f"apply: unexpected {status} {body[:200]!r}")
+            application_id = orjson.loads(body)["id"]
+            employer = f"employer-{job_index % employers}"
+            start = time.perf_counter()
+            status, body = await call(server.app, "PUT", f"/api/applications/{application_id}", tokens[employer],
+                                      body={"status": "reviewed"})
+            review.append((time.perf_counter() - start) * 1000)
+            if status != 200:
+                raise RuntimeError(f"review: unexpected {status} {body[:200]!r}")
+
+    await asyncio.gather(*(client() for _ in range(concurrency)))
+    return sorted(submit), sorted(review)
+
+
+def report(label, submit, review):
+    print(f"{label:<16} apply p50={percentile(submit, 0.5):7.3f}ms p95={percentile(submit, 0.95):7.3f}ms   "
+          f"review p50={percentile(review, 0.5):7.3f}ms p95={percentile(review, 0.95):7.3f}ms")
+
+
+async def main(args):
+    db = FakeDatabase(latency=args.db_latency_ms / 1000)
+    server.db = db
+    employers = max(1, args.concurrency // 4)
+    tokens = await seed(db, employers, args.concurrency, args.jobs)
+    per_round = args.requests // args.rounds
+    jobs_per_round = per_round // args.concurrency + 1
+    if args.rounds * jobs_per_round > args.jobs:
+        print("--jobs must cover --requests / --concurrency applications per seeker", file=sys.stderr)
+        return 2
+
+    queue = server.domain_events
+    publish = queue.publish
+    results = {False: ([], []), True: ([], [])}
+    queue.start()
+    for round_number in range(args.rounds):
+        enabled = round_number % 2 == 1
+        queue.publish = publish if enabled else (lambda event: None)
+        submit, review = await drive(tokens, employers, per_round, args.concurrency,
+                                     round_number * jobs_per_round, args.jobs)
+        results[enabled][0].extend(submit)
+        results[enabled][1].extend(review)
+    queue.publish = publish
+    depth = queue.depth
+    start = time.perf_counter()
+    await queue.stop()
+    drain_ms = (time.perf_counter() - start) * 1000
+
+    report("without events", *(sorted(values) for values in results[False]))
+    report("with events", *(sorted(values) for values in results[True]))
+    stats = queue.stats()
+    print(f"queue depth at end of load {depth}, drained in {drain_ms:.1f}ms; "
+          f"{stats['batches']} batches, avg {stats['avg_batch_size']:.1f} / max {stats['max_batch_size']} events")
+
+    expected = 2 * len(results[True][0])
+    delivered = await db.notifications.count_documents({})
+    server.password_pool.shutdown()
+    if delivered != expected or stats["dropped"] or stats["failed"]:
+        print(f"MISSING notifications: {delivered} written for {expected} events "
+              f"({stats['dropped']} dropped, {stats['failed']} failed)", file=sys.stderr)
+        return 1
+    return 0
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--requests", type=int, default=2000)
+    parser.add_argument("--rounds", type=int, default=8, help="alternating rounds without and with events")
+    parser.add_argument("--concurrency", type=int, default=32)
+    parser.add_argument("--jobs", type=int, default=500)
+    parser.add_argument("--db-latency-ms", type=float, default=0.0,
+                        help="simulated round trip per call to the in-memory database")
+    sys.exit(asyncio.run(main(parser.parse_args())))
@@ -0,0 +1,74 @@
+"""Freelancer match ranking latency.
+
+Run from ``backend/``:  python benchmarks/bench_match.py [freelancers]
+
+Loads synthetic freelancer profiles (default 100k) into ``FreelancerMatcher``
+and times ``rank`` for random projects, plus incremental profile updates.
+"""
+import os
+import random
+import statistics
+import sys
+import time
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+os.environ.setdefault("MONGO_URL", "mongodb://localhost:27017")
+os.environ.setdefault("DB_NAME", "wallxy_bench")
+
+from server import FreelancerMatcher  # noqa: E402
+
+SKILLS = [f"skill-{i}" for i in range(800)]
+# The values the app's forms store
+LEVELS = ["Entry-level", "Mid-level", "Senior", "Lead"]
+BUDGET_TYPES = ["Hourly", "Fixed"]
+
+
+def freelancer(rng, i):
+    return {
+        "id": f"user-{i}",
+        "user_type": "freelancer",
+        # A skewed draw so some skills are common and most are niche
+        "skills": list({SKILLS[min(int(rng.paretovariate(1.2)) - 1, len(SKILLS) - 1)] for _ in range(8)}),
+        "hourly_rate": rng.choice([None, rng.uniform(10, 150)]),
+        "experience_level": rng.choice(LEVELS),
+        "rating": rng.uniform(0, 5),
+        "completed_projects": rng.randint(0, 40),
+    }
+
+
+def percentile(values, pct):
+    values = sorted(values)
+    return values[min(len(values) - 1, int(len(values) * pct))]
+
+
+def main(users=100000, queries=300):
+    rng = random.Random(7)
+    matcher = FreelancerMatcher()
+    start = time.perf_counter()
+    for i in range(users):
+        matcher.upsert(freelancer(rng, i))
+    print(f"loaded {len(matcher)} freelancers / {matcher.stats()['skills']} skills "
+          f"in {time.perf_counter() - start:.2f}s")
+
+    latencies = []
+    for _ in range(queries):
+        project = {"skills": rng.sample(SKILLS[:60], 5), "budget_type": rng.choice(BUDGET_TYPES),
+                   "budget_min": 30.0, "budget_max": 80.0}
+        start = time.perf_counter()
+        matcher.rank(project, limit=20)
+        latencies.append((time.perf_counter() - start) * 1000)
+    print(f"rank    p50={statistics.median(latencies):.2f}ms  p95={percentile(latencies, 0.95):.2f}ms  "
+          f"p99={percentile(latencies, 0.99):.2f}ms")
+
+    latencies = []
+    for _ in range(2000):
+        doc = freelancer(rng, rng.randrange(users))
+        start = time.perf_counter()
+        matcher.upsert(doc)
+        latencies.append((time.perf_counter() - start) * 1000)
+    print(f"upsert  p50={statistics.median(latencies):.3f}ms  p99={percentile(latencies, 0.99):.3f}ms")
+
+
+if __name__ == "__main__":
+    main(int(sys.argv[1]) if len(sys.argv) > 1 else 100000)
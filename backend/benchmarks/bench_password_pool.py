@@ -0,0 +1,80 @@
+"""Listing latency while logins saturate the password-hashing pool.
+
+Run from ``backend/``:  python benchmarks/bench_password_pool.py
+
+Fires a sustained burst of bcrypt verifications (as concurrent logins would)
+and measures how long ``get_jobs`` takes to answer meanwhile. With hashing on
+the worker pool the listing latency should stay close to the idle baseline.
+"""
+import asyncio
+import os
+import statistics
+import sys
+import time
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+os.environ.setdefault("MONGO_URL", "mongodb://localhost:27017")
+os.environ.setdefault("DB_NAME", "wallxy_bench")
+
+import server  # noqa: E402
+from fake_mongo import FakeDatabase  # noqa: E402
+
+
+def _seed_jobs(n=200):
+    now = time.time()
+    return [{"id": str(i), "employer_id": "e", "title": f"Job {i}", "company_name": "Acme",
+             "description": "d", "category": "Architecture", "job_type": "Full-time",
+             "experience_level": "Senior", "salary_min": 1.0, "salary_max": 2.0,
+             "location": "Mumbai", "status": "active", "created_at": str(now)} for i in range(n)]
+
+
+_REQUEST = server.Request({"type": "http", "headers": []})
+
+
+async def _listing_latencies(samples):
+    out = []
+    for _ in range(samples):
+        start = time.perf_counter()
+        await server.get_jobs(_REQUEST, location=None, skills=None, limit=50)
+        out.append((time.perf_counter() - start) * 1000)
+        await asyncio.sleep(0.005)
+    return out
+
+
+async def _login_storm(hashed, stop):
+    async def one():
+        while not stop.is_set():
+            try:
+                await server.password_pool.verify("hunter2", hashed)
+            except server.HTTPException:
+                await asyncio.sleep(0.01)
+    await asyncio.gather(*(one() for _ in range(server.password_pool.max_pending * 2)))
+
+
+def _report(label, lat):
+    lat = sorted(lat)
+    p99 = lat[int(len(lat) * 0.99) - 1]
+    print(f"{label:<22} p50={statistics.median(lat):7.3f}ms  p99={p99:7.3f}ms  max={lat[-1]:7.3f}ms")
+
+
+async def main(samples=200):
+    server.db = FakeDatabase()
+    await server.db.jobs.insert_many(_seed_jobs())
+    server.listing_cache.ttl = 0  # measure the uncached listing path
+    hashed = server.hash_password("hunter2")
+
+    _report("idle", await _listing_latencies(samples))
+
+    stop = asyncio.Event()
+    storm = asyncio.create_task(_login_storm(hashed, stop))
+    await asyncio.sleep(0.2)
+    _report("logins saturated", await _listing_latencies(samples))
+    stop.set()
+    await storm
+    print("pool:", server.password_pool.stats())
+    server.password_pool.shutdown()
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
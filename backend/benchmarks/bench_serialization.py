@@ -0,0 +1,73 @@
+"""Rows/sec of the list-endpoint encoders.
+
+Run from ``backend/``:  python benchmarks/bench_serialization.py [rows]
+
+Compares the original path (``serialize_doc`` on every row, then FastAPI's
+``response_model`` validation + ``jsonable_encoder`` + ``json.dumps``) with the
+``ListCodec`` fast path, and checks both produce the same fields.
+"""
+import json
+import os
+import sys
+import time
+import uuid
+from datetime import datetime, timezone
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+os.environ.setdefault("MONGO_URL", "mongodb://localhost:27017")
+os.environ.setdefault("DB_NAME", "wallxy_bench")
+
+from fastapi.encoders import jsonable_encoder  # noqa: E402
+from pydantic import TypeAdapter  # noqa: E402
+from typing import List  # noqa: E402
+
+import server  # noqa: E402
+
+
+def job_rows(n):
+    now = datetime.now(timezone.utc).isoformat()
+    return [{
+        "id": str(uuid.uuid4()), "employer_id": str(uuid.uuid4()), "title": f"Senior Architect {i}",
+        "company_name": "BuildTech Solutions", "description": "Lead design of mid-rise residential towers. " * 5,
+        "requirements": ["B.Arch", "5+ years"], "category": "Architecture", "job_type": "Full-time",
+        "experience_level": "Senior", "salary_min": 1200000.0, "salary_max": 1800000.0, "location": "Mumbai",
+        "skills": ["AutoCAD", "Revit", "BIM"], "status": "active", "views": i, "applicants_count": 3,
+        "created_at": now, "updated_at": now,
+    } for i in range(n)]
+
+
+def original_path(rows):
+    adapter = TypeAdapter(List[server.Job])
+    for row in rows: server.serialize_doc(row)
+    validated = adapter.validate_python(rows)
+    return json.dumps(jsonable_encoder(validated)).encode()
+
+
+def fast_path(rows):
+    return server.JOB_CODEC.encode(rows)
+
+
+def bench(label, fn, rows, rounds=20):
+    best = float("inf")
+    for _ in range(rounds):
+        batch = [dict(r) for r in rows]
+        start = time.perf_counter()
+        fn(batch)
+        best = min(best, time.perf_counter() - start)
+    print(f"{label:<10} {len(rows) / best:>12,.0f} rows/s  ({best * 1000:.2f} ms per {len(rows)} rows)")
+    return best
+
+
+def main(n=1000):
+    rows = job_rows(n)
+    slow = json.loads(original_path([dict(r) for r in rows]))
+    fast = json.loads(fast_path([dict(r) for r in rows]))
+    assert [sorted(r) for r in slow] == [sorted(r) for r in fast], "field sets differ"
+    t_orig = bench("original", original_path, rows)
+    t_fast = bench("fast", fast_path, rows)
+    print(f"speedup    {t_orig / t_fast:.1f}x")
+
+
+if __name__ == "__main__":
+    main(int(sys.argv[1]) if len(sys.argv) > 1 else 1000)
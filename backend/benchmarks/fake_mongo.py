@@ -0,0 +1,647 @@
+"""In-memory stand-in for the parts of Motor that ``server.py`` uses.
+
+Good enough to drive the API in benchmarks without a mongod: filters with the
+usual comparison/logical operators, projections, sort/limit cursors, ``$set`` /
+``$inc`` / ``$setOnInsert`` updates with upserts, unique indexes, ``bulk_write``
+and the aggregation stages the routes rely on. Every call yields to the event
+loop (optionally after ``latency`` seconds) like a real round trip would.
+"""
+import asyncio
+import itertools
+import re
+from datetime import datetime
+from types import SimpleNamespace
+
+from bson import ObjectId
+from pymongo import ReturnDocument
+from pymongo.errors import DuplicateKeyError
+
+_MISSING = object()
+_BSON_TYPES = {"string": str, "date": datetime, "bool": bool, "array": list, "object": dict,
+               "double": float, "int": int, "objectId": ObjectId}
+
+
+def _get(doc, path):
+    value = doc
+    for part in path.split("."):
+        if isinstance(value, dict) and part in value:
+            value = value[part]
+        else:
+            return _MISSING
+    return value
+
+
+def _set(doc, path, value):
+    parts = path.split(".")
+    for part in parts[:-1]:
+        doc = doc.setdefault(part, {})
+    doc[parts[-1]] = value
+
+
+def _unset(doc, path):
+    parts = path.split(".")
+    for part in parts[:-1]:
+        doc = doc.get(part)
+        if not isinstance(doc, dict):
+            return
+    doc.pop(parts[-1], None)
+
+
+def _compare(value, op, arg):
+    if value is _MISSING or value is None or arg is None:
+        return False
+    try:
+        if op == "$lt":
+            return value < arg
+        if op == "$lte":
+            return value <= arg
+        if op == "$gt":
+            return value > arg
+        return value >= arg
+    except TypeError:
+        return False
+
+
+def _values(value):
+    return value if isinstance(value, list) else [value]
+
+
+def _match_condition(value, cond):
+    if isinstance(cond, dict) and cond and all(k.startswith("$") for k in cond):
+        for op, arg in cond.items():
+            if op == "$eq":
+                if not _match_condition(value, arg):
+                    return False
+            elif op == "$ne":
+                if _match_condition(value, arg):
+                    return False
+            elif op in ("$lt", "$lte", "$gt", "$gte"):
+                if not any(_compare(v, op, arg) for v in _values(value)):
+                    return False
+            elif op == "$in":
+                if value is _MISSING:
+                    if None not in arg:
+                        return False
+                elif not any(v in arg for v in _values(value)):
+                    return False
+            elif op == "$nin":
+                if value is not _MISSING and any(v in arg for v in _values(value)):
+                    return False
+            elif op == "$all":
+                if value is _MISSING or not all(a in _values(value) for a in arg):
+                    return False
+            elif op == "$type":
+                if value is _MISSING or not isinstance(value, _BSON_TYPES[arg]):
+                    return False
+            elif op == "$exists":
+                if (value is not _MISSING) != bool(arg):
+                    return False
+            elif op == "$regex":
+                flags = re.IGNORECASE if "i" in cond.get("$options", "") else 0
+                if not isinstance(value, str) or not re.search(arg, value, flags):
+                    return False
+            elif op == "$options":
+                continue
+            else:
+                raise NotImplementedError(f"query operator {op}")
+        return True
+    if value is _MISSING:
+        return cond is None
+    if isinstance(value, list) and not isinstance(cond, list):
+        return cond in value
+    return value == cond
+
+
+def matches(doc, query):
+    for key, cond in (query or {}).items():
+        if key == "$or":
+            if not any(matches(doc, q) for q in cond):
+                return False
+        elif key == "$and":
+            if not all(matches(doc, q) for q in cond):
+                return False
+        elif key == "$nor":
+            if any(matches(doc, q) for q in cond):
+                return False
+        elif not _match_condition(_get(doc, key), cond):
+            return False
+    return True
+
+
+def _copy(doc):
+    return {k: (list(v) if isinstance(v, list) else dict(v) if isinstance(v, dict) else v) for k, v in doc.items()}
+
+
+def project(doc, projection):
+    if not projection:
+        return _copy(doc)
+    include = {k for k, v in projection.items() if v and k != "_id"}
+    if include:
+        out = {k: doc[k] for k in include if k in doc}
+        if projection.get("_id", 1) and "_id" in doc:
+            out["_id"] = doc["_id"]
+        return _copy(out)
+    return _copy({k: v for k, v in doc.items() if projection.get(k, 1)})
+
+
+def _sort_key(value):
+    # Mongo orders null/missing before numbers before strings; keep types apart
+    if value is _MISSING or value is None:
+        return (0, 0)
+    if isinstance(value, bool):
+        return (3, value)
+    if isinstance(value, (int, float)):
+        return (1, value)
+    if isinstance(value, str):
+        return (2, value)
+    if isinstance(value, ObjectId):
+        return (4, value.binary)
+    if isinstance(value, datetime):
+        return (5, value.timestamp())
+    return (6, str(value))
+
+
+def sort_docs(docs, keys):
+    for field, direction in reversed(keys):
+        docs.sort(key=lambda d: _sort_key(_get(d, field)), reverse=direction < 0)
+    return docs
+
+
+def _normalize_sort(key_or_list, direction=None):
+    if isinstance(key_or_list, str):
+        return [(key_or_list, direction or 1)]
+    return list(key_or_list)
+
+
+def apply_update(doc, update, inserting=False):
+    for op, fields in update.items():
+        if op == "$set":
+            for path, value in fields.items():
+                _set(doc, path, value)
+        elif op == "$inc":
+            for path, value in fields.items():
+                current = _get(doc, path)
+                _set(doc, path, (0 if current is _MISSING or current is None else current) + value)
+        elif op == "$setOnInsert":
+            if inserting:
+                for path, value in fields.items():
+                    _set(doc, path, value)
+        elif op == "$unset":
+            for path in fields:
+                _unset(doc, path)
+        elif op == "$push":
+            for path, value in fields.items():
+                current = _get(doc, path)
+                _set(doc, path, (current if isinstance(current, list) else []) + [value])
+        else:
+            raise NotImplementedError(f"update operator {op}")
+
+
+class FakeCursor:
+    def __init__(self, collection, query, projection):
+        self._collection = collection
+        self._query = query
+        self._projection = projection
+        self._sort = []
+        self._skip = 0
+        self._limit = 0
+        self._results = None
+
+    def sort(self, key_or_list, direction=None):
+        self._sort = _normalize_sort(key_or_list, direction)
+        return self
+
+    def skip(self, n):
+        self._skip = n
+        return self
+
+    def limit(self, n):
+        self._limit = n
+        return self
+
+    def batch_size(self, n):
+        return self
+
+    def _materialize(self):
+        if self._results is None:
+            docs = self._collection._scan(self._query)
+            if self._sort:
+                sort_docs(docs, self._sort)
+            docs = docs[self._skip:]
+            if self._limit:
+                docs = docs[:self._limit]
+            self._results = iter([project(d, self._projection) for d in docs])
+        return self._results
+
+    async def to_list(self, length=None):
+        await self._collection._db._round_trip()
+        results = self._materialize()
+        if length is None:
+            return list(results)
+        return list(itertools.islice(results, length))
+
+    def __aiter__(self):
+        return self
+
+    async def __anext__(self):
+        results = self._materialize()
+        try:
+            return next(results)
+        except StopIteration:
+            raise StopAsyncIteration
+
+    async def close(self):
+        self._results = iter(())
+
+
+class FakeAggregateCursor:
+    def __init__(self, collection, pipeline):
+        self._collection = collection
+        self._pipeline = pipeline
+        self._results = None
+
+    def _materialize(self):
+        if self._results is None:
+            pipeline = self._pipeline
+            if pipeline and "$match" in pipeline[0]:
+                docs, pipeline = self._collection._scan(pipeline[0]["$match"]), pipeline[1:]
+            else:
+                docs = list(self._collection._docs.values())
+            self._results = iter(run_pipeline([_copy(d) for d in docs], pipeline))
+        return self._results
+
+    async def to_list(self, length=None):
+        await self._collection._db._round_trip()
+        results = self._materialize()
+        return list(results) if length is None else list(itertools.islice(results, length))
+
+    def __aiter__(self):
+        return self
+
+    async def __anext__(self):
+        try:
+            return next(self._materialize())
+        except StopIteration:
+            raise StopAsyncIteration
+
+
+def _evaluate(expr, doc):
+    if isinstance(expr, str) and expr.startswith("$"):
+        value = _get(doc, expr[1:])
+        return None if value is _MISSING else value
+    if isinstance(expr, dict):
+        return {k: _evaluate(v, doc) for k, v in expr.items()}
+    return expr
+
+
+def _group(docs, spec):
+    groups = {}
+    for doc in docs:
+        key = _evaluate(spec["_id"], doc)
+        hashable = tuple(sorted(key.items())) if isinstance(key, dict) else key
+        acc = groups.setdefault(hashable, {"_id": key})
+        for field, accumulator in spec.items():
+            if field == "_id":
+                continue
+            (op, arg), = accumulator.items()
+            value = _evaluate(arg, doc)
+            if op == "$sum":
+                acc[field] = acc.get(field, 0) + (value or 0)
+            elif op in ("$max", "$min"):
+                if value is not None:
+                    current = acc.get(field)
+                    if current is None or (value > current if op == "$max" else value < current):
+                        acc[field] = value
+                    continue
+                acc.setdefault(field, None)
+            elif op == "$first":
+                acc.setdefault(field, value)
+            elif op == "$push":
+                acc.setdefault(field, []).append(value)
+            elif op == "$addToSet":
+                values = acc.setdefault(field, [])
+                if value not in values:
+                    values.append(value)
+            elif op == "$avg":
+                total, count = acc.get(f"__{field}", (0, 0))
+                acc[f"__{field}"] = (total + (value or 0), count + 1)
+            else:
+                raise NotImplementedError(f"accumulator {op}")
+    out = []
+    for acc in groups.values():
+        for field in [f for f in acc if f.startswith("__")]:
+            total, count = acc.pop(field)
+            acc[field[2:]] = total / count if count else None
+        out.append(acc)
+    return out
+
+
+def run_pipeline(docs, pipeline):
+    for stage in pipeline:
+        (op, spec), = stage.items()
+        if op == "$match":
+            docs = [d for d in docs if matches(d, spec)]
+        elif op == "$group":
+            docs = _group(docs, spec)
+        elif op == "$sort":
+            docs = sort_docs(docs, list(spec.items()))
+        elif op == "$limit":
+            docs = docs[:spec]
+        elif op == "$skip":
+            docs = docs[spec:]
+        elif op == "$project":
+            docs = [project(d, spec) for d in docs]
+        elif op == "$count":
+            docs = [{spec: len(docs)}]
+        elif op == "$unwind":
+            path = spec if isinstance(spec, str) else spec["path"]
+            field = path[1:]
+            unwound = []
+            for d in docs:
+                for value in _values(_get(d, field)):
+                    if value is not _MISSING:
+                        unwound.append({**d, field: value})
+            docs = unwound
+        elif op == "$facet":
+            docs = [{name: run_pipeline([_copy(d) for d in docs], sub) for name, sub in spec.items()}]
+        else:
+            raise NotImplementedError(f"pipeline stage {op}")
+    return docs
+
+
+def _hashable(value):
+    if isinstance(value, list):
+        return tuple(_hashable(v) for v in value)
+    if isinstance(value, dict):
+        return tuple((k, _hashable(v)) for k, v in value.items())
+    return value
+
+
+class FakeCollection:
+    def __init__(self, db, name):
+        self._db = db
+        self.name = name
+        self._docs = {}  # id(doc) -> doc, in insertion order
+        self._unique = {}  # (field, ...) -> {key: doc}
+        self._indexes = {}  # indexed field -> {value: {id(doc): doc}}
+
+    # -- index maintenance --
+
+    def _unique_key(self, doc, fields):
+        key = tuple(_get(doc, f) for f in fields)
+        if all(k is _MISSING for k in key):
+            return None
+        return tuple(None if k is _MISSING else _hashable(k) for k in key)
+
+    def _add(self, doc):
+        keys = {}
+        for fields, entries in self._unique.items():
+            key = self._unique_key(doc, fields)
+            if key is not None and key in entries:
+                raise DuplicateKeyError(f"E11000 duplicate key error collection: {self.name} index: {fields}")
+            keys[fields] = key
+        for fields, key in keys.items():
+            if key is not None:
+                self._unique[fields][key] = doc
+        for field, entries in self._indexes.items():
+            for value in _values(_get(doc, field)):
+                if value is not _MISSING:
+                    entries.setdefault(_hashable(value), {})[id(doc)] = doc
+        self._docs[id(doc)] = doc
+
+    def _remove(self, doc):
+        for fields, entries in self._unique.items():
+            key = self._unique_key(doc, fields)
+            if entries.get(key) is doc:
+                del entries[key]
+        for field, entries in self._indexes.items():
+            for value in _values(_get(doc, field)):
+                if value is not _MISSING:
+                    entries.get(_hashable(value), {}).pop(id(doc), None)
+        del self._docs[id(doc)]
+
+    def _scan(self, query):
+        """Documents matching ``query``, narrowed through an equality index when one applies."""
+        candidates = None
+        for field, cond in query.items():
+            entries = self._indexes.get(field)
+            if entries is None or cond is None:
+                continue
+            if isinstance(cond, dict):
+                if set(cond) != {"$in"}:
+                    continue
+                bucket = {}
+                for value in cond["$in"]:
+                    bucket.update(entries.get(_hashable(value), {}))
+            elif isinstance(cond, list):
+                continue
+            else:
+                bucket = entries.get(cond, {})
+            if candidates is None or len(bucket) < len(candidates):
+                candidates = bucket
+        if candidates is None:
+            candidates = self._docs
+        return [d for d in candidates.values() if matches(d, query)]
+
+    async def create_index(self, keys, unique=False, name=None, **kwargs):
+        await self._db._round_trip()
+        keys = _normalize_sort(keys)
+        fields = tuple(k for k, _ in keys)
+        if unique and fields not in self._unique:
+            # Checked up front so a failed build leaves the collection as it was
+            seen = set()
+            for doc in self._docs.values():
+                key = self._unique_key(doc, fields)
+                if key is not None and key in seen:
+                    raise DuplicateKeyError(f"E11000 duplicate key error collection: {self.name} index: {fields}")
+                seen.add(key)
+        if unique and fields not in self._unique or any(f not in self._indexes for f in fields):
+            docs = list(self._docs.values())
+            for doc in docs:
+                self._remove(doc)
+            if unique:
+                self._unique.setdefault(fields, {})
+            for field in fields:
+                self._indexes.setdefault(field, {})
+            for doc in docs:
+                self._add(doc)
+        return name or "_".join(f"{k}_{d}" for k, d in keys)
+
+    async def index_information(self):
+        await self._db._round_trip()
+        info = {"_id_": {"key": [("_id", 1)]}}
+        for fields in self._unique:
+            info["_".join(f"{field}_1" for field in fields)] = {"key": [(field, 1) for field in fields], "unique": True}
+        return info
+
+    async def drop(self):
+        self._docs, self._unique, self._indexes = {}, {}, {}
+
+    # -- reads --
+
+    def find(self, query=None, projection=None, sort=None, limit=0):
+        cursor = FakeCursor(self, query or {}, projection)
+        if sort:
+            cursor.sort(sort)
+        if limit:
+            cursor.limit(limit)
+        return cursor
+
+    async def find_one(self, query=None, projection=None, sort=None):
+        await self._db._round_trip()
+        docs = self._scan(query or {})
+        if sort:
+            sort_docs(docs, _normalize_sort(sort))
+        return project(docs[0], projection) if docs else None
+
+    async def count_documents(self, query, **kwargs):
+        await self._db._round_trip()
+        return len(self._scan(query))
+
+    async def estimated_document_count(self):
+        return len(self._docs)
+
+    async def distinct(self, key, query=None):
+        await self._db._round_trip()
+        values = []
+        for doc in self._scan(query or {}):
+            for value in _values(_get(doc, key)):
+                if value is not _MISSING and value not in values:
+                    values.append(value)
+        return values
+
+    def aggregate(self, pipeline, **kwargs):
+        return FakeAggregateCursor(self, pipeline)
+
+    # -- writes --
+
+    def _insert(self, doc):
+        doc.setdefault("_id", ObjectId())
+        self._add(_copy(doc))
+        return doc["_id"]
+
+    async def insert_one(self, doc):
+        await self._db._round_trip()
+        return SimpleNamespace(inserted_id=self._insert(doc), acknowledged=True)
+
+    async def insert_many(self, docs, ordered=True):
+        await self._db._round_trip()
+        return SimpleNamespace(inserted_ids=[self._insert(d) for d in docs], acknowledged=True)
+
+    def _apply(self, doc, update):
+        before = _copy(doc)
+        self._remove(doc)
+        apply_update(doc, update)
+        try:
+            self._add(doc)
+        except DuplicateKeyError:
+            doc.clear()
+            doc.update(before)
+            self._add(doc)
+            raise
+        return doc != before
+
+    def _update(self, query, update, upsert=False, many=False):
+        matched = modified = 0
+        upserted_id = None
+        docs = self._scan(query)
+        for doc in docs if many else docs[:1]:
+            matched += 1
+            modified += self._apply(doc, update)
+        if not matched and upsert:
+            doc = {k: v for k, v in query.items() if not k.startswith("$") and not isinstance(v, dict)}
+            apply_update(doc, update, inserting=True)
+            upserted_id = self._insert(doc)
+        return SimpleNamespace(matched_count=matched, modified_count=modified, upserted_id=upserted_id,
+                               acknowledged=True)
+
+    async def update_one(self, query, update, upsert=False):
+        await self._db._round_trip()
+        return self._update(query, update, upsert)
+
+    async def update_many(self, query, update, upsert=False):
+        await self._db._round_trip()
+        return self._update(query, update, upsert, many=True)
+
+    async def find_one_and_update(self, query, update, projection=None, sort=None, upsert=False,
+                                  return_document=ReturnDocument.BEFORE):
+        await self._db._round_trip()
+        docs = self._scan(query)
+        if sort:
+            sort_docs(docs, _normalize_sort(sort))
+        if not docs:
+            if not upsert:
+                return None
+            result = self._update(query, update, upsert=True)
+            inserted = next(d for d in self._docs.values() if d["_id"] == result.upserted_id)
+            return project(inserted, projection) if return_document == ReturnDocument.AFTER else None
+        doc = docs[0]
+        before = project(doc, projection)
+        self._apply(doc, update)
+        return project(doc, projection) if return_document == ReturnDocument.AFTER else before
+
+    async def find_one_and_delete(self, query, projection=None, sort=None):
+        await self._db._round_trip()
+        docs = self._scan(query)
+        if sort:
+            sort_docs(docs, _normalize_sort(sort))
+        if not docs:
+            return None
+        self._remove(docs[0])
+        return project(docs[0], projection)
+
+    def _delete(self, query, many):
+        docs = self._scan(query)
+        for doc in docs if many else docs[:1]:
+            self._remove(doc)
+        return len(docs) if many else len(docs[:1])
+
+    async def delete_one(self, query):
+        await self._db._round_trip()
+        return SimpleNamespace(deleted_count=self._delete(query, many=False), acknowledged=True)
+
+    async def delete_many(self, query):
+        await self._db._round_trip()
+        return SimpleNamespace(deleted_count=self._delete(query, many=True), acknowledged=True)
+
+    async def bulk_write(self, requests, ordered=True):
+        await self._db._round_trip()
+        totals = dict(inserted_count=0, matched_count=0, modified_count=0, deleted_count=0, upserted_count=0)
+        for request in requests:
+            kind = type(request).__name__
+            if kind == "InsertOne":
+                self._insert(request._doc)
+                totals["inserted_count"] += 1
+            elif kind in ("UpdateOne", "UpdateMany", "ReplaceOne"):
+                update = request._doc if kind != "ReplaceOne" else {"$set": request._doc}
+                result = self._update(request._filter, update, request._upsert, many=kind == "UpdateMany")
+                totals["matched_count"] += result.matched_count
+                totals["modified_count"] += result.modified_count
+                totals["upserted_count"] += result.upserted_id is not None
+            elif kind in ("DeleteOne", "DeleteMany"):
+                totals["deleted_count"] += self._delete(request._filter, many=kind == "DeleteMany")
+            else:
+                raise NotImplementedError(kind)
+        return SimpleNamespace(acknowledged=True, **totals)
+
+
+class FakeDatabase:
+    def __init__(self, latency=0.0):
+        self.latency = latency
+        self._collections = {}
+
+    async def _round_trip(self):
+        await asyncio.sleep(self.latency)
+
+    def __getitem__(self, name):
+        if name not in self._collections:
+            self._collections[name] = FakeCollection(self, name)
+        return self._collections[name]
+
+    def __getattr__(self, name):
+        if name.startswith("_"):
+            raise AttributeError(name)
+        return self[name]
+
+    async def list_collection_names(self):
+        return list(self._collections)
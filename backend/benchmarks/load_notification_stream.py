@@ -0,0 +1,149 @@
+"""Idle-connection load test for the notification stream.
+
+In-process (no server needed), parks N streams on the hub and fans out events::
+
+    python benchmarks/load_notification_stream.py --in-process --connections 10000
+
+Against a running server, holds N raw SSE connections open and reports how
+many stayed up, using the hub counters from ``/api/stats``::
+
+    python benchmarks/load_notification_stream.py --url http://127.0.0.1:8001 \\
+        --token <access_token> --connections 10000 --hold 60
+"""
+import argparse
+import asyncio
+import json
+import os
+import random
+import resource
+import sys
+import time
+from pathlib import Path
+from urllib.parse import urlsplit
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+os.environ.setdefault("MONGO_URL", "mongodb://localhost:27017")
+os.environ.setdefault("DB_NAME", "wallxy_bench")
+
+
+def raise_fd_limit():
+    soft, hard = resource.getrlimit(resource.RLIMIT_NOFILE)
+    resource.setrlimit(resource.RLIMIT_NOFILE, (hard, hard))
+    return hard
+
+
+def rss_mb():
+    return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024
+
+
+async def in_process(connections, events):
+    import server
+
+    class _Request:
+        async def is_disconnected(self):
+            return False
+
+    users = [f"user-{i}" for i in range(connections)]
+    received = 0
+
+    async def consume(user_id):
+        nonlocal received
+        async for chunk in server.notification_stream(_Request(), user_id, None):
+            if chunk.startswith(b"id:"):
+                received += 1
+
+    base_rss = rss_mb()
+    start = time.perf_counter()
+    tasks = [asyncio.create_task(consume(u)) for u in users]
+    await asyncio.sleep(0)
+    while server.notification_hub.connections < connections:
+        await asyncio.sleep(0.01)
+    print(f"parked {connections} streams in {time.perf_counter() - start:.2f}s, "
+          f"max RSS +{rss_mb() - base_rss:.1f} MiB")
+
+    start = time.perf_counter()
+    for i in range(events):
+        server.notification_hub.publish({"id": f"n{i}", "user_id": random.choice(users), "title": "t"})
+    while received < events:
+        await asyncio.sleep(0.001)
+    elapsed = time.perf_counter() - start
+    print(f"fanned out {events} events in {elapsed * 1000:.1f} ms ({events / elapsed:,.0f}/s)")
+    print("hub:", server.notification_hub.stats())
+    for task in tasks:
+        task.cancel()
+    await asyncio.gather(*tasks, return_exceptions=True)
+
+
+async def open_stream(host, port, path, stats):
+    opened = False
+    try:
+        reader, writer = await asyncio.open_connection(host, port)
+        writer.write(f"GET {path} HTTP/1.1\r\nHost: {host}\r\nAccept: text/event-stream\r\n\r\n".encode())
+        await writer.drain()
+        status = await reader.readline()
+        if b" 200 " not in status:
+            stats["failed"] += 1
+            return
+        opened = True
+        stats["open"] += 1
+        while True:
+            line = await reader.readline()
+            if not line:
+                break
+            if line.startswith(b": ping"):
+                stats["pings"] += 1
+    except OSError:
+        stats["failed"] += 1
+    finally:
+        if opened:
+            stats["open"] -= 1
+
+
+async def server_stats(host, port):
+    reader, writer = await asyncio.open_connection(host, port)
+    writer.write(f"GET /api/stats HTTP/1.1\r\nHost: {host}\r\nConnection: close\r\n\r\n".encode())
+    raw = await reader.read()
+    writer.close()
+    return json.loads(raw.split(b"\r\n\r\n", 1)[1]).get("notification_hub")
+
+
+async def against_server(url, token, connections, hold):
+    parts = urlsplit(url)
+    host, port = parts.hostname, parts.port or 80
+    path = f"/api/notifications/stream?access_token={token}"
+    stats = {"open": 0, "failed": 0, "pings": 0}
+    tasks = []
+    for _ in range(connections):
+        tasks.append(asyncio.create_task(open_stream(host, port, path, stats)))
+        if len(tasks) % 500 == 0:
+            await asyncio.sleep(0.05)
+    deadline = time.monotonic() + hold
+    while time.monotonic() < deadline:
+        await asyncio.sleep(5)
+        print(f"client open={stats['open']} failed={stats['failed']} pings={stats['pings']} "
+              f"server={await server_stats(host, port)}")
+    for task in tasks:
+        task.cancel()
+    await asyncio.gather(*tasks, return_exceptions=True)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--in-process", action="store_true")
+    parser.add_argument("--connections", type=int, default=10000)
+    parser.add_argument("--events", type=int, default=10000)
+    parser.add_argument("--url", default="http://127.0.0.1:8001")
+    parser.add_argument("--token")
+    parser.add_argument("--hold", type=float, default=60)
+    args = parser.parse_args()
+    print(f"fd limit: {raise_fd_limit()}")
+    if args.in_process:
+        asyncio.run(in_process(args.connections, args.events))
+    else:
+        if not args.token:
+            parser.error("--token is required when running against a server")
+        asyncio.run(against_server(args.url, args.token, args.connections, args.hold))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,100 @@
+"""Verify that every route's query is served by an index.
+
+Usage (from ``backend/``, against a local mongod)::
+
+    MONGO_URL=mongodb://localhost:27017 DB_NAME=wallxy_plans python check_query_plans.py
+
+Creates the indexes declared in ``server.INDEXES``, runs each route's query
+shape through ``explain()`` and exits non-zero if any winning plan contains a
+COLLSCAN stage.
+"""
+import asyncio
+import sys
+from datetime import datetime, timezone
+
+from server import DESCENDING, PAGE_SORT, client, db, ensure_indexes
+
+CUTOFF = datetime(2024, 1, 1, tzinfo=timezone.utc)
+
+# (route, collection, filter, sort) -- keep in step with the handlers in server.py
+QUERY_SHAPES = [
+    ("get_current_user", "users", {"id": "u1"}, None),
+    ("register/login", "users", {"email": "a@example.com"}, None),
+    ("get_jobs", "jobs", {"status": "active"}, PAGE_SORT),
+    ("get_jobs?category", "jobs", {"status": "active", "category": "Architecture"}, PAGE_SORT),
+    ("get_jobs?job_type", "jobs", {"status": "active", "job_type": "Full-time"}, PAGE_SORT),
+    ("get_jobs?experience_level", "jobs", {"status": "active", "experience_level": "Senior"}, PAGE_SORT),
+    ("get_jobs?cursor", "jobs", {"status": "active", "$or": [
+        {"created_at": {"$lt": CUTOFF}},
+        {"created_at": CUTOFF, "id": {"$lt": "j1"}},
+    ]}, PAGE_SORT),
+    ("get_jobs?salary", "jobs", {"status": "active", "salary_max": {"$gte": 500000}, "salary_min": {"$lte": 900000}}, PAGE_SORT),
+    ("get_jobs?location", "jobs", {"status": "active", "location": {"$in": ["Mumbai", "Pune"]}}, PAGE_SORT),
+    ("get_jobs?skills", "jobs", {"status": "active", "skills": {"$all": ["Revit", "AutoCAD"]}}, PAGE_SORT),
+    ("get_job_facets", "jobs", {"status": "active"}, None),
+    ("get_job", "jobs", {"id": "j1"}, None),
+    ("update/delete_job", "jobs", {"id": "j1", "employer_id": "u1"}, None),
+    ("get_projects", "projects", {"status": "active"}, PAGE_SORT),
+    ("get_projects?category", "projects", {"status": "active", "category": "Design"}, PAGE_SORT),
+    ("get_projects?budget_type", "projects", {"status": "active", "budget_type": "fixed"}, PAGE_SORT),
+    ("get_projects?budget", "projects", {"status": "active", "budget_max": {"$gte": 1000}, "budget_min": {"$lte": 5000}}, PAGE_SORT),
+    ("get_project", "projects", {"id": "p1"}, None),
+    ("update/delete_project", "projects", {"id": "p1", "client_id": "u1"}, None),
+    ("get_my_applications", "applications", {"applicant_id": "u1"}, PAGE_SORT),
+    ("get_job_applications", "applications", {"job_id": "j1"}, PAGE_SORT),
+    ("update_application_status", "applications", {"id": "a1", "employer_id": "u1"}, None),
+    ("get_my_proposals", "proposals", {"freelancer_id": "u1"}, PAGE_SORT),
+    ("get_project_proposals", "proposals", {"project_id": "p1"}, PAGE_SORT),
+    ("update_proposal_status", "proposals", {"id": "pr1", "client_id": "u1"}, None),
+    ("get_dashboard jobs", "jobs", {"employer_id": "u1"}, [("created_at", DESCENDING)]),
+    ("get_dashboard projects", "projects", {"client_id": "u1"}, [("created_at", DESCENDING)]),
+    ("get_dashboard activity", "applications", {"job_id": {"$in": ["j1", "j2"]}}, PAGE_SORT),
+    ("archive_postings jobs", "jobs", {"status": {"$ne": "active"}, "updated_at": {"$lt": CUTOFF}}, None),
+    ("archive_postings projects", "projects", {"status": {"$ne": "active"}, "updated_at": {"$lt": CUTOFF}}, None),
+    ("get_notifications", "notifications", {"user_id": "u1"}, [("created_at", DESCENDING)]),
+    ("mark_notification_read", "notifications", {"id": "n1", "user_id": "u1"}, None),
+    ("notification_stream replay", "notifications", {"user_id": "u1", "$or": [
+        {"created_at": {"$gt": CUTOFF}}, {"created_at": CUTOFF, "id": {"$gt": "n1"}},
+    ]}, [("created_at", 1), ("id", 1)]),
+]
+
+
+def plan_stages(plan):
+    """Yield every stage name in a (possibly nested) explain plan."""
+    if isinstance(plan, dict):
+        if "stage" in plan:
+            yield plan["stage"]
+        for value in plan.values():
+            yield from plan_stages(value)
+    elif isinstance(plan, list):
+        for item in plan:
+            yield from plan_stages(item)
+
+
+async def check_plans(database) -> list:
+    await ensure_indexes(database)
+    failures = []
+    for route, collection, query, sort in QUERY_SHAPES:
+        cursor = database[collection].find(query)
+        if sort:
+            cursor = cursor.sort(sort)
+        explain = await cursor.explain()
+        stages = list(plan_stages(explain["queryPlanner"]["winningPlan"]))
+        ok = "COLLSCAN" not in stages
+        print(f"{'ok ' if ok else 'FAIL'} {route:<28} {collection:<14} {' > '.join(stages)}")
+        if not ok:
+            failures.append(route)
+    return failures
+
+
+def main() -> int:
+    failures = asyncio.run(check_plans(db))
+    client.close()
+    if failures:
+        print(f"\n{len(failures)} query shape(s) fell back to COLLSCAN: {', '.join(failures)}")
+        return 1
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
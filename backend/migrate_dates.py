@@ -0,0 +1,192 @@
+"""Convert ISO-string timestamps to native BSON dates.
+
+Usage (from ``backend/``)::
+
+    python migrate_dates.py --dry-run        # count documents still holding strings
+    python migrate_dates.py --batch-size 1000
+
+Walks every collection in ``_id`` order and rewrites the string values of
+``DATE_FIELDS`` with one ``bulk_write`` per batch. Each update is conditional
+on the field still holding the string that was read, so the script is
+idempotent and safe to re-run or to run while the API is serving. It also
+backfills ``read_at`` on notifications that were read before the field
+existed, so the TTL index can expire them, and the posting owner's id on
+applications (``employer_id``) and proposals (``client_id``) sent before
+submissions carried it, so status changes take the single-write path.
+
+Before creating the indexes it deletes all but the earliest application per
+job and applicant (and proposal per project and freelancer), which would stop
+the unique indexes from building, and lists email addresses shared by several
+users; those need merging by hand and make the script exit non-zero. The API
+refuses to start while any unique index is missing.
+"""
+import argparse
+import asyncio
+import sys
+from datetime import datetime, timezone
+
+from pymongo import UpdateOne
+
+from server import SUBMISSION_REPOSITORIES, SUBMISSIONS, client, db, ensure_indexes, logger
+
+DATE_FIELDS = {
+    "users": ("created_at", "updated_at"),
+    "jobs": ("created_at", "updated_at", "last_activity_at"),
+    "jobs_archive": ("created_at", "updated_at", "last_activity_at"),
+    "projects": ("created_at", "updated_at", "last_activity_at"),
+    "projects_archive": ("created_at", "updated_at", "last_activity_at"),
+    "applications": ("created_at", "updated_at"),
+    "proposals": ("created_at", "updated_at"),
+    "notifications": ("created_at", "read_at"),
+}
+
+
+def parse_date(value: str) -> datetime:
+    parsed = datetime.fromisoformat(value.replace("Z", "+00:00"))
+    return parsed if parsed.tzinfo else parsed.replace(tzinfo=timezone.utc)
+
+
+async def batches(collection, query: dict, projection: dict, batch_size: int):
+    """Yield matching documents in ``_id`` order, one batch at a time."""
+    last_id = None
+    while True:
+        page_query = query if last_id is None else {**query, "_id": {"$gt": last_id}}
+        batch = await collection.find(page_query, projection).sort("_id", 1).limit(batch_size).to_list(batch_size)
+        if not batch:
+            return
+        yield batch
+        last_id = batch[-1]["_id"]
+
+
+async def convert_collection(collection, fields: tuple, batch_size: int) -> tuple:
+    """Returns ``(converted, unparseable)`` document counts."""
+    query = {"$or": [{field: {"$type": "string"}} for field in fields]}
+    converted = unparseable = 0
+    async for batch in batches(collection, query, {field: 1 for field in fields}, batch_size):
+        ops = []
+        for doc in batch:
+            current, updates = {}, {}
+            for field in fields:
+                value = doc.get(field)
+                if not isinstance(value, str):
+                    continue
+                try:
+                    updates[field] = parse_date(value)
+                except ValueError:
+                    logger.warning("%s %s: cannot parse %s=%r", collection.name, doc["_id"], field, value)
+                    continue
+                current[field] = value
+            if updates:
+                ops.append(UpdateOne({"_id": doc["_id"], **current}, {"$set": updates}))
+            else:
+                unparseable += 1
+        if ops:
+            result = await collection.bulk_write(ops, ordered=False)
+            converted += result.modified_count
+    return converted, unparseable
+
+
+async def backfill_read_at(collection, batch_size: int) -> int:
+    query = {"is_read": True, "read_at": {"$exists": False}}
+    filled = 0
+    async for batch in batches(collection, query, {"created_at": 1}, batch_size):
+        ops = [UpdateOne({"_id": doc["_id"], "read_at": {"$exists": False}}, {"$set": {"read_at": doc["created_at"]}})
+               for doc in batch if isinstance(doc.get("created_at"), datetime)]
+        if ops:
+            filled += (await collection.bulk_write(ops, ordered=False)).modified_count
+    return filled
+
+
+# submissions collection -> (posting field, posting collection, owner field)
+OWNER_FIELDS = {
+    "applications": ("job_id", "jobs", "employer_id"),
+    "proposals": ("project_id", "projects", "client_id"),
+}
+
+
+async def backfill_owners(database, name: str, batch_size: int) -> int:
+    posting_field, postings, owner_field = OWNER_FIELDS[name]
+    query = {owner_field: {"$exists": False}}
+    filled = 0
+    async for batch in batches(database[name], query, {posting_field: 1}, batch_size):
+        posting_ids = list({doc[posting_field] for doc in batch})
+        owners = {doc["id"]: doc[owner_field] async for doc in database[postings].find(
+            {"id": {"$in": posting_ids}}, {"_id": 0, "id": 1, owner_field: 1})}
+        ops = [UpdateOne({"_id": doc["_id"], **query}, {"$set": {owner_field: owners[doc[posting_field]]}})
+               for doc in batch if doc[posting_field] in owners]
+        if ops:
+            filled += (await database[name].bulk_write(ops, ordered=False)).modified_count
+    return filled
+
+
+def duplicates(collection, *fields: str):
+    """Groups of documents sharing ``fields``, each with its ``_id``s oldest first."""
+    return collection.aggregate([
+        {"$sort": {"created_at": 1, "_id": 1}},
+        {"$group": {"_id": {field: f"${field}" for field in fields}, "ids": {"$push": "$_id"}, "n": {"$sum": 1}}},
+        {"$match": {"n": {"$gt": 1}}},
+    ], allowDiskUse=True)
+
+
+async def dedupe_submissions(database, kind: str, dry_run: bool) -> int:
+    repo = SUBMISSION_REPOSITORIES[kind]
+    collection = database[repo.collection]
+    removed, postings = 0, set()
+    async for group in duplicates(collection, repo.posting_field, repo.submitter_field):
+        if dry_run:
+            removed += group["n"] - 1
+            continue
+        removed += (await collection.delete_many({"_id": {"$in": group["ids"][1:]}})).deleted_count
+        postings.add(group["_id"][repo.posting_field])
+    if postings:
+        # Counts that no longer add up to the counter are rebuilt on the next dashboard read
+        await database[repo.postings.collection].update_many(
+            {"id": {"$in": list(postings)}}, {"$unset": {"status_counts": ""}})
+    return removed
+
+
+async def duplicate_emails(database) -> list:
+    return [group["_id"]["email"] async for group in duplicates(database.users, "email")]
+
+
+async def migrate(database, batch_size: int, dry_run: bool) -> int:
+    """Returns the number of problems left for a person to fix."""
+    problems = 0
+    for name, fields in DATE_FIELDS.items():
+        collection = database[name]
+        if dry_run:
+            pending = await collection.count_documents({"$or": [{field: {"$type": "string"}} for field in fields]})
+            print(f"{name:<18} {pending} document(s) with string dates")
+            continue
+        converted, unparseable = await convert_collection(collection, fields, batch_size)
+        problems += unparseable
+        print(f"{name:<18} converted {converted}" + (f", {unparseable} unparseable" if unparseable else ""))
+    if not dry_run:
+        print(f"{'notifications':<18} backfilled read_at on {await backfill_read_at(database.notifications, batch_size)}")
+        for name, (_, _, owner_field) in OWNER_FIELDS.items():
+            print(f"{name:<18} backfilled {owner_field} on {await backfill_owners(database, name, batch_size)}")
+    for kind, (name, _) in SUBMISSIONS.items():
+        removed = await dedupe_submissions(database, kind, dry_run)
+        print(f"{name:<18} {'would remove' if dry_run else 'removed'} {removed} duplicate(s)")
+    emails = await duplicate_emails(database)
+    for email in emails:
+        logger.warning("users: %s is registered more than once; merge the accounts by hand", email)
+    problems += len(emails)
+    if not dry_run:
+        # The TTL index on read_at only acts on native dates, so create it once they exist
+        await ensure_indexes(database)
+    return problems
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--batch-size", type=int, default=1000)
+    parser.add_argument("--dry-run", action="store_true")
+    args = parser.parse_args()
+    unparseable = asyncio.run(migrate(db, args.batch_size, args.dry_run))
+    client.close()
+    return 1 if unparseable else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
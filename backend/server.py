@@ -1,26 +1,319 @@
-from fastapi import FastAPI, APIRouter, HTTPException, Depends, status
+from fastapi import FastAPI, APIRouter, HTTPException, Depends, Query, Request, Response, status
 from fastapi.security import HTTPBearer, HTTPAuthorizationCredentials
 from dotenv import load_dotenv
+from fastapi.responses import PlainTextResponse, StreamingResponse
 from starlette.middleware.cors import CORSMiddleware
 from motor.motor_asyncio import AsyncIOMotorClient
+from pymongo import ASCENDING, DESCENDING, ReturnDocument, UpdateOne
+from pymongo import monitoring
+from pymongo.errors import DuplicateKeyError, ServerSelectionTimeoutError
+import io
 import os
+import csv
+import asyncio
 import logging
 from pathlib import Path
-from pydantic import BaseModel, Field, ConfigDict, EmailStr
-from typing import List, Optional
+from pydantic import BaseModel, Field, ConfigDict, EmailStr, TypeAdapter
+from typing import Dict, List, Literal, Optional
+import re
+import math
 import uuid
+import time
+import json
+import base64
+import hashlib
+import threading
+from contextvars import ContextVar
+from collections import OrderedDict
 from datetime import datetime, timezone, timedelta
+from concurrent.futures import ThreadPoolExecutor, ProcessPoolExecutor
 import jwt
 from passlib.context import CryptContext
+import numpy as np
+import orjson
 
 ROOT_DIR = Path(__file__).parent
 load_dotenv(ROOT_DIR / '.env')
 
+logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(name)s - %(levelname)s - %(message)s')
+logger = logging.getLogger(__name__)
+
+# Requests slower than this are logged with their DB time share and query shapes
+SLOW_REQUEST_MS = float(os.environ.get('SLOW_REQUEST_MS', 500))
+
+# ============ Metrics ============
+
+LATENCY_BUCKETS = (0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+
+class Histogram:
+    __slots__ = ("counts", "sum", "count")
+
+    def __init__(self):
+        self.counts = [0] * len(LATENCY_BUCKETS)
+        self.sum = 0.0
+        self.count = 0
+
+    def observe(self, seconds: float):
+        for i, bound in enumerate(LATENCY_BUCKETS):
+            if seconds <= bound:
+                self.counts[i] += 1
+                break
+        self.sum += seconds
+        self.count += 1
+
+class Metrics:
+    """Process-wide request and MongoDB command metrics in Prometheus text format.
+
+    Command events arrive on Motor's executor threads, so updates take a lock.
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.request_latency: dict = {}   # (method, route) -> Histogram
+        self.request_status: dict = {}    # (method, route, status) -> count
+        self.db_latency: dict = {}        # (collection, command, route) -> Histogram
+        self.db_documents: dict = {}      # (collection, command, route) -> count
+        self.db_errors: dict = {}         # (collection, command, route) -> count
+        self.slow_requests = 0
+
+    def observe_request(self, method: str, route: str, status_code: int, seconds: float):
+        with self._lock:
+            self.request_latency.setdefault((method, route), Histogram()).observe(seconds)
+            key = (method, route, str(status_code))
+            self.request_status[key] = self.request_status.get(key, 0) + 1
+
+    def observe_command(self, collection: str, command: str, route: str, seconds: float, documents: int, failed: bool):
+        key = (collection, command, route)
+        with self._lock:
+            self.db_latency.setdefault(key, Histogram()).observe(seconds)
+            self.db_documents[key] = self.db_documents.get(key, 0) + documents
+            if failed:
+                self.db_errors[key] = self.db_errors.get(key, 0) + 1
+
+    @staticmethod
+    def _labels(names: tuple, values: tuple) -> str:
+        def escape(value) -> str:
+            return str(value).replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n")
+        return ",".join(f'{name}="{escape(value)}"' for name, value in zip(names, values))
+
+    def _histogram_lines(self, name: str, help_text: str, names: tuple, series: dict) -> List[str]:
+        lines = [f"# HELP {name} {help_text}", f"# TYPE {name} histogram"]
+        for values, hist in sorted(series.items()):
+            labels = self._labels(names, values)
+            cumulative = 0
+            for bound, count in zip(LATENCY_BUCKETS, hist.counts):
+                cumulative += count
+                lines.append(f'{name}_bucket{{{labels},le="{bound}"}} {cumulative}')
+            lines.append(f'{name}_bucket{{{labels},le="+Inf"}} {hist.count}')
+            lines.append(f"{name}_sum{{{labels}}} {hist.sum}")
+            lines.append(f"{name}_count{{{labels}}} {hist.count}")
+        return lines
+
+    def _counter_lines(self, name: str, help_text: str, names: tuple, series: dict) -> List[str]:
+        lines = [f"# HELP {name} {help_text}", f"# TYPE {name} counter"]
+        for values, count in sorted(series.items()):
+            lines.append(f"{name}{{{self._labels(names, values)}}} {count}")
+        return lines
+
+    def render(self, gauges: Optional[dict] = None) -> str:
+        with self._lock:
+            lines = self._histogram_lines("http_request_duration_seconds", "Time to response start per route.",
+                                          ("method", "route"), self.request_latency)
+            lines += self._counter_lines("http_requests_total", "Responses per route and status.",
+                                         ("method", "route", "status"), self.request_status)
+            lines += self._histogram_lines("mongodb_command_duration_seconds", "MongoDB command round trip time.",
+                                           ("collection", "command", "route"), self.db_latency)
+            lines += self._counter_lines("mongodb_command_documents_total", "Documents returned or written.",
+                                         ("collection", "command", "route"), self.db_documents)
+            lines += self._counter_lines("mongodb_command_errors_total", "Failed MongoDB commands.",
+                                         ("collection", "command", "route"), self.db_errors)
+            lines += ["# TYPE http_slow_requests_total counter", f"http_slow_requests_total {self.slow_requests}"]
+        for component, values in (gauges or {}).items():
+            for key, value in values.items():
+                if isinstance(value, (int, float)) and not isinstance(value, bool):
+                    lines.append(f"wallxy_{component}_{key} {value}")
+        return "\n".join(lines) + "\n"
+
+metrics = Metrics()
+
+# Per-request state shared with the command listener (Motor copies the context into its executor threads)
+request_state: ContextVar[Optional[dict]] = ContextVar("request_state", default=None)
+
+def query_shape(value):
+    """Replace literal values with "?" so queries group by structure, not by data."""
+    if isinstance(value, dict):
+        return {k: query_shape(v) for k, v in value.items()}
+    if isinstance(value, list):
+        return [query_shape(v) for v in value[:1]]
+    return "?"
+
+SHAPE_FIELDS = ("filter", "sort", "query", "updates", "deletes", "pipeline")
+
+class CommandMetricsListener(monitoring.CommandListener):
+    """Records per-collection, per-command timings tagged with the calling route."""
+
+    def __init__(self):
+        self._pending: dict = {}
+        self._lock = threading.Lock()
+
+    def started(self, event):
+        command = event.command
+        collection = command.get(event.command_name)
+        if event.command_name == "getMore":
+            collection = command.get("collection")
+        if not isinstance(collection, str):
+            collection = "-"
+        state = request_state.get()
+        shape = None
+        if state is not None:
+            shape = {k: query_shape(command[k]) for k in SHAPE_FIELDS if k in command}
+        with self._lock:
+            self._pending[(event.connection_id, event.request_id)] = (collection, state, shape)
+
+    def _finish(self, event, documents: int, failed: bool):
+        with self._lock:
+            collection, state, shape = self._pending.pop((event.connection_id, event.request_id), ("-", None, None))
+        if collection == "-" and event.command_name in ("hello", "isMaster", "ping", "endSessions", "saslStart", "saslContinue"):
+            return
+        seconds = event.duration_micros / 1_000_000
+        route = "-"
+        if state is not None:
+            route = state["route"]()
+            state["db_seconds"] += seconds
+            state["queries"].append((collection, event.command_name, shape, round(seconds * 1000, 2)))
+        metrics.observe_command(collection, event.command_name, route, seconds, documents, failed)
+
+    def succeeded(self, event):
+        reply = event.reply or {}
+        cursor = reply.get("cursor")
+        if cursor is not None:
+            documents = len(cursor.get("firstBatch", cursor.get("nextBatch", ())))
+        elif event.command_name == "findAndModify":
+            documents = 1 if reply.get("value") else 0
+        else:
+            documents = reply.get("nModified", reply.get("n", 0)) or 0
+        self._finish(event, documents, failed=False)
+
+    def failed(self, event):
+        self._finish(event, 0, failed=True)
+
+command_listener = CommandMetricsListener()
+
+class MetricsMiddleware:
+    """ASGI middleware timing each request to response start, labelled by route template.
+
+    Timing stops at response start so streamed bodies (SSE, exports) don't skew
+    the histograms. An unhandled exception is recorded as a 500 here, because
+    Starlette sends that response from outside this middleware.
+    """
+
+    def __init__(self, app):
+        self.app = app
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            return await self.app(scope, receive, send)
+        start = time.perf_counter()
+
+        def route_name() -> str:
+            route = scope.get("route")
+            return getattr(route, "path", None) or "unmatched"
+
+        state = {"route": route_name, "db_seconds": 0.0, "queries": []}
+        token = request_state.set(state)
+
+        started = False
+
+        async def send_wrapper(message):
+            nonlocal started
+            if message["type"] == "http.response.start":
+                started = True
+                self._record(scope, state, message["status"], time.perf_counter() - start)
+            await send(message)
+
+        try:
+            await self.app(scope, receive, send_wrapper)
+        except Exception:
+            if not started:
+                self._record(scope, state, 500, time.perf_counter() - start)
+            raise
+        finally:
+            request_state.reset(token)
+
+    @staticmethod
+    def _record(scope, state, status_code: int, seconds: float):
+        route = state["route"]()
+        metrics.observe_request(scope["method"], route, status_code, seconds)
+        if seconds * 1000 >= SLOW_REQUEST_MS:
+            metrics.slow_requests += 1
+            endpoint = scope.get("endpoint")
+            db_seconds = state["db_seconds"]
+            logger.warning(
+                "Slow request %s %s handler=%s status=%s total=%.1fms db=%.1fms (%.0f%%) queries=%s",
+                scope["method"], route, getattr(endpoint, "__name__", "-"), status_code, seconds * 1000,
+                db_seconds * 1000, 100 * db_seconds / seconds if seconds else 0,
+                json.dumps(state["queries"], default=str),
+            )
+
 # MongoDB connection
 mongo_url = os.environ['MONGO_URL']
-client = AsyncIOMotorClient(mongo_url)
+# Dates are stored as native BSON dates and come back as timezone-aware UTC datetimes
+client = AsyncIOMotorClient(mongo_url, tz_aware=True, event_listeners=[command_listener])
 db = client[os.environ['DB_NAME']]
 
+# Indexes are declared below and created idempotently at startup. Either way startup
+# fails if a declared unique index is missing: duplicate protection relies on them.
+CREATE_INDEXES_ON_STARTUP = os.environ.get('CREATE_INDEXES_ON_STARTUP', 'true').lower() == 'true'
+
+# Pagination
+DEFAULT_PAGE_SIZE = int(os.environ.get('DEFAULT_PAGE_SIZE', 50))
+MAX_PAGE_SIZE = int(os.environ.get('MAX_PAGE_SIZE', 100))
+
+# Full-text search
+SEARCH_INDEX_ON_STARTUP = os.environ.get('SEARCH_INDEX_ON_STARTUP', 'true').lower() == 'true'
+SEARCH_MAX_RESULTS = int(os.environ.get('SEARCH_MAX_RESULTS', 50))
+
+# View counters are buffered in memory and flushed with one bulk_write per collection
+VIEW_FLUSH_INTERVAL = float(os.environ.get('VIEW_FLUSH_INTERVAL', 5))  # seconds
+
+# Anonymous /jobs and /projects listings are cached as encoded bodies
+LISTING_CACHE_MAX_BYTES = int(os.environ.get('LISTING_CACHE_MAX_BYTES', 32 * 1024 * 1024))
+LISTING_CACHE_TTL = float(os.environ.get('LISTING_CACHE_TTL', 30))  # seconds, bounds counter staleness
+
+# List endpoints project model fields and encode trusted DB rows without per-row validation
+FAST_SERIALIZATION = os.environ.get('FAST_SERIALIZATION', 'true').lower() == 'true'
+
+# Streaming exports read the cursor in batches of this many rows
+EXPORT_BATCH_SIZE = int(os.environ.get('EXPORT_BATCH_SIZE', 500))
+
+# Upper bound on status changes accepted by one bulk request
+MAX_BULK_UPDATES = int(os.environ.get('MAX_BULK_UPDATES', 500))
+
+# Notification push (Server-Sent Events)
+SSE_HEARTBEAT_INTERVAL = float(os.environ.get('SSE_HEARTBEAT_INTERVAL', 15))  # seconds
+SSE_QUEUE_SIZE = int(os.environ.get('SSE_QUEUE_SIZE', 100))  # per-connection backlog before it is dropped
+
+# Domain events (submissions, status changes) become notifications in background batches
+EVENT_QUEUE_SIZE = int(os.environ.get('EVENT_QUEUE_SIZE', 10000))  # events beyond this are dropped and counted
+EVENT_BATCH_SIZE = int(os.environ.get('EVENT_BATCH_SIZE', 100))
+EVENT_FLUSH_INTERVAL = float(os.environ.get('EVENT_FLUSH_INTERVAL', 0.05))  # max seconds an event waits for a batch
+
+# Freelancer match ranking
+MATCH_INDEX_ON_STARTUP = os.environ.get('MATCH_INDEX_ON_STARTUP', 'true').lower() == 'true'
+MATCH_MAX_RESULTS = int(os.environ.get('MATCH_MAX_RESULTS', 50))
+
+# Filter sidebar facet counts are cached for this long unless a job write drops them first
+FACET_CACHE_TTL = float(os.environ.get('FACET_CACHE_TTL', 60))  # seconds
+
+# Working-set compaction: read notifications expire this long after being read (0 keeps them),
+# archive_postings.py moves postings that have been inactive this long to *_archive collections
+READ_NOTIFICATION_TTL_DAYS = float(os.environ.get('READ_NOTIFICATION_TTL_DAYS', 30))
+ARCHIVE_AFTER_DAYS = float(os.environ.get('ARCHIVE_AFTER_DAYS', 90))
+
+# Dashboard
+DASHBOARD_MAX_POSTINGS = int(os.environ.get('DASHBOARD_MAX_POSTINGS', 100))
+DASHBOARD_RECENT_ACTIVITY = int(os.environ.get('DASHBOARD_RECENT_ACTIVITY', 10))
+
 # JWT Configuration
 SECRET_KEY = os.environ.get('JWT_SECRET_KEY', 'your-secret-key-change-in-production')
 ALGORITHM = "HS256"
@@ -29,6 +322,18 @@ ACCESS_TOKEN_EXPIRE_MINUTES = 60 * 24 * 7  # 7 days
 # Password hashing
 pwd_context = CryptContext(schemes=["bcrypt"], deprecated="auto")
 security = HTTPBearer()
+optional_security = HTTPBearer(auto_error=False)
+
+# bcrypt runs on a dedicated worker pool so logins don't block the event loop
+PASSWORD_HASH_EXECUTOR = os.environ.get('PASSWORD_HASH_EXECUTOR', 'thread')  # thread or process
+PASSWORD_HASH_WORKERS = int(os.environ.get('PASSWORD_HASH_WORKERS', os.cpu_count() or 4))
+PASSWORD_HASH_MAX_PENDING = int(os.environ.get('PASSWORD_HASH_MAX_PENDING', PASSWORD_HASH_WORKERS * 8))
+
+# Authenticated-principal cache
+PRINCIPAL_CACHE_SIZE = int(os.environ.get('PRINCIPAL_CACHE_SIZE', 10000))
+PRINCIPAL_CACHE_TTL = float(os.environ.get('PRINCIPAL_CACHE_TTL', 60))  # seconds
+# When enabled, id/user_type travel in the token so most routes skip the user lookup entirely
+PRINCIPAL_CLAIMS_IN_TOKEN = os.environ.get('PRINCIPAL_CLAIMS_IN_TOKEN', 'false').lower() == 'true'
 
 # Create the main app
 app = FastAPI()
@@ -36,6 +341,10 @@ api_router = APIRouter(prefix="/api")
 
 # ============ Models ============
 
+# Values a client may set on an application or proposal. A closed set, because each one
+# also becomes a key under the posting's status_counts.
+SubmissionStatus = Literal["pending", "reviewed", "shortlisted", "interview", "accepted", "rejected", "withdrawn"]
+
 class UserCreate(BaseModel):
     email: EmailStr
     password: str
@@ -64,6 +373,11 @@ class User(BaseModel):
     created_at: datetime = Field(default_factory=lambda: datetime.now(timezone.utc))
     updated_at: datetime = Field(default_factory=lambda: datetime.now(timezone.utc))
 
+class Principal(BaseModel):
+    """The subset of a user that authorization checks need."""
+    id: str
+    user_type: str
+
 class Token(BaseModel):
     access_token: str
     token_type: str
@@ -148,7 +462,7 @@ class JobApplicationCreate(BaseModel):
     resume_url: Optional[str] = None
 
 class ApplicationUpdate(BaseModel):
-    status: str
+    status: SubmissionStatus
 
 class Proposal(BaseModel):
     model_config = ConfigDict(extra="ignore")
@@ -170,7 +484,75 @@ class ProposalCreate(BaseModel):
 
 # NEW: Model for updating proposal status
 class ProposalUpdate(BaseModel):
+    status: SubmissionStatus
+
+class PublicProfile(BaseModel):
+    """What other users may see of a profile: no email, never the password hash."""
+    model_config = ConfigDict(extra="ignore")
+    id: str
+    full_name: str
+    avatar_url: Optional[str] = None
+    user_type: str
+    location: Optional[str] = None
+    skills: List[str] = Field(default_factory=list)
+    experience_level: Optional[str] = None
+    hourly_rate: Optional[float] = None
+    rating: float = 0.0
+    verification_status: str = "unverified"
+
+class ExpandedJobApplication(JobApplication):
+    applicant: Optional[PublicProfile] = None
+
+class ExpandedProposal(Proposal):
+    freelancer: Optional[PublicProfile] = None
+
+class StatusChange(BaseModel):
+    id: str
+    status: SubmissionStatus
+
+class BulkStatusUpdate(BaseModel):
+    updates: List[StatusChange]
+
+class BulkStatusResult(BaseModel):
+    matched: int
+    modified: int
+
+class SearchHit(BaseModel):
+    type: str  # job or project
+    score: float
+    item: dict
+
+class FreelancerMatch(BaseModel):
+    user: PublicProfile
+    score: float
+    skill_score: float
+    budget_score: float
+    experience_score: float
+
+class PostingSummary(BaseModel):
+    id: str
+    kind: str  # job or project
+    title: str
     status: str
+    views: int = 0
+    total: int = 0
+    counts: Dict[str, int] = Field(default_factory=dict)  # applications/proposals by status
+    last_activity_at: Optional[str] = None
+    created_at: Optional[str] = None
+
+class Dashboard(BaseModel):
+    user_type: str
+    postings: List[PostingSummary] = Field(default_factory=list)
+    submissions: Dict[str, Dict[str, int]] = Field(default_factory=dict)  # my applications/proposals by status
+    recent_activity: List[dict] = Field(default_factory=list)
+
+class JobFacets(BaseModel):
+    """Active-job counts per value of each sidebar filter."""
+    total: int = 0
+    category: Dict[str, int] = Field(default_factory=dict)
+    job_type: Dict[str, int] = Field(default_factory=dict)
+    experience_level: Dict[str, int] = Field(default_factory=dict)
+    location: Dict[str, int] = Field(default_factory=dict)
 
 class Notification(BaseModel):
     model_config = ConfigDict(extra="ignore")
@@ -181,8 +563,101 @@ class Notification(BaseModel):
     type: str
     link: Optional[str] = None
     is_read: bool = False
+    read_at: Optional[datetime] = None
     created_at: datetime = Field(default_factory=lambda: datetime.now(timezone.utc))
 
+# ============ Indexes ============
+
+# collection -> [(keys, options)]. Every hot query filters on non-_id fields, so each
+# route's filter/sort shape needs an index here (see check_query_plans.py).
+INDEXES = {
+    "users": [
+        ([("id", ASCENDING)], {"unique": True}),
+        ([("email", ASCENDING)], {"unique": True}),
+        ([("user_type", ASCENDING)], {}),
+    ],
+    "jobs": [
+        ([("id", ASCENDING)], {"unique": True}),
+        ([("status", ASCENDING), ("created_at", DESCENDING), ("id", DESCENDING)], {}),
+        ([("status", ASCENDING), ("category", ASCENDING), ("created_at", DESCENDING), ("id", DESCENDING)], {}),
+        ([("status", ASCENDING), ("job_type", ASCENDING), ("created_at", DESCENDING), ("id", DESCENDING)], {}),
+        ([("status", ASCENDING), ("experience_level", ASCENDING), ("created_at", DESCENDING), ("id", DESCENDING)], {}),
+        ([("status", ASCENDING), ("location", ASCENDING), ("created_at", DESCENDING), ("id", DESCENDING)], {}),
+        ([("status", ASCENDING), ("skills", ASCENDING), ("created_at", DESCENDING), ("id", DESCENDING)], {}),
+        # Equality, sort, then range: salary bounds are checked on index keys without fetching documents
+        ([("status", ASCENDING), ("created_at", DESCENDING), ("id", DESCENDING),
+          ("salary_max", ASCENDING), ("salary_min", ASCENDING)], {}),
+        ([("employer_id", ASCENDING), ("created_at", DESCENDING)], {}),
+        ([("status", ASCENDING), ("updated_at", ASCENDING)], {}),  # archival scan
+    ],
+    "jobs_archive": [
+        ([("id", ASCENDING)], {"unique": True}),
+        ([("employer_id", ASCENDING), ("created_at", DESCENDING)], {}),
+    ],
+    "projects": [
+        ([("id", ASCENDING)], {"unique": True}),
+        ([("status", ASCENDING), ("created_at", DESCENDING), ("id", DESCENDING)], {}),
+        ([("status", ASCENDING), ("category", ASCENDING), ("created_at", DESCENDING), ("id", DESCENDING)], {}),
+        ([("status", ASCENDING), ("budget_type", ASCENDING), ("created_at", DESCENDING), ("id", DESCENDING)], {}),
+        ([("status", ASCENDING), ("created_at", DESCENDING), ("id", DESCENDING),
+          ("budget_max", ASCENDING), ("budget_min", ASCENDING)], {}),
+        ([("client_id", ASCENDING), ("created_at", DESCENDING)], {}),
+        ([("status", ASCENDING), ("updated_at", ASCENDING)], {}),  # archival scan
+    ],
+    "projects_archive": [
+        ([("id", ASCENDING)], {"unique": True}),
+        ([("client_id", ASCENDING), ("created_at", DESCENDING)], {}),
+    ],
+    "applications": [
+        ([("id", ASCENDING)], {"unique": True}),
+        ([("job_id", ASCENDING), ("applicant_id", ASCENDING)], {"unique": True}),
+        ([("job_id", ASCENDING), ("created_at", DESCENDING), ("id", DESCENDING)], {}),
+        ([("applicant_id", ASCENDING), ("created_at", DESCENDING), ("id", DESCENDING)], {}),
+    ],
+    "proposals": [
+        ([("id", ASCENDING)], {"unique": True}),
+        ([("project_id", ASCENDING), ("freelancer_id", ASCENDING)], {"unique": True}),
+        ([("project_id", ASCENDING), ("created_at", DESCENDING), ("id", DESCENDING)], {}),
+        ([("freelancer_id", ASCENDING), ("created_at", DESCENDING), ("id", DESCENDING)], {}),
+    ],
+    "notifications": [
+        ([("id", ASCENDING)], {"unique": True}),
+        # id breaks created_at ties when the stream replays a backlog
+        ([("user_id", ASCENDING), ("created_at", DESCENDING), ("id", DESCENDING)], {}),
+        ([("user_id", ASCENDING), ("is_read", ASCENDING)], {}),
+    ] + ([
+        # TTL: the server deletes read notifications READ_NOTIFICATION_TTL_DAYS after read_at.
+        # Changing the TTL on an existing index needs a collMod (or drop and recreate).
+        ([("read_at", ASCENDING)], {"expireAfterSeconds": int(READ_NOTIFICATION_TTL_DAYS * 86400)}),
+    ] if READ_NOTIFICATION_TTL_DAYS > 0 else []),
+}
+
+async def ensure_indexes(database) -> List[str]:
+    """Create every declared index; existing ones with the same spec are a no-op."""
+    created = []
+    for collection, specs in INDEXES.items():
+        for keys, options in specs:
+            try:
+                created.append(await database[collection].create_index(keys, **options))
+            except ServerSelectionTimeoutError:
+                logger.exception("MongoDB unreachable, skipping index creation")
+                return created
+            except Exception:
+                logger.exception("Failed to create index %s on %s", keys, collection)
+    return created
+
+async def missing_unique_indexes(database) -> List[str]:
+    """The declared unique indexes ``database`` does not have, as ``collection(field, ...)``."""
+    missing = []
+    for collection, specs in INDEXES.items():
+        wanted = [tuple(field for field, _ in keys) for keys, options in specs if options.get("unique")]
+        if not wanted:
+            continue
+        present = {tuple(field for field, _ in index["key"])
+                   for index in (await database[collection].index_information()).values() if index.get("unique")}
+        missing += [f"{collection}({', '.join(fields)})" for fields in wanted if fields not in present]
+    return missing
+
 # ============ Helper Functions ============
 
 def serialize_doc(doc):
@@ -193,12 +668,154 @@ def serialize_doc(doc):
                 doc[key] = value.isoformat()
     return doc
 
+def isoformat(value):
+    return value.isoformat() if isinstance(value, datetime) else value
+
+class ListCodec:
+    """Encodes lists of Mongo documents as the JSON of ``List[model]``.
+
+    The fast path reads only the model's fields from Mongo, fills in the static
+    defaults pydantic would apply, and hands the rows straight to orjson: DB rows
+    were validated on the way in, so re-validating each one per response is pure
+    overhead. With ``FAST_SERIALIZATION`` off it validates through pydantic instead.
+    """
+
+    def __init__(self, model):
+        self.adapter = TypeAdapter(List[model])
+        self.fields = list(model.model_fields)
+        self.defaults = {}
+        for name, field in model.model_fields.items():
+            if field.default_factory is list:
+                self.defaults[name] = []
+            elif not field.is_required() and field.default_factory is None:
+                self.defaults[name] = field.default
+        if FAST_SERIALIZATION:
+            self.projection = {"_id": 0, **{name: 1 for name in self.fields}}
+        else:
+            self.projection = {"_id": 0}
+
+    def encode(self, docs: List[dict]) -> bytes:
+        if not FAST_SERIALIZATION:
+            return self.adapter.dump_json(self.adapter.validate_python(docs))
+        defaults = self.defaults
+        for doc in docs:
+            for name, value in defaults.items():
+                if name not in doc:
+                    doc[name] = value
+        return orjson.dumps(docs, option=orjson.OPT_NAIVE_UTC)
+
+    def response(self, docs: List[dict], next_cursor: Optional[str] = None) -> Response:
+        headers = {"X-Next-Cursor": next_cursor} if next_cursor else None
+        return Response(content=self.encode(docs), media_type="application/json", headers=headers)
+
+JOB_CODEC = ListCodec(Job)
+PROJECT_CODEC = ListCodec(Project)
+APPLICATION_CODEC = ListCodec(JobApplication)
+PROPOSAL_CODEC = ListCodec(Proposal)
+NOTIFICATION_CODEC = ListCodec(Notification)
+EXPANDED_APPLICATION_CODEC = ListCodec(ExpandedJobApplication)
+EXPANDED_PROPOSAL_CODEC = ListCodec(ExpandedProposal)
+
+# Listings are ordered newest first by (created_at, id); the cursor is the sort key of
+# the last row served, so every page is a single index range scan regardless of depth.
+PAGE_SORT = [("created_at", DESCENDING), ("id", DESCENDING)]
+
+def page_size(limit: int) -> int:
+    return max(1, min(limit, MAX_PAGE_SIZE))
+
+def encode_cursor(doc: dict) -> str:
+    # The cursor keeps the stored type of created_at (native date, or an ISO string on rows
+    # migrate_dates.py has not converted yet) so the keyset comparison stays within one BSON type
+    created_at = doc["created_at"]
+    if isinstance(created_at, datetime):
+        created_at = {"$date": created_at.isoformat()}
+    raw = json.dumps([created_at, doc["id"]], separators=(",", ":")).encode()
+    return base64.urlsafe_b64encode(raw).decode().rstrip("=")
+
+def decode_cursor(cursor: str) -> tuple:
+    try:
+        raw = base64.urlsafe_b64decode(cursor + "=" * (-len(cursor) % 4))
+        created_at, doc_id = json.loads(raw)
+        if isinstance(created_at, dict):
+            created_at = datetime.fromisoformat(created_at["$date"])
+        if not isinstance(created_at, (str, datetime)) or not isinstance(doc_id, str):
+            raise ValueError
+    except (ValueError, TypeError, KeyError):
+        raise HTTPException(status_code=400, detail="Invalid cursor")
+    return created_at, doc_id
+
+async def fetch_page(collection, query: dict, limit: int, cursor: Optional[str],
+                     projection: Optional[dict] = None) -> tuple:
+    """Fetch one keyset page of ``collection``; returns ``(docs, next_cursor)``."""
+    limit = page_size(limit)
+    if cursor:
+        created_at, doc_id = decode_cursor(cursor)
+        after = [
+            {"created_at": {"$lt": created_at}},
+            {"created_at": created_at, "id": {"$lt": doc_id}},
+        ]
+        if isinstance(created_at, datetime):
+            # Dates sort above strings, so rows migrate_dates.py has not converted yet
+            # follow the last date row; $lt on a date never reaches them
+            after.append({"created_at": {"$type": "string"}})
+        query = {**query, "$or": after}
+    docs = await collection.find(query, projection or {"_id": 0}).sort(PAGE_SORT).limit(limit + 1).to_list(limit + 1)
+    next_cursor = None
+    if len(docs) > limit:
+        docs = docs[:limit]
+        next_cursor = encode_cursor(docs[-1])
+    return docs, next_cursor
+
 def hash_password(password: str) -> str:
     return pwd_context.hash(password)
 
 def verify_password(plain_password: str, hashed_password: str) -> bool:
     return pwd_context.verify(plain_password, hashed_password)
 
+class PasswordHashPool:
+    """Runs bcrypt hashing/verification on a bounded worker pool.
+
+    At most ``max_pending`` calls may be in flight (running or queued); anything
+    beyond that is rejected with a 503 instead of piling up behind the workers.
+    """
+
+    def __init__(self, kind: str = "thread", workers: int = 4, max_pending: int = 32):
+        if kind == "process":
+            self._executor = ProcessPoolExecutor(max_workers=workers)
+        else:
+            self._executor = ThreadPoolExecutor(max_workers=workers, thread_name_prefix="pwd-hash")
+        self.kind = kind
+        self.workers = workers
+        self.max_pending = max_pending
+        self.pending = 0
+        self.rejected = 0
+
+    async def _run(self, fn, *args):
+        if self.pending >= self.max_pending:
+            self.rejected += 1
+            raise HTTPException(status_code=503, detail="Server busy, please retry", headers={"Retry-After": "1"})
+        self.pending += 1
+        try:
+            loop = asyncio.get_running_loop()
+            return await loop.run_in_executor(self._executor, fn, *args)
+        finally:
+            self.pending -= 1
+
+    async def hash(self, password: str) -> str:
+        return await self._run(hash_password, password)
+
+    async def verify(self, plain_password: str, hashed_password: str) -> bool:
+        return await self._run(verify_password, plain_password, hashed_password)
+
+    def stats(self) -> dict:
+        return {"kind": self.kind, "workers": self.workers, "max_pending": self.max_pending,
+                "pending": self.pending, "rejected": self.rejected}
+
+    def shutdown(self):
+        self._executor.shutdown(wait=False, cancel_futures=True)
+
+password_pool = PasswordHashPool(PASSWORD_HASH_EXECUTOR, PASSWORD_HASH_WORKERS, PASSWORD_HASH_MAX_PENDING)
+
 def create_access_token(data: dict, expires_delta: timedelta = None):
     to_encode = data.copy()
     if expires_delta:
@@ -209,30 +826,1313 @@ def create_access_token(data: dict, expires_delta: timedelta = None):
     encoded_jwt = jwt.encode(to_encode, SECRET_KEY, algorithm=ALGORITHM)
     return encoded_jwt
 
-async def get_current_user(credentials: HTTPAuthorizationCredentials = Depends(security)) -> User:
-    token = credentials.credentials
+class PrincipalCache:
+    """Size-bounded LRU of authenticated users with a per-entry TTL."""
+
+    def __init__(self, maxsize: int = 10000, ttl: float = 60.0):
+        self.maxsize = maxsize
+        self.ttl = ttl
+        self._entries: "OrderedDict[str, tuple]" = OrderedDict()
+        self.hits = 0
+        self.misses = 0
+
+    def get(self, user_id: str) -> Optional[User]:
+        entry = self._entries.get(user_id)
+        if entry is None or entry[0] < time.monotonic():
+            if entry is not None:
+                del self._entries[user_id]
+            self.misses += 1
+            return None
+        self._entries.move_to_end(user_id)
+        self.hits += 1
+        return entry[1]
+
+    def put(self, user: User):
+        self._entries[user.id] = (time.monotonic() + self.ttl, user)
+        self._entries.move_to_end(user.id)
+        while len(self._entries) > self.maxsize:
+            self._entries.popitem(last=False)
+
+    def invalidate(self, user_id: str):
+        self._entries.pop(user_id, None)
+
+    def stats(self) -> dict:
+        lookups = self.hits + self.misses
+        return {"size": len(self._entries), "maxsize": self.maxsize, "ttl": self.ttl,
+                "hits": self.hits, "misses": self.misses,
+                "hit_rate": self.hits / lookups if lookups else 0.0}
+
+principal_cache = PrincipalCache(PRINCIPAL_CACHE_SIZE, PRINCIPAL_CACHE_TTL)
+
+def token_claims(user: User) -> dict:
+    claims = {"sub": user.id}
+    if PRINCIPAL_CLAIMS_IN_TOKEN:
+        claims["user_type"] = user.user_type
+    return claims
+
+def decode_token(credentials: HTTPAuthorizationCredentials) -> dict:
     try:
-        payload = jwt.decode(token, SECRET_KEY, algorithms=[ALGORITHM])
-        user_id: str = payload.get("sub")
-        if user_id is None:
-            raise HTTPException(status_code=401, detail="Invalid authentication credentials")
+        payload = jwt.decode(credentials.credentials, SECRET_KEY, algorithms=[ALGORITHM])
     except jwt.ExpiredSignatureError:
         raise HTTPException(status_code=401, detail="Token has expired")
-    except jwt.JWTError:
+    except jwt.PyJWTError:
         raise HTTPException(status_code=401, detail="Could not validate credentials")
-    
+    if payload.get("sub") is None:
+        raise HTTPException(status_code=401, detail="Invalid authentication credentials")
+    return payload
+
+async def load_user(user_id: str) -> User:
+    user = principal_cache.get(user_id)
+    if user is not None:
+        return user
     user_doc = await db.users.find_one({"id": user_id}, {"_id": 0, "password": 0})
     if user_doc is None:
         raise HTTPException(status_code=401, detail="User not found")
-    
     serialize_doc(user_doc)
-    return User(**user_doc)
+    user = User(**user_doc)
+    principal_cache.put(user)
+    return user
+
+async def get_current_user(credentials: HTTPAuthorizationCredentials = Depends(security)) -> User:
+    payload = decode_token(credentials)
+    return await load_user(payload["sub"])
+
+async def get_current_principal(credentials: HTTPAuthorizationCredentials = Depends(security)) -> Principal:
+    """Resolve just id/user_type, straight from the token claims when they are present."""
+    payload = decode_token(credentials)
+    if PRINCIPAL_CLAIMS_IN_TOKEN and payload.get("user_type"):
+        return Principal(id=payload["sub"], user_type=payload["user_type"])
+    user = await load_user(payload["sub"])
+    return Principal(id=user.id, user_type=user.user_type)
+
+# ============ Search Index ============
+
+SEARCH_KINDS = {"job": 0, "project": 1}
+TOKEN_RE = re.compile(r"[a-z0-9][a-z0-9+#]*")
+
+def tokenize(text: Optional[str]) -> List[str]:
+    return TOKEN_RE.findall(text.lower()) if text else []
+
+class SearchIndex:
+    """In-memory inverted index over active jobs and projects, ranked with BM25.
+
+    Term frequencies are field-weighted (BM25F-style): a hit in ``skills`` counts
+    ``skill_weight`` times, a title hit ``title_weight`` times, a description hit
+    once. Every indexed document gets a slot; postings store slot numbers in
+    growable NumPy arrays, so a query scores whole posting lists without a Python
+    loop or rebuilding them after writes. Removed documents leave dead slots
+    behind until enough accumulate to compact.
+    """
+
+    def __init__(self, k1: float = 1.2, b: float = 0.75, title_weight: float = 2.0, skill_weight: float = 3.0):
+        self.k1 = k1
+        self.b = b
+        self.title_weight = title_weight
+        self.skill_weight = skill_weight
+        self._reset()
+
+    def _reset(self):
+        self._slots: dict = {}      # doc_key -> slot
+        self._keys: list = []       # slot -> doc_key, None once removed
+        self._terms: list = []      # slot -> {term: weighted tf}, None once removed
+        self._lengths = np.zeros(1024, dtype=np.float64)
+        self._kinds = np.zeros(1024, dtype=np.int8)
+        self._postings: dict = {}   # term -> [slots ndarray, weighted tfs ndarray, used length]
+        self._df: dict = {}         # term -> live document frequency
+        self._total_length = 0.0
+
+    def __len__(self):
+        return len(self._slots)
+
+    @property
+    def postings_count(self) -> int:
+        return sum(self._df.values())
+
+    def _weighted_terms(self, doc: dict) -> dict:
+        tf: dict = {}
+        for term in tokenize(doc.get("description")):
+            tf[term] = tf.get(term, 0.0) + 1.0
+        for term in tokenize(doc.get("title")):
+            tf[term] = tf.get(term, 0.0) + self.title_weight
+        for skill in doc.get("skills") or []:
+            for term in tokenize(skill):
+                tf[term] = tf.get(term, 0.0) + self.skill_weight
+        return tf
+
+    def add(self, kind: str, doc: dict):
+        """Index (or re-index) ``doc``; non-active postings are dropped from the index."""
+        self.remove(kind, doc["id"])
+        if doc.get("status", "active") != "active":
+            return
+        self._insert((kind, doc["id"]), self._weighted_terms(doc))
+
+    def _insert(self, key: tuple, tf: dict):
+        slot = len(self._keys)
+        if slot == len(self._lengths):
+            self._lengths = np.resize(self._lengths, slot * 2)
+            self._kinds = np.resize(self._kinds, slot * 2)
+        length = sum(tf.values())
+        self._lengths[slot] = length
+        self._kinds[slot] = SEARCH_KINDS[key[0]]
+        self._keys.append(key)
+        self._terms.append(tf)
+        self._slots[key] = slot
+        self._total_length += length
+        for term, freq in tf.items():
+            posting = self._postings.get(term)
+            if posting is None:
+                posting = self._postings[term] = [np.empty(8, dtype=np.int64), np.empty(8, dtype=np.float64), 0]
+            slots, freqs, used = posting
+            if used == len(slots):
+                posting[0] = slots = np.resize(slots, used * 2)
+                posting[1] = freqs = np.resize(freqs, used * 2)
+            slots[used] = slot
+            freqs[used] = freq
+            posting[2] = used + 1
+            self._df[term] = self._df.get(term, 0) + 1
+
+    def remove(self, kind: str, doc_id: str):
+        slot = self._slots.pop((kind, doc_id), None)
+        if slot is None:
+            return
+        self._keys[slot] = None
+        self._kinds[slot] = -1
+        self._total_length -= self._lengths[slot]
+        for term in self._terms[slot]:
+            self._df[term] -= 1
+        self._terms[slot] = None
+        if len(self._keys) > 1024 and len(self._slots) < len(self._keys) // 2:
+            self._compact()
+
+    def _compact(self):
+        live = [(key, self._terms[slot]) for key, slot in self._slots.items()]
+        self._reset()
+        for key, tf in live:
+            self._insert(key, tf)
+
+    def search(self, query: str, kind: Optional[str] = None, limit: int = 20) -> List[tuple]:
+        """Return up to ``limit`` ``(score, kind, id)`` tuples, best first."""
+        n = len(self._slots)
+        if not n or limit < 1:
+            return []
+        size = len(self._keys)
+        lengths = self._lengths[:size]
+        avg_length = self._total_length / n or 1.0
+        k1, b = self.k1, self.b
+        scores = np.zeros(size, dtype=np.float64)
+        norms = None
+        for term in set(tokenize(query)):
+            df = self._df.get(term, 0)
+            if not df:
+                continue
+            if norms is None:
+                norms = k1 * (1 - b) + (k1 * b / avg_length) * lengths
+            idf = math.log(1 + (n - df + 0.5) / (df + 0.5))
+            slots, freqs, used = self._postings[term]
+            slots, freqs = slots[:used], freqs[:used]
+            scores[slots] += (idf * (k1 + 1)) * freqs / (freqs + norms[slots])
+        kinds = self._kinds[:size]
+        if kind is not None:
+            scores[kinds != SEARCH_KINDS[kind]] = 0.0
+        else:
+            scores[kinds < 0] = 0.0
+        # Partitioning the whole array beats collecting the (usually many) matches first
+        if np.count_nonzero(scores) > limit:
+            candidates = np.sort(np.argpartition(scores, size - limit)[size - limit:])
+        else:
+            candidates = np.flatnonzero(scores)
+        candidates = candidates[np.argsort(-scores[candidates], kind="stable")]
+        keys = self._keys
+        return [(float(scores[slot]), keys[slot][0], keys[slot][1]) for slot in candidates]
+
+    def stats(self) -> dict:
+        return {"documents": len(self._slots), "slots": len(self._keys),
+                "terms": sum(1 for df in self._df.values() if df), "postings": self.postings_count}
+
+search_index = SearchIndex()
+
+# Fields the index needs when (re)loading postings from Mongo
+SEARCH_PROJECTION = {"_id": 0, "id": 1, "title": 1, "description": 1, "skills": 1, "status": 1}
+
+async def build_search_index(database):
+    for kind, collection in (("job", database.jobs), ("project", database.projects)):
+        async for doc in collection.find({"status": "active"}, SEARCH_PROJECTION):
+            search_index.add(kind, doc)
+
+# ============ View Counters ============
+
+class ViewCounter:
+    """Write-behind aggregator for ``views`` increments.
+
+    Detail reads bump an in-memory count per posting; a background task flushes
+    the coalesced counts with one unordered ``bulk_write`` per collection.
+    Counts that are buffered or mid-flush are still reported by ``pending`` so
+    responses stay consistent with what will be written.
+    """
+
+    def __init__(self, interval: float = 5.0):
+        self.interval = interval
+        self._buffer: dict = {}     # (collection, id) -> count
+        self._in_flight: dict = {}
+        self._task: Optional[asyncio.Task] = None
+        self.flushes = 0
+        self.flushed_views = 0
+        self.last_flush_ms = 0.0
+        self.errors = 0
+
+    def increment(self, collection: str, doc_id: str) -> int:
+        """Record one view and return the total not yet persisted for this posting."""
+        key = (collection, doc_id)
+        self._buffer[key] = self._buffer.get(key, 0) + 1
+        return self.pending(collection, doc_id)
+
+    def pending(self, collection: str, doc_id: str) -> int:
+        key = (collection, doc_id)
+        return self._buffer.get(key, 0) + self._in_flight.get(key, 0)
+
+    async def flush(self, database):
+        if not self._buffer:
+            return
+        self._in_flight, self._buffer = self._buffer, {}
+        start = time.perf_counter()
+        ops: dict = {}
+        for (collection, doc_id), count in self._in_flight.items():
+            ops.setdefault(collection, []).append(UpdateOne({"id": doc_id}, {"$inc": {"views": count}}))
+        try:
+            for collection, requests in ops.items():
+                await database[collection].bulk_write(requests, ordered=False)
+        except (Exception, asyncio.CancelledError) as exc:
+            # Unordered writes may have partially applied; re-buffering risks a small
+            # over-count, dropping them would lose views outright.
+            for key, count in self._in_flight.items():
+                self._buffer[key] = self._buffer.get(key, 0) + count
+            if isinstance(exc, asyncio.CancelledError):
+                raise
+            self.errors += 1
+            logger.exception("Failed to flush view counters")
+        else:
+            self.flushes += 1
+            self.flushed_views += sum(self._in_flight.values())
+        finally:
+            self._in_flight = {}
+            self.last_flush_ms = (time.perf_counter() - start) * 1000
+
+    async def _run(self, database):
+        while True:
+            await asyncio.sleep(self.interval)
+            await self.flush(database)
+
+    def start(self, database):
+        if self._task is None:
+            self._task = asyncio.create_task(self._run(database))
+
+    async def stop(self, database):
+        if self._task is not None:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
+        await self.flush(database)
+
+    def stats(self) -> dict:
+        return {"pending_postings": len(self._buffer), "pending_views": sum(self._buffer.values()),
+                "flushes": self.flushes, "flushed_views": self.flushed_views,
+                "last_flush_ms": self.last_flush_ms, "errors": self.errors}
+
+view_counter = ViewCounter(VIEW_FLUSH_INTERVAL)
+
+# ============ Listing Cache ============
+
+def freeze(value):
+    """Hashable, order-independent form of a query for use in cache keys."""
+    if isinstance(value, dict):
+        return tuple(sorted((k, freeze(v)) for k, v in value.items()))
+    if isinstance(value, list):
+        return tuple(freeze(v) for v in value)
+    return value
+
+def filter_matches(doc: dict, query: dict) -> bool:
+    """Evaluate a listing filter (equality, ``$gte``/``$lte``, ``$in``, ``$all``) against a document."""
+    for field, condition in query.items():
+        value = doc.get(field)
+        if not isinstance(condition, dict):
+            if value != condition:
+                return False
+            continue
+        for op, arg in condition.items():
+            if op == "$in":
+                ok = value in arg
+            elif op == "$all":
+                ok = isinstance(value, list) and all(item in value for item in arg)
+            elif op in ("$gte", "$lte"):
+                ok = value is not None and (value >= arg if op == "$gte" else value <= arg)
+            else:
+                ok = True  # unknown operator: assume it matches, invalidating too much is safe
+            if not ok:
+                return False
+    return True
+
+class ListingCacheEntry:
+    __slots__ = ("collection", "query", "body", "etag", "next_cursor", "expires")
+
+    def __init__(self, collection: str, query: dict, body: bytes, next_cursor: Optional[str], expires: float):
+        self.collection = collection
+        self.query = query
+        self.body = body
+        self.etag = '"' + hashlib.sha256(body).hexdigest()[:32] + '"'
+        self.next_cursor = next_cursor
+        self.expires = expires
+
+class ListingCache:
+    """Byte-bounded LRU of encoded listing pages keyed by normalized filters.
+
+    Writes invalidate only the entries whose filter matches the written posting
+    or filters on a field the write changed. A per-collection generation stops a page that
+    was read before a write from being stored after it. ``views`` and the
+    applicant/proposal counters are not write-invalidated; the TTL bounds how
+    stale they get.
+    """
+
+    def __init__(self, max_bytes: int = 32 * 1024 * 1024, ttl: float = 30.0):
+        self.max_bytes = max_bytes
+        self.ttl = ttl
+        self._entries: "OrderedDict[tuple, ListingCacheEntry]" = OrderedDict()
+        self._generations: dict = {}
+        self.bytes = 0
+        self.hits = 0
+        self.misses = 0
+        self.not_modified = 0
+        self.invalidations = 0
+
+    @staticmethod
+    def key(collection: str, query: dict, limit: int, cursor: Optional[str]) -> tuple:
+        return (collection, freeze(query), limit, cursor or "")
+
+    def generation(self, collection: str) -> int:
+        return self._generations.get(collection, 0)
+
+    def get(self, key: tuple) -> Optional[ListingCacheEntry]:
+        entry = self._entries.get(key)
+        if entry is None or entry.expires < time.monotonic():
+            if entry is not None:
+                self._drop(key)
+            self.misses += 1
+            return None
+        self._entries.move_to_end(key)
+        self.hits += 1
+        return entry
+
+    def put(self, key: tuple, query: dict, body: bytes, next_cursor: Optional[str], generation: int) -> ListingCacheEntry:
+        entry = ListingCacheEntry(key[0], query, body, next_cursor, time.monotonic() + self.ttl)
+        if generation != self.generation(key[0]) or len(body) > self.max_bytes:
+            return entry
+        self._drop(key)
+        self._entries[key] = entry
+        self.bytes += len(body)
+        while self.bytes > self.max_bytes:
+            self._drop(next(iter(self._entries)))
+        return entry
+
+    def _drop(self, key: tuple):
+        entry = self._entries.pop(key, None)
+        if entry is not None:
+            self.bytes -= len(entry.body)
+
+    def invalidate(self, collection: str, *docs: Optional[dict], changed=()):
+        """Drop cached pages of ``collection`` whose filter matches any of ``docs``.
+
+        Pages filtering on a field in ``changed`` go too: a document may have just left them.
+        """
+        self._generations[collection] = self.generation(collection) + 1
+        docs = [doc for doc in docs if doc]
+        stale = [key for key, entry in self._entries.items()
+                 if entry.collection == collection
+                 and (any(field in changed for field in entry.query)
+                      or any(filter_matches(doc, entry.query) for doc in docs))]
+        for key in stale:
+            self._drop(key)
+        self.invalidations += len(stale)
+
+    def stats(self) -> dict:
+        lookups = self.hits + self.misses
+        return {"entries": len(self._entries), "bytes": self.bytes, "max_bytes": self.max_bytes,
+                "hits": self.hits, "misses": self.misses, "not_modified": self.not_modified,
+                "invalidations": self.invalidations, "hit_rate": self.hits / lookups if lookups else 0.0}
+
+listing_cache = ListingCache(LISTING_CACHE_MAX_BYTES, LISTING_CACHE_TTL)
+
+def etag_matches(request: Request, etag: str) -> bool:
+    header = request.headers.get("if-none-match")
+    if not header:
+        return False
+    return any(tag.strip() in (etag, "*") for tag in header.split(","))
+
+async def cached_listing(request: Request, collection: str, codec: ListCodec, query: dict,
+                         limit: int, cursor: Optional[str]) -> Response:
+    key = listing_cache.key(collection, query, page_size(limit), cursor)
+    entry = listing_cache.get(key)
+    if entry is None:
+        generation = listing_cache.generation(collection)
+        docs, next_cursor = await fetch_page(db[collection], query, limit, cursor, codec.projection)
+        entry = listing_cache.put(key, query, codec.encode(docs), next_cursor, generation)
+    headers = {"ETag": entry.etag, "Cache-Control": "no-cache"}
+    if entry.next_cursor:
+        headers["X-Next-Cursor"] = entry.next_cursor
+    if etag_matches(request, entry.etag):
+        listing_cache.not_modified += 1
+        return Response(status_code=304, headers=headers)
+    return Response(content=entry.body, media_type="application/json", headers=headers)
+
+# ============ Facet Counts ============
+
+FACET_FIELDS = ("category", "job_type", "experience_level", "location")
+
+class FacetCache:
+    """Latest facet result per collection.
+
+    Expires after ``ttl`` or when a write drops it. Concurrent misses share
+    a single aggregation instead of each re-aggregating the collection.
+    """
+
+    def __init__(self, ttl: float = 60.0):
+        self.ttl = ttl
+        self._entries: Dict[str, tuple] = {}  # collection -> (expires, value)
+        self._inflight: Dict[str, asyncio.Task] = {}
+        self._generations: Dict[str, int] = {}
+        self.hits = 0
+        self.misses = 0
+
+    async def get(self, collection: str, compute):
+        entry = self._entries.get(collection)
+        if entry is not None and entry[0] > time.monotonic():
+            self.hits += 1
+            return entry[1]
+        self.misses += 1
+        task = self._inflight.get(collection)
+        if task is None:
+            task = self._inflight[collection] = asyncio.ensure_future(self._compute(collection, compute))
+            task.add_done_callback(lambda _: self._inflight.pop(collection, None))
+        return await asyncio.shield(task)
+
+    async def _compute(self, collection: str, compute):
+        generation = self._generations.get(collection, 0)
+        value = await compute()
+        # A write during the aggregation may not be reflected; serve it once but don't keep it
+        if generation == self._generations.get(collection, 0):
+            self._entries[collection] = (time.monotonic() + self.ttl, value)
+        return value
+
+    def invalidate(self, collection: str):
+        self._generations[collection] = self._generations.get(collection, 0) + 1
+        self._entries.pop(collection, None)
+
+    def stats(self) -> dict:
+        return {"entries": len(self._entries), "ttl": self.ttl, "hits": self.hits, "misses": self.misses}
+
+facet_cache = FacetCache(FACET_CACHE_TTL)
+
+async def aggregate_job_facets() -> JobFacets:
+    pipeline = [
+        {"$match": {"status": "active"}},
+        {"$facet": {
+            "total": [{"$count": "count"}],
+            **{field: [{"$group": {"_id": f"${field}", "count": {"$sum": 1}}}, {"$sort": {"count": -1}}]
+               for field in FACET_FIELDS},
+        }},
+    ]
+    result = (await db.jobs.aggregate(pipeline).to_list(1))[0]
+    total = result["total"][0]["count"] if result["total"] else 0
+    return JobFacets(total=total, **{field: {row["_id"]: row["count"] for row in result[field] if row["_id"] is not None}
+                                     for field in FACET_FIELDS})
+
+def range_filter(query: dict, low_field: str, high_field: str, low: Optional[float], high: Optional[float]):
+    """Match postings whose ``[low_field, high_field]`` range overlaps ``[low, high]``."""
+    if low is not None:
+        query[high_field] = {"$gte": low}
+    if high is not None:
+        query[low_field] = {"$lte": high}
+
+# ============ Bulk Status Updates ============
+
+async def bulk_update_status(kind: str, bulk: BulkStatusUpdate, current_user: Principal) -> BulkStatusResult:
+    """Apply the changes to submissions on postings ``current_user`` owns; others are skipped
+    and show up as unmatched."""
+    if current_user.user_type not in ['employer', 'client']:
+        raise HTTPException(status_code=403, detail="Only employers and clients can update statuses")
+    if len(bulk.updates) > MAX_BULK_UPDATES:
+        raise HTTPException(status_code=400, detail=f"At most {MAX_BULK_UPDATES} updates per request")
+    repo = SUBMISSION_REPOSITORIES[kind]
+    field = repo.posting_field
+    # Last change per id wins, as it would when applied in order
+    wanted = {change.id: change.status for change in bulk.updates}
+    owner_field = repo.postings.owner_field
+    previous = await find_by_ids(repo.collection, wanted, field, owner_field, "status")
+    # Submissions sent before the owner was stored on them are checked against their postings
+    unstamped = {doc[field] for doc in previous.values() if owner_field not in doc}
+    owned = set(await db[repo.postings.collection].distinct(
+        "id", {"id": {"$in": list(unstamped)}, owner_field: current_user.id})) if unstamped else set()
+    previous = {submission_id: doc for submission_id, doc in previous.items()
+                if doc.get(owner_field) == current_user.id or (owner_field not in doc and doc[field] in owned)}
+    if not previous:
+        return BulkStatusResult(matched=0, modified=0)
+    now = datetime.now(timezone.utc)
+    result = await db[repo.collection].bulk_write(
+        [UpdateOne({"id": submission_id, field: doc[field]},
+                   {"$set": {"status": wanted[submission_id], "updated_at": now, owner_field: current_user.id}})
+         for submission_id, doc in previous.items()],
+        ordered=False,
+    )
+    changed = [submission_id for submission_id, doc in previous.items() if doc["status"] != wanted[submission_id]]
+    if changed:
+        # Rebuilt rather than adjusted: the statuses read above may have changed since
+        await refresh_posting_counts(kind, list({previous[submission_id][field] for submission_id in changed}))
+        for submission_id in changed:
+            domain_events.publish(status_changed_event(kind, submission_id, wanted[submission_id]))
+    return BulkStatusResult(matched=result.matched_count, modified=result.modified_count)
+
+# ============ Profile Expansion ============
+
+# Explicit even with FAST_SERIALIZATION off so the password hash is never read
+PUBLIC_PROFILE_PROJECTION = {"_id": 0, **{name: 1 for name in PublicProfile.model_fields}}
+PUBLIC_PROFILE_DEFAULTS = ListCodec(PublicProfile).defaults
+
+class UserLoader:
+    """Per-request batching loader for public profiles (a DataLoader).
+
+    Every ``load`` issued in the same event-loop tick is resolved by one ``$in``
+    query and each distinct id is fetched once per request. Use as a dependency:
+    ``users: UserLoader = Depends(UserLoader)``.
+    """
+
+    def __init__(self):
+        self._futures: Dict[str, asyncio.Future] = {}
+        self._queue: List[str] = []
+        self._dispatch_task: Optional[asyncio.Task] = None
+
+    def load(self, user_id: str) -> asyncio.Future:
+        future = self._futures.get(user_id)
+        if future is None:
+            loop = asyncio.get_running_loop()
+            future = self._futures[user_id] = loop.create_future()
+            self._queue.append(user_id)
+            if len(self._queue) == 1:
+                loop.call_soon(self._schedule)
+        return future
+
+    async def load_many(self, user_ids: List[str]) -> List[Optional[dict]]:
+        return list(await asyncio.gather(*(self.load(user_id) for user_id in user_ids)))
+
+    def _schedule(self):
+        self._dispatch_task = asyncio.create_task(self._dispatch(self._queue))
+        self._queue = []
+
+    async def _dispatch(self, user_ids: List[str]):
+        try:
+            found = {user["id"]: {**PUBLIC_PROFILE_DEFAULTS, **user}
+                     async for user in db.users.find({"id": {"$in": user_ids}}, PUBLIC_PROFILE_PROJECTION)}
+        except Exception as exc:
+            for user_id in user_ids:
+                self._futures[user_id].set_exception(exc)
+            return
+        for user_id in user_ids:
+            self._futures[user_id].set_result(found.get(user_id))
+
+async def expanded_response(docs: List[dict], next_cursor: Optional[str], expand: Optional[str],
+                            relation: str, id_field: str, codec: ListCodec, expanded_codec: ListCodec,
+                            users: UserLoader) -> Response:
+    """List response, with ``expand=<relation>`` attaching the profile ``id_field`` refers to."""
+    if expand is None:
+        return codec.response(docs, next_cursor)
+    if expand != relation:
+        raise HTTPException(status_code=400, detail=f"expand must be '{relation}'")
+    profiles = await users.load_many([doc[id_field] for doc in docs])
+    for doc, profile in zip(docs, profiles):
+        doc[relation] = profile
+    return expanded_codec.response(docs, next_cursor)
+
+# ============ Exports ============
+
+EXPORT_FORMATS = {"ndjson": "application/x-ndjson", "csv": "text/csv"}
+
+def export_query(base: dict, status_filter: Optional[str], since: Optional[datetime], until: Optional[datetime]) -> dict:
+    query = dict(base)
+    if status_filter: query["status"] = status_filter
+    created = {}
+    if since: created["$gte"] = since if since.tzinfo else since.replace(tzinfo=timezone.utc)
+    if until: created["$lt"] = until if until.tzinfo else until.replace(tzinfo=timezone.utc)
+    if created: query["created_at"] = created
+    return query
+
+async def export_chunks(collection, query: dict, codec: ListCodec, fmt: str):
+    """Yield the export one encoded batch at a time.
+
+    Only one cursor batch is held in memory, and the next one is not fetched
+    until the previous chunk has been handed to the client, so a slow reader
+    throttles the Mongo cursor rather than growing a buffer.
+    """
+    cursor = collection.find(query, codec.projection).sort([("created_at", ASCENDING), ("id", ASCENDING)])
+    cursor = cursor.batch_size(EXPORT_BATCH_SIZE)
+    if fmt == "csv":
+        buffer = io.StringIO()
+        writer = csv.DictWriter(buffer, fieldnames=codec.fields, extrasaction="ignore")
+        writer.writeheader()
+        yield buffer.getvalue().encode()
+    try:
+        while True:
+            batch = await cursor.to_list(EXPORT_BATCH_SIZE)
+            if not batch:
+                break
+            if fmt == "csv":
+                buffer.seek(0)
+                buffer.truncate()
+                for doc in batch: writer.writerow(serialize_doc(doc))
+                yield buffer.getvalue().encode()
+            else:
+                yield b"".join(orjson.dumps(doc, option=orjson.OPT_NAIVE_UTC | orjson.OPT_APPEND_NEWLINE) for doc in batch)
+    finally:
+        # Client went away mid-stream: release the server-side cursor now
+        await cursor.close()
+
+def export_response(collection, query: dict, codec: ListCodec, fmt: str, filename: str) -> StreamingResponse:
+    if fmt not in EXPORT_FORMATS:
+        raise HTTPException(status_code=400, detail="format must be 'ndjson' or 'csv'")
+    return StreamingResponse(
+        export_chunks(collection, query, codec, fmt),
+        media_type=EXPORT_FORMATS[fmt],
+        headers={"Content-Disposition": f'attachment; filename="{filename}.{fmt}"'},
+    )
+
+# ============ Notification Hub ============
+
+class NotificationHub:
+    """In-process pub/sub that fans new notifications out to connected users.
+
+    Each open stream owns a small bounded queue; idle connections cost one
+    queue and one parked task. A subscriber that falls ``SSE_QUEUE_SIZE``
+    messages behind is disconnected and resumes from its last event id.
+    """
+
+    def __init__(self, queue_size: int = 100):
+        self.queue_size = queue_size
+        self._subscribers: dict = {}  # user_id -> set of queues
+        self.published = 0
+        self.delivered = 0
+        self.dropped = 0
+
+    def subscribe(self, user_id: str) -> asyncio.Queue:
+        queue = asyncio.Queue(maxsize=self.queue_size)
+        self._subscribers.setdefault(user_id, set()).add(queue)
+        return queue
+
+    def unsubscribe(self, user_id: str, queue: asyncio.Queue):
+        queues = self._subscribers.get(user_id)
+        if queues is not None:
+            queues.discard(queue)
+            if not queues:
+                del self._subscribers[user_id]
+
+    def publish(self, notification: dict):
+        self.published += 1
+        for queue in list(self._subscribers.get(notification["user_id"], ())):
+            try:
+                queue.put_nowait(notification)
+                self.delivered += 1
+            except asyncio.QueueFull:
+                # Replace the stale backlog with a close signal; the client resumes from the DB
+                self.dropped += 1
+                self.unsubscribe(notification["user_id"], queue)
+                while not queue.empty():
+                    queue.get_nowait()
+                queue.put_nowait(None)
+
+    @property
+    def connections(self) -> int:
+        return sum(len(queues) for queues in self._subscribers.values())
+
+    def stats(self) -> dict:
+        return {"users": len(self._subscribers), "connections": self.connections,
+                "published": self.published, "delivered": self.delivered, "dropped": self.dropped}
+
+notification_hub = NotificationHub(SSE_QUEUE_SIZE)
+
+async def create_notifications(docs: List[dict]):
+    """Persist notification documents and push them to any connected recipients.
+
+    Stream replay resumes in ``(created_at, id)`` order, so timestamps are cut to the
+    millisecond BSON stores and documents go out live in that same order.
+    """
+    if not docs:
+        return
+    for doc in docs:
+        created_at = doc["created_at"]
+        doc["created_at"] = created_at.replace(microsecond=created_at.microsecond // 1000 * 1000)
+    docs.sort(key=lambda doc: (doc["created_at"], doc["id"]))
+    await db.notifications.insert_many(docs)
+    for doc in docs:
+        doc.pop("_id", None)
+        notification_hub.publish(doc)
+
+def sse_event(doc: dict) -> bytes:
+    return b"id: " + doc["id"].encode() + b"\nevent: notification\ndata: " + \
+        orjson.dumps(doc, option=orjson.OPT_NAIVE_UTC) + b"\n\n"
+
+async def notification_stream(request: Request, user_id: str, last_event_id: Optional[str]):
+    queue = notification_hub.subscribe(user_id)
+    try:
+        yield b"retry: 3000\n\n"
+        seen = set()
+        if last_event_id:
+            # Subscribed before reading the backlog, so nothing published in between is lost
+            last = await db.notifications.find_one({"id": last_event_id, "user_id": user_id}, {"_id": 0, "created_at": 1})
+            if last:
+                # One insert_many batch shares a millisecond, so page on (created_at, id) like fetch_page
+                after = [
+                    {"created_at": {"$gt": last["created_at"]}},
+                    {"created_at": last["created_at"], "id": {"$gt": last_event_id}},
+                ]
+                if isinstance(last["created_at"], str):
+                    # Not yet converted by migrate_dates.py: newer date rows sort after every
+                    # string, and $gt on a string never reaches them
+                    after.append({"created_at": {"$type": "date"}})
+                backlog = db.notifications.find({"user_id": user_id, "$or": after}, NOTIFICATION_CODEC.projection) \
+                    .sort([("created_at", ASCENDING), ("id", ASCENDING)])
+                async for doc in backlog:
+                    seen.add(doc["id"])
+                    yield sse_event(doc)
+        while True:
+            try:
+                doc = await asyncio.wait_for(queue.get(), SSE_HEARTBEAT_INTERVAL)
+            except asyncio.TimeoutError:
+                if await request.is_disconnected():
+                    break
+                yield b": ping\n\n"
+                continue
+            if doc is None:  # dropped for falling behind
+                break
+            if doc["id"] in seen:
+                continue
+            yield sse_event(doc)
+    finally:
+        notification_hub.unsubscribe(user_id, queue)
+
+# ============ Freelancer Matching ============
+
+# The app stores "Entry-level", "Mid-level", "Senior" and "Lead"; keys are normalized by experience_key
+EXPERIENCE_LEVELS = {"entry": 0.0, "junior": 0.25, "mid": 0.5, "intermediate": 0.5, "senior": 0.75,
+                     "lead": 1.0, "expert": 1.0}
+
+def experience_key(level: Optional[str]) -> str:
+    key = " ".join((level or "").lower().replace("-", " ").split())
+    return key[:-len(" level")] if key.endswith(" level") else key
+
+def normalize_skill(skill: str) -> str:
+    return " ".join(skill.lower().split())
+
+class FreelancerMatcher:
+    """Skill-vocabulary matrix of freelancers for batch project matching.
+
+    The user x skill matrix is stored column-wise (one array of user slots per
+    skill) next to dense per-user arrays for hourly rate and a precomputed
+    experience score, so ranking a project touches only the columns of its
+    skills plus a few vectorized passes. ``upsert`` keeps it current when a
+    profile changes; superseded slots are masked out and compacted later.
+    """
+
+    SKILL_WEIGHT = 0.6
+    BUDGET_WEIGHT = 0.25
+    EXPERIENCE_WEIGHT = 0.15
+
+    def __init__(self):
+        self._reset()
+
+    def _reset(self):
+        self._slots: dict = {}      # user_id -> slot
+        self._user_ids: list = []   # slot -> user_id, None once superseded
+        self._skills: list = []     # slot -> skill column ids
+        self._docs: list = []       # slot -> indexed profile fields, kept for compaction
+        self._vocab: dict = {}      # normalized skill -> column id
+        self._columns: list = []    # column id -> [slot]
+        self._column_arrays: dict = {}
+        self._df: list = []         # column id -> live users with the skill
+        self._rates = np.full(1024, np.nan, dtype=np.float32)
+        self._experience = np.zeros(1024, dtype=np.float32)
+        self._alive = np.zeros(1024, dtype=bool)
+
+    def __len__(self):
+        return len(self._slots)
+
+    @staticmethod
+    def experience_score(user: dict) -> float:
+        level = EXPERIENCE_LEVELS.get(experience_key(user.get("experience_level")), 0.25)
+        rating = min(max(float(user.get("rating") or 0.0), 0.0), 5.0) / 5.0
+        completed = min(int(user.get("completed_projects") or 0), 20) / 20.0
+        return 0.5 * level + 0.3 * rating + 0.2 * completed
+
+    def upsert(self, user: dict):
+        """Index (or re-index) a user; only freelancers are kept."""
+        self.remove(user["id"])
+        if user.get("user_type") != "freelancer":
+            return
+        slot = len(self._user_ids)
+        if slot == len(self._alive):
+            self._rates = np.resize(self._rates, slot * 2)
+            self._experience = np.resize(self._experience, slot * 2)
+            self._alive = np.resize(self._alive, slot * 2)
+        columns = []
+        for skill in {normalize_skill(s) for s in user.get("skills") or [] if s and s.strip()}:
+            column = self._vocab.get(skill)
+            if column is None:
+                column = self._vocab[skill] = len(self._columns)
+                self._columns.append([])
+                self._df.append(0)
+            self._columns[column].append(slot)
+            self._column_arrays.pop(column, None)
+            self._df[column] += 1
+            columns.append(column)
+        rate = user.get("hourly_rate")
+        self._rates[slot] = np.nan if rate is None else float(rate)
+        self._experience[slot] = self.experience_score(user)
+        self._alive[slot] = True
+        self._user_ids.append(user["id"])
+        self._skills.append(columns)
+        self._docs.append({field: user.get(field) for field in MATCH_PROJECTION if field != "_id"})
+        self._slots[user["id"]] = slot
+
+    def remove(self, user_id: str):
+        slot = self._slots.pop(user_id, None)
+        if slot is None:
+            return
+        self._alive[slot] = False
+        self._user_ids[slot] = None
+        self._docs[slot] = None
+        for column in self._skills[slot]:
+            self._df[column] -= 1
+        if len(self._user_ids) > 1024 and len(self._slots) < len(self._user_ids) // 2:
+            self._compact()
+
+    def _compact(self):
+        live = [self._docs[slot] for slot in self._slots.values()]
+        self._reset()
+        for doc in live:
+            self.upsert(doc)
+
+    def _column(self, column: int) -> np.ndarray:
+        array = self._column_arrays.get(column)
+        if array is None:
+            array = self._column_arrays[column] = np.asarray(self._columns[column], dtype=np.int64)
+        return array
+
+    def rank(self, project: dict, limit: int = 20) -> List[tuple]:
+        """Return up to ``limit`` ``(user_id, score, skill, budget, experience)`` tuples, best first."""
+        n = len(self._slots)
+        wanted = {normalize_skill(s) for s in project.get("skills") or [] if s and s.strip()}
+        columns = [self._vocab[skill] for skill in wanted if skill in self._vocab]
+        if not n or not columns:
+            return []
+        size = len(self._user_ids)
+        # Rare skills carry more weight than ones nearly every freelancer lists; skills
+        # nobody lists still count against coverage, at the maximum weight
+        weights = {c: math.log(1 + n / max(self._df[c], 1)) for c in columns}
+        total_weight = sum(weights.values()) + math.log(1 + n) * (len(wanted) - len(columns))
+        skill = np.zeros(size, dtype=np.float32)
+        for column in columns:
+            skill[self._column(column)] += weights[column]
+        skill[~self._alive[:size]] = 0.0
+        candidates = np.flatnonzero(skill)
+        if not len(candidates):
+            return []
+        skill = skill[candidates] / total_weight
+
+        rates = self._rates[candidates]
+        budget = np.ones(len(candidates), dtype=np.float32)
+        # Stored as "Hourly"/"Fixed" by the app
+        if (project.get("budget_type") or "").lower() == "hourly":
+            low, high = float(project.get("budget_min") or 0.0), float(project.get("budget_max") or 0.0)
+            span = max(high, 1.0)
+            distance = np.where(rates < low, low - rates, np.where(rates > high, rates - high, 0.0))
+            budget = np.clip(1.0 - distance / span, 0.0, 1.0)
+            budget[np.isnan(rates)] = 0.5
+        experience = self._experience[candidates]
+
+        score = self.SKILL_WEIGHT * skill + self.BUDGET_WEIGHT * budget + self.EXPERIENCE_WEIGHT * experience
+        if len(candidates) > limit:
+            top = np.argpartition(-score, limit)[:limit]
+        else:
+            top = np.arange(len(candidates))
+        top = top[np.argsort(-score[top], kind="stable")]
+        return [(self._user_ids[candidates[i]], float(score[i]), float(skill[i]), float(budget[i]), float(experience[i]))
+                for i in top]
+
+    def stats(self) -> dict:
+        return {"freelancers": len(self._slots), "slots": len(self._user_ids), "skills": len(self._vocab)}
+
+freelancer_matcher = FreelancerMatcher()
+
+MATCH_PROJECTION = {"_id": 0, "id": 1, "user_type": 1, "skills": 1, "hourly_rate": 1,
+                    "experience_level": 1, "rating": 1, "completed_projects": 1}
+
+async def build_freelancer_matcher(database):
+    async for user in database.users.find({"user_type": "freelancer"}, MATCH_PROJECTION):
+        freelancer_matcher.upsert(user)
+
+# ============ Dashboard Summaries ============
+
+# Each job/project carries its submission counts by status (status_counts) and its
+# latest activity next to applicants_count/proposals_count, so a submission or a
+# status change is one $inc on the posting. Counts that disagree with the counter
+# (postings older than status_counts) are rebuilt with one aggregation on read.
+SUBMISSIONS = {
+    "job": ("applications", "job_id"),
+    "project": ("proposals", "project_id"),
+}
+# Keyed like SUBMISSIONS: the posting collection and its submission counter
+POSTING_COUNTERS = {
+    "job": ("jobs", "applicants_count"),
+    "project": ("projects", "proposals_count"),
+}
+
+def count_update(changes: Dict[str, int], when: datetime) -> dict:
+    return {"$inc": {f"status_counts.{key}": value for key, value in changes.items() if value},
+            "$set": {"last_activity_at": when}}
+
+async def record_submission(kind: str, posting_id: str, status_name: str, when: datetime,
+                            change: int = 1) -> Optional[dict]:
+    """Count (or with ``change=-1`` uncount) a submission; returns the posting's owner id,
+    or None if the posting doesn't exist."""
+    collection, counter = POSTING_COUNTERS[kind]
+    update = count_update({status_name: change}, when)
+    update["$inc"][counter] = change
+    owner_field = SUBMISSION_REPOSITORIES[kind].postings.owner_field
+    return await db[collection].find_one_and_update({"id": posting_id}, update, projection={"_id": 0, owner_field: 1})
+
+async def record_status_change(kind: str, posting_id: str, old_status: str, new_status: str, when: datetime):
+    if old_status != new_status:
+        await db[POSTING_COUNTERS[kind][0]].update_one(
+            {"id": posting_id}, count_update({old_status: -1, new_status: 1}, when))
+
+async def refresh_posting_counts(kind: str, posting_ids: List[str]) -> dict:
+    """Recompute and store the counts of ``posting_ids`` with one aggregation."""
+    if not posting_ids:
+        return {}
+    collection, field = SUBMISSIONS[kind]
+    postings, counter = POSTING_COUNTERS[kind]
+    summaries = {pid: {"status_counts": {}, counter: 0, "last_activity_at": None} for pid in posting_ids}
+    pipeline = [
+        {"$match": {field: {"$in": list(posting_ids)}}},
+        {"$group": {"_id": {"posting": f"${field}", "status": "$status"},
+                    "n": {"$sum": 1}, "last": {"$max": "$updated_at"}}},
+    ]
+    async for row in db[collection].aggregate(pipeline):
+        summary = summaries[row["_id"]["posting"]]
+        summary["status_counts"][row["_id"]["status"]] = row["n"]
+        summary[counter] += row["n"]
+        if row["last"] and (summary["last_activity_at"] is None or row["last"] > summary["last_activity_at"]):
+            summary["last_activity_at"] = row["last"]
+    await db[postings].bulk_write(
+        [UpdateOne({"id": pid}, {"$set": summary}) for pid, summary in summaries.items()],
+        ordered=False,
+    )
+    return summaries
+
+async def posting_summaries(kind: str, postings: List[dict]) -> List[PostingSummary]:
+    collection, counter = POSTING_COUNTERS[kind]
+    stale = [p["id"] for p in postings
+             if sum((p.get("status_counts") or {}).values()) != p.get(counter, 0)]
+    refreshed = await refresh_posting_counts(kind, stale)
+    summaries = []
+    for posting in postings:
+        posting = {**posting, **refreshed.get(posting["id"], {})}
+        counts = posting.get("status_counts") or {}
+        summaries.append(PostingSummary(
+            id=posting["id"], kind=kind, title=posting.get("title", ""), status=posting.get("status", "active"),
+            views=posting.get("views", 0) + view_counter.pending(collection, posting["id"]),
+            total=posting.get(counter, 0), counts={k: v for k, v in counts.items() if v},
+            last_activity_at=isoformat(posting.get("last_activity_at")),
+            created_at=isoformat(posting.get("created_at")),
+        ))
+    return summaries
+
+async def status_counts(collection, query: dict) -> Dict[str, int]:
+    counts = {}
+    async for row in collection.aggregate([{"$match": query}, {"$group": {"_id": "$status", "n": {"$sum": 1}}}]):
+        counts[row["_id"]] = row["n"]
+    return counts
+
+async def recent_submissions(collection, kind: str, query: dict) -> List[dict]:
+    docs = await collection.find(query, {"_id": 0}).sort(PAGE_SORT).limit(DASHBOARD_RECENT_ACTIVITY).to_list(DASHBOARD_RECENT_ACTIVITY)
+    return [{"type": kind, **serialize_doc(doc)} for doc in docs]
+
+# ============ Repositories ============
+
+async def find_by_ids(collection: str, ids, *fields: str) -> Dict[str, dict]:
+    """One ``$in`` lookup; returns the projected documents keyed by ``id``."""
+    if not ids:
+        return {}
+    projection = {"_id": 0, "id": 1, **{field: 1 for field in fields}}
+    return {doc["id"]: doc async for doc in db[collection].find({"id": {"$in": list(ids)}}, projection)}
+
+class PostingRepository:
+    """Jobs or projects. Reads project only the requested fields; owner-only writes are
+    a single conditional update on id plus owner instead of a read followed by a write."""
+
+    def __init__(self, collection: str, owner_field: str, label: str, filter_fields: tuple):
+        self.collection = collection
+        self.owner_field = owner_field
+        self.label = label
+        # Fields listing queries filter on; deletes return just these for cache invalidation
+        self.filter_fields = filter_fields
+
+    async def get(self, posting_id: str, *fields: str) -> Optional[dict]:
+        projection = {"_id": 0, **{field: 1 for field in fields}}
+        return await db[self.collection].find_one({"id": posting_id}, projection)
+
+    async def exists(self, posting_id: str) -> bool:
+        return await self.get(posting_id, "id") is not None
+
+    async def get_owned(self, posting_id: str, owner_id: str, *fields: str) -> dict:
+        posting = await self.get(posting_id, self.owner_field, *fields)
+        if not posting: raise HTTPException(status_code=404, detail=f"{self.label} not found")
+        if posting[self.owner_field] != owner_id: raise HTTPException(status_code=403, detail="Not authorized")
+        return posting
+
+    async def _not_owned(self, posting_id: str):
+        # Only reached when the conditional write matched nothing
+        if not await self.exists(posting_id):
+            raise HTTPException(status_code=404, detail=f"{self.label} not found")
+        raise HTTPException(status_code=403, detail="Not authorized")
+
+    async def update_owned(self, posting_id: str, owner_id: str, fields: dict) -> dict:
+        """Apply ``$set: fields`` if ``owner_id`` owns the posting; returns the updated document."""
+        updated = await db[self.collection].find_one_and_update(
+            {"id": posting_id, self.owner_field: owner_id}, {"$set": fields},
+            projection={"_id": 0}, return_document=ReturnDocument.AFTER)
+        if updated is None:
+            await self._not_owned(posting_id)
+        return updated
+
+    async def delete_owned(self, posting_id: str, owner_id: str) -> dict:
+        deleted = await db[self.collection].find_one_and_delete(
+            {"id": posting_id, self.owner_field: owner_id},
+            projection={"_id": 0, **{field: 1 for field in self.filter_fields}})
+        if deleted is None:
+            await self._not_owned(posting_id)
+        return deleted
+
+class SubmissionRepository:
+    """Applications or proposals; only the owner of the posting they were sent to may change them."""
+
+    def __init__(self, collection: str, posting_field: str, submitter_field: str, label: str,
+                 postings: PostingRepository):
+        self.collection = collection
+        self.posting_field = posting_field
+        self.submitter_field = submitter_field
+        self.label = label
+        self.postings = postings
+
+    async def set_status(self, submission_id: str, owner_id: str, status_name: str, now: datetime) -> dict:
+        """Set the status if ``owner_id`` owns the posting; returns the posting id and the
+        *previous* status for the counts."""
+        owner_field = self.postings.owner_field
+        # Submissions carry their posting's owner, so one conditional write checks and updates
+        previous = await db[self.collection].find_one_and_update(
+            {"id": submission_id, owner_field: owner_id},
+            {"$set": {"status": status_name, "updated_at": now}},
+            projection={"_id": 0, self.posting_field: 1, "status": 1}, return_document=ReturnDocument.BEFORE)
+        if previous is not None:
+            return previous
+        submission = await db[self.collection].find_one({"id": submission_id},
+                                                        {"_id": 0, self.posting_field: 1, owner_field: 1})
+        if submission is None:
+            raise HTTPException(status_code=404, detail=f"{self.label} not found")
+        if owner_field in submission:
+            raise HTTPException(status_code=403, detail="Not authorized")
+        # Sent before the owner was stored on submissions (see migrate_dates.py): check the posting
+        await self.postings.get_owned(submission[self.posting_field], owner_id)
+        previous = await db[self.collection].find_one_and_update(
+            {"id": submission_id, owner_field: {"$exists": False}},
+            {"$set": {"status": status_name, "updated_at": now, owner_field: owner_id}},
+            projection={"_id": 0, self.posting_field: 1, "status": 1}, return_document=ReturnDocument.BEFORE)
+        if previous is None:
+            # Backfilled by a concurrent request in the meantime
+            return await self.set_status(submission_id, owner_id, status_name, now)
+        return previous
+
+jobs_repo = PostingRepository("jobs", "employer_id", "Job", ("id", "status", "category", "job_type", "experience_level",
+                                                             "location", "skills", "salary_min", "salary_max"))
+projects_repo = PostingRepository("projects", "client_id", "Project", ("id", "status", "category", "budget_type",
+                                                                       "budget_min", "budget_max"))
+applications_repo = SubmissionRepository("applications", "job_id", "applicant_id", "Application", jobs_repo)
+proposals_repo = SubmissionRepository("proposals", "project_id", "freelancer_id", "Proposal", projects_repo)
+# Keyed like SUBMISSIONS
+SUBMISSION_REPOSITORIES = {"job": applications_repo, "project": proposals_repo}
+
+# ============ Domain Events ============
+
+def submitted_event(kind: str, posting_id: str, submission_id: str) -> dict:
+    return {"type": "submitted", "kind": kind, "posting_id": posting_id, "submission_id": submission_id}
+
+def status_changed_event(kind: str, submission_id: str, status_name: str) -> dict:
+    return {"type": "status_changed", "kind": kind, "submission_id": submission_id, "status": status_name}
+
+async def notifications_for(events: List[dict]) -> List[dict]:
+    """Turn a batch of events into notification documents.
+
+    Recipients and posting titles are resolved with at most two ``$in`` lookups
+    per kind for the whole batch, off the request path.
+    """
+    docs = []
+    for kind, submissions_repo in SUBMISSION_REPOSITORIES.items():
+        postings_repo = submissions_repo.postings
+        kind_events = [event for event in events if event["kind"] == kind]
+        if not kind_events:
+            continue
+        submissions = await find_by_ids(submissions_repo.collection,
+                                        {e["submission_id"] for e in kind_events if e["type"] == "status_changed"},
+                                        submissions_repo.posting_field, submissions_repo.submitter_field)
+        posting_ids = {e["posting_id"] for e in kind_events if e["type"] == "submitted"}
+        posting_ids.update(s[submissions_repo.posting_field] for s in submissions.values())
+        postings = await find_by_ids(postings_repo.collection, posting_ids, "title", postings_repo.owner_field)
+        noun = submissions_repo.label.lower()
+        for event in kind_events:
+            if event["type"] == "submitted":
+                posting = postings.get(event["posting_id"])
+                if posting is None:
+                    continue
+                notification = Notification(user_id=posting[postings_repo.owner_field], title=f"New {noun}",
+                                            message=f"New {noun} for {posting['title']}", type=noun,
+                                            link=f"/{postings_repo.collection}/{posting['id']}")
+            else:
+                submission = submissions.get(event["submission_id"])
+                if submission is None:
+                    continue
+                posting_id = submission[submissions_repo.posting_field]
+                title = postings[posting_id]["title"] if posting_id in postings else "a posting"
+                notification = Notification(user_id=submission[submissions_repo.submitter_field],
+                                            title=f"{submissions_repo.label} {event['status']}",
+                                            message=f"Your {noun} for {title} is now {event['status']}",
+                                            type=f"{noun}_status", link=f"/{postings_repo.collection}/{posting_id}")
+            docs.append(notification.model_dump())
+    return docs
+
+class DomainEventQueue:
+    """In-process queue of domain events, turned into notifications off the request path.
+
+    Handlers ``publish`` without awaiting. A background consumer takes events
+    until ``batch_size`` are queued or ``flush_interval`` has passed since the
+    first one, then writes the whole batch's notifications with one
+    ``insert_many`` and pushes them to connected streams. ``stop`` lets the
+    consumer finish and drain what is still queued; it is never cancelled
+    mid-batch. Events are best effort: a full queue or a failed write drops
+    them, and both are counted.
+    """
+
+    def __init__(self, maxsize: int = 10000, batch_size: int = 100, flush_interval: float = 0.05):
+        self.batch_size = batch_size
+        self.flush_interval = flush_interval
+        self._queue: asyncio.Queue = asyncio.Queue(maxsize=maxsize)
+        # Set when a full batch is waiting or on stop(), to cut the flush wait short
+        self._wakeup = asyncio.Event()
+        self._closed = False
+        self._task: Optional[asyncio.Task] = None
+        self.published = 0
+        self.dropped = 0
+        self.failed = 0
+        self.batches = 0
+        self.processed = 0
+        self.notifications = 0
+        self.last_batch_size = 0
+        self.max_batch_size = 0
+        self.last_batch_ms = 0.0
+
+    def publish(self, event: dict):
+        try:
+            self._queue.put_nowait(event)
+            self.published += 1
+        except asyncio.QueueFull:
+            self.dropped += 1
+            logger.warning("Domain event queue full, dropped %s event", event["type"])
+            return
+        if self._queue.qsize() >= self.batch_size:
+            self._wakeup.set()
+
+    def _take_batch(self, first: Optional[dict] = None) -> List[dict]:
+        batch = [] if first is None else [first]
+        while len(batch) < self.batch_size and not self._queue.empty():
+            event = self._queue.get_nowait()
+            if event is not None:  # None only wakes the consumer for stop()
+                batch.append(event)
+        return batch
+
+    async def process(self, events: List[dict]):
+        start = time.perf_counter()
+        try:
+            docs = await notifications_for(events)
+            await create_notifications(docs)
+        except Exception:
+            self.failed += len(events)
+            logger.exception("Failed to write notifications for %d events", len(events))
+            return
+        self.batches += 1
+        self.processed += len(events)
+        self.notifications += len(docs)
+        self.last_batch_size = len(events)
+        self.max_batch_size = max(self.max_batch_size, len(events))
+        self.last_batch_ms = (time.perf_counter() - start) * 1000
+
+    async def _run(self):
+        while not (self._closed and self._queue.empty()):
+            first = await self._queue.get()
+            if not self._closed and self._queue.qsize() + 1 < self.batch_size:
+                # Waiting on the event rather than the queue, so a timeout can never lose an event
+                try:
+                    await asyncio.wait_for(self._wakeup.wait(), self.flush_interval)
+                except asyncio.TimeoutError:
+                    pass
+            self._wakeup.clear()
+            batch = self._take_batch(first)
+            if batch:
+                await self.process(batch)
+
+    def start(self):
+        if self._task is None:
+            self._closed = False
+            self._task = asyncio.create_task(self._run())
+
+    async def stop(self):
+        self._closed = True
+        self._wakeup.set()
+        if self._task is not None:
+            try:
+                self._queue.put_nowait(None)
+            except asyncio.QueueFull:
+                pass  # the consumer is not blocked on an empty queue then
+            await self._task
+            self._task = None
+        while not self._queue.empty():  # never started
+            batch = self._take_batch()
+            if batch:
+                await self.process(batch)
+
+    @property
+    def depth(self) -> int:
+        return self._queue.qsize()
+
+    def stats(self) -> dict:
+        return {"depth": self.depth, "published": self.published, "dropped": self.dropped, "failed": self.failed,
+                "batches": self.batches, "processed": self.processed, "notifications": self.notifications,
+                "last_batch_size": self.last_batch_size, "max_batch_size": self.max_batch_size,
+                "avg_batch_size": self.processed / self.batches if self.batches else 0.0,
+                "last_batch_ms": self.last_batch_ms}
+
+domain_events = DomainEventQueue(EVENT_QUEUE_SIZE, EVENT_BATCH_SIZE, EVENT_FLUSH_INTERVAL)
 
 # ============ Auth Routes ============
 
 @api_router.post("/auth/register", response_model=Token)
 async def register(user_data: UserCreate):
-    existing_user = await db.users.find_one({"email": user_data.email})
+    existing_user = await db.users.find_one({"email": user_data.email}, {"_id": 0, "id": 1})
     if existing_user:
         raise HTTPException(status_code=400, detail="Email already registered")
     
@@ -243,12 +2143,15 @@ async def register(user_data: UserCreate):
     )
     
     user_dict = user.model_dump()
-    user_dict['password'] = hash_password(user_data.password)
-    user_dict['created_at'] = user_dict['created_at'].isoformat()
-    user_dict['updated_at'] = user_dict['updated_at'].isoformat()
+    user_dict['password'] = await password_pool.hash(user_data.password)
     
-    await db.users.insert_one(user_dict)
-    access_token = create_access_token(data={"sub": user.id})
+    # The check above is only a fast path; the unique email index settles concurrent sign-ups
+    try:
+        await db.users.insert_one(user_dict)
+    except DuplicateKeyError:
+        raise HTTPException(status_code=400, detail="Email already registered")
+    freelancer_matcher.upsert(user_dict)
+    access_token = create_access_token(data=token_claims(user))
     
     return Token(access_token=access_token, token_type="bearer", user=user)
 
@@ -258,7 +2161,7 @@ async def login(credentials: UserLogin):
     if not user_doc:
         raise HTTPException(status_code=401, detail="Invalid email or password")
     
-    if not verify_password(credentials.password, user_doc['password']):
+    if not await password_pool.verify(credentials.password, user_doc['password']):
         raise HTTPException(status_code=401, detail="Invalid email or password")
     
     user_doc.pop('password', None)
@@ -266,7 +2169,7 @@ async def login(credentials: UserLogin):
     serialize_doc(user_doc)
     
     user = User(**user_doc)
-    access_token = create_access_token(data={"sub": user.id})
+    access_token = create_access_token(data=token_claims(user))
     
     return Token(access_token=access_token, token_type="bearer", user=user)
 
@@ -284,222 +2187,385 @@ async def get_user(user_id: str):
     serialize_doc(user)
     return User(**user)
 
+# Set at registration only: password has its own flow, and user_type may be baked into
+# issued tokens (PRINCIPAL_CLAIMS_IN_TOKEN) where a change could not reach it
+PROTECTED_USER_FIELDS = frozenset({"_id", "id", "user_type", "password"})
+
 @api_router.put("/users/{user_id}", response_model=User)
-async def update_user(user_id: str, user_data: dict, current_user: User = Depends(get_current_user)):
+async def update_user(user_id: str, user_data: dict, current_user: Principal = Depends(get_current_principal)):
     if current_user.id != user_id:
         raise HTTPException(status_code=403, detail="Not authorized to update this profile")
+    protected = PROTECTED_USER_FIELDS.intersection(user_data)
+    if protected:
+        raise HTTPException(status_code=400, detail=f"Cannot update {', '.join(sorted(protected))}")
     
-    user_data['updated_at'] = datetime.now(timezone.utc).isoformat()
-    await db.users.update_one({"id": user_id}, {"$set": user_data})
-    updated_user = await db.users.find_one({"id": user_id}, {"_id": 0, "password": 0})
+    user_data['updated_at'] = datetime.now(timezone.utc)
+    try:
+        updated_user = await db.users.find_one_and_update({"id": user_id}, {"$set": user_data},
+                                                          projection={"_id": 0, "password": 0},
+                                                          return_document=ReturnDocument.AFTER)
+    except DuplicateKeyError:
+        raise HTTPException(status_code=400, detail="Email already registered")
+    principal_cache.invalidate(user_id)
+    if not updated_user:
+        raise HTTPException(status_code=404, detail="User not found")
+    freelancer_matcher.upsert(updated_user)
     serialize_doc(updated_user)
     return User(**updated_user)
 
 # ============ Job Routes ============
 
 @api_router.get("/jobs", response_model=List[Job])
-async def get_jobs(category: Optional[str] = None, job_type: Optional[str] = None, 
-                   experience_level: Optional[str] = None, limit: int = 50):
+async def get_jobs(request: Request, category: Optional[str] = None, job_type: Optional[str] = None,
+                   experience_level: Optional[str] = None, salary_min: Optional[float] = None,
+                   salary_max: Optional[float] = None, location: Optional[List[str]] = Query(None),
+                   skills: Optional[List[str]] = Query(None), limit: int = DEFAULT_PAGE_SIZE,
+                   cursor: Optional[str] = None):
     query = {"status": "active"}
     if category: query["category"] = category
     if job_type: query["job_type"] = job_type
     if experience_level: query["experience_level"] = experience_level
+    if location: query["location"] = location[0] if len(location) == 1 else {"$in": sorted(set(location))}
+    if skills: query["skills"] = {"$all": sorted(set(skills))}
+    range_filter(query, "salary_min", "salary_max", salary_min, salary_max)
     
-    jobs = await db.jobs.find(query, {"_id": 0}).to_list(limit)
-    for job in jobs: serialize_doc(job)
-    return jobs
+    return await cached_listing(request, "jobs", JOB_CODEC, query, limit, cursor)
+
+@api_router.get("/jobs/facets", response_model=JobFacets)
+async def get_job_facets():
+    return await facet_cache.get("jobs", aggregate_job_facets)
 
 @api_router.get("/jobs/{job_id}", response_model=Job)
 async def get_job(job_id: str):
-    job = await db.jobs.find_one({"id": job_id}, {"_id": 0})
+    job = await jobs_repo.get(job_id)
     if not job: raise HTTPException(status_code=404, detail="Job not found")
-    await db.jobs.update_one({"id": job_id}, {"$inc": {"views": 1}})
-    job['views'] = job.get('views', 0) + 1
+    job['views'] = job.get('views', 0) + view_counter.increment("jobs", job_id)
     serialize_doc(job)
     return Job(**job)
 
 @api_router.post("/jobs", response_model=Job)
-async def create_job(job_data: JobCreate, current_user: User = Depends(get_current_user)):
+async def create_job(job_data: JobCreate, current_user: Principal = Depends(get_current_principal)):
     if current_user.user_type not in ['employer', 'client']:
         raise HTTPException(status_code=403, detail="Only employers and clients can post jobs")
     job = Job(employer_id=current_user.id, **job_data.model_dump())
     job_dict = job.model_dump()
-    job_dict['created_at'] = job_dict['created_at'].isoformat()
-    job_dict['updated_at'] = job_dict['updated_at'].isoformat()
     await db.jobs.insert_one(job_dict)
+    search_index.add("job", job_dict)
+    listing_cache.invalidate("jobs", job_dict)
+    facet_cache.invalidate("jobs")
     return job
 
 @api_router.put("/jobs/{job_id}", response_model=Job)
-async def update_job(job_id: str, job_data: dict, current_user: User = Depends(get_current_user)):
-    job = await db.jobs.find_one({"id": job_id})
-    if not job: raise HTTPException(status_code=404, detail="Job not found")
-    if job['employer_id'] != current_user.id: raise HTTPException(status_code=403, detail="Not authorized")
-    job_data['updated_at'] = datetime.now(timezone.utc).isoformat()
-    await db.jobs.update_one({"id": job_id}, {"$set": job_data})
-    updated_job = await db.jobs.find_one({"id": job_id}, {"_id": 0})
+async def update_job(job_id: str, job_data: dict, current_user: Principal = Depends(get_current_principal)):
+    job_data['updated_at'] = datetime.now(timezone.utc)
+    updated_job = await jobs_repo.update_owned(job_id, current_user.id, job_data)
+    search_index.add("job", updated_job)
+    listing_cache.invalidate("jobs", updated_job, changed=job_data)
+    facet_cache.invalidate("jobs")
     serialize_doc(updated_job)
     return Job(**updated_job)
 
 @api_router.delete("/jobs/{job_id}")
-async def delete_job(job_id: str, current_user: User = Depends(get_current_user)):
-    job = await db.jobs.find_one({"id": job_id})
-    if not job: raise HTTPException(status_code=404, detail="Job not found")
-    if job['employer_id'] != current_user.id: raise HTTPException(status_code=403, detail="Not authorized")
-    await db.jobs.delete_one({"id": job_id})
+async def delete_job(job_id: str, current_user: Principal = Depends(get_current_principal)):
+    job = await jobs_repo.delete_owned(job_id, current_user.id)
+    search_index.remove("job", job_id)
+    listing_cache.invalidate("jobs", job)
+    facet_cache.invalidate("jobs")
     return {"message": "Job deleted successfully"}
 
 # ============ Project Routes ============
 
 @api_router.get("/projects", response_model=List[Project])
-async def get_projects(category: Optional[str] = None, budget_type: Optional[str] = None, limit: int = 50):
+async def get_projects(request: Request, category: Optional[str] = None, budget_type: Optional[str] = None,
+                       budget_min: Optional[float] = None, budget_max: Optional[float] = None,
+                       limit: int = DEFAULT_PAGE_SIZE, cursor: Optional[str] = None):
     query = {"status": "active"}
     if category: query["category"] = category
     if budget_type: query["budget_type"] = budget_type
-    projects = await db.projects.find(query, {"_id": 0}).to_list(limit)
-    for project in projects: serialize_doc(project)
-    return projects
+    range_filter(query, "budget_min", "budget_max", budget_min, budget_max)
+    return await cached_listing(request, "projects", PROJECT_CODEC, query, limit, cursor)
 
 @api_router.get("/projects/{project_id}", response_model=Project)
 async def get_project(project_id: str):
-    project = await db.projects.find_one({"id": project_id}, {"_id": 0})
+    project = await projects_repo.get(project_id)
     if not project: raise HTTPException(status_code=404, detail="Project not found")
-    await db.projects.update_one({"id": project_id}, {"$inc": {"views": 1}})
-    project['views'] = project.get('views', 0) + 1
+    project['views'] = project.get('views', 0) + view_counter.increment("projects", project_id)
     serialize_doc(project)
     return Project(**project)
 
+@api_router.get("/projects/{project_id}/matches", response_model=List[FreelancerMatch])
+async def get_project_matches(project_id: str, limit: int = 20, current_user: Principal = Depends(get_current_principal)):
+    project = await projects_repo.get_owned(project_id, current_user.id, "skills", "budget_type", "budget_min", "budget_max")
+    ranked = freelancer_matcher.rank(project, limit=max(1, min(limit, MATCH_MAX_RESULTS)))
+    users = {}
+    if ranked:
+        async for user in db.users.find({"id": {"$in": [r[0] for r in ranked]}}, PUBLIC_PROFILE_PROJECTION):
+            users[user["id"]] = user
+    return [FreelancerMatch(user=users[user_id], score=score, skill_score=skill, budget_score=budget,
+                            experience_score=experience)
+            for user_id, score, skill, budget, experience in ranked if user_id in users]
+
 @api_router.post("/projects", response_model=Project)
-async def create_project(project_data: ProjectCreate, current_user: User = Depends(get_current_user)):
+async def create_project(project_data: ProjectCreate, current_user: Principal = Depends(get_current_principal)):
     if current_user.user_type not in ['employer', 'client']:
         raise HTTPException(status_code=403, detail="Only employers and clients can post projects")
     project = Project(client_id=current_user.id, **project_data.model_dump())
     project_dict = project.model_dump()
-    project_dict['created_at'] = project_dict['created_at'].isoformat()
-    project_dict['updated_at'] = project_dict['updated_at'].isoformat()
     await db.projects.insert_one(project_dict)
+    search_index.add("project", project_dict)
+    listing_cache.invalidate("projects", project_dict)
     return project
 
 @api_router.put("/projects/{project_id}", response_model=Project)
-async def update_project(project_id: str, project_data: dict, current_user: User = Depends(get_current_user)):
-    project = await db.projects.find_one({"id": project_id})
-    if not project: raise HTTPException(status_code=404, detail="Project not found")
-    if project['client_id'] != current_user.id: raise HTTPException(status_code=403, detail="Not authorized")
-    project_data['updated_at'] = datetime.now(timezone.utc).isoformat()
-    await db.projects.update_one({"id": project_id}, {"$set": project_data})
-    updated_project = await db.projects.find_one({"id": project_id}, {"_id": 0})
+async def update_project(project_id: str, project_data: dict, current_user: Principal = Depends(get_current_principal)):
+    project_data['updated_at'] = datetime.now(timezone.utc)
+    updated_project = await projects_repo.update_owned(project_id, current_user.id, project_data)
+    search_index.add("project", updated_project)
+    listing_cache.invalidate("projects", updated_project, changed=project_data)
     serialize_doc(updated_project)
     return Project(**updated_project)
 
 @api_router.delete("/projects/{project_id}")
-async def delete_project(project_id: str, current_user: User = Depends(get_current_user)):
-    project = await db.projects.find_one({"id": project_id})
-    if not project: raise HTTPException(status_code=404, detail="Project not found")
-    if project['client_id'] != current_user.id: raise HTTPException(status_code=403, detail="Not authorized")
-    await db.projects.delete_one({"id": project_id})
+async def delete_project(project_id: str, current_user: Principal = Depends(get_current_principal)):
+    project = await projects_repo.delete_owned(project_id, current_user.id)
+    search_index.remove("project", project_id)
+    listing_cache.invalidate("projects", project)
     return {"message": "Project deleted successfully"}
 
 # ============ Job Application Routes ============
 
 @api_router.post("/applications", response_model=JobApplication)
-async def create_application(app_data: JobApplicationCreate, current_user: User = Depends(get_current_user)):
+async def create_application(app_data: JobApplicationCreate, current_user: Principal = Depends(get_current_principal)):
     if current_user.user_type not in ['jobseeker', 'freelancer']:
         raise HTTPException(status_code=403, detail="Only job seekers and freelancers can apply")
-    existing = await db.applications.find_one({"job_id": app_data.job_id, "applicant_id": current_user.id})
-    if existing: raise HTTPException(status_code=400, detail="Already applied")
     application = JobApplication(applicant_id=current_user.id, **app_data.model_dump())
     app_dict = application.model_dump()
-    app_dict['created_at'] = app_dict['created_at'].isoformat()
-    app_dict['updated_at'] = app_dict['updated_at'].isoformat()
-    await db.applications.insert_one(app_dict)
-    await db.jobs.update_one({"id": app_data.job_id}, {"$inc": {"applicants_count": 1}})
+    # Counted first: the same write returns the employer, stored on the application for status changes
+    job = await record_submission("job", app_data.job_id, app_dict['status'], app_dict['created_at'])
+    if job is None: raise HTTPException(status_code=404, detail="Job not found")
+    app_dict['employer_id'] = job['employer_id']
+    # The unique (job_id, applicant_id) index rejects duplicates, even concurrent ones
+    try:
+        await db.applications.insert_one(app_dict)
+    except DuplicateKeyError:
+        await record_submission("job", app_data.job_id, app_dict['status'], app_dict['created_at'], change=-1)
+        raise HTTPException(status_code=400, detail="Already applied")
+    domain_events.publish(submitted_event("job", app_data.job_id, application.id))
     return application
 
-@api_router.get("/applications/my", response_model=List[JobApplication])
-async def get_my_applications(current_user: User = Depends(get_current_user)):
-    applications = await db.applications.find({"applicant_id": current_user.id}, {"_id": 0}).to_list(100)
-    for app in applications: serialize_doc(app)
-    return applications
-
-@api_router.get("/applications/job/{job_id}", response_model=List[JobApplication])
-async def get_job_applications(job_id: str, current_user: User = Depends(get_current_user)):
-    job = await db.jobs.find_one({"id": job_id})
-    if not job: raise HTTPException(status_code=404, detail="Job not found")
+@api_router.get("/applications/my", response_model=List[ExpandedJobApplication])
+async def get_my_applications(limit: int = MAX_PAGE_SIZE, cursor: Optional[str] = None, expand: Optional[str] = None,
+                              current_user: Principal = Depends(get_current_principal),
+                              users: UserLoader = Depends(UserLoader)):
+    docs, next_cursor = await fetch_page(db.applications, {"applicant_id": current_user.id}, limit, cursor,
+                                         APPLICATION_CODEC.projection)
+    return await expanded_response(docs, next_cursor, expand, "applicant", "applicant_id",
+                                   APPLICATION_CODEC, EXPANDED_APPLICATION_CODEC, users)
+
+@api_router.get("/applications/job/{job_id}", response_model=List[ExpandedJobApplication])
+async def get_job_applications(job_id: str, limit: int = MAX_PAGE_SIZE, cursor: Optional[str] = None,
+                               expand: Optional[str] = None, current_user: Principal = Depends(get_current_principal),
+                               users: UserLoader = Depends(UserLoader)):
+    if not await jobs_repo.exists(job_id): raise HTTPException(status_code=404, detail="Job not found")
     # In real app, check if user is employer. For now allowing view.
-    applications = await db.applications.find({"job_id": job_id}, {"_id": 0}).to_list(100)
-    for app in applications: serialize_doc(app)
-    return applications
+    docs, next_cursor = await fetch_page(db.applications, {"job_id": job_id}, limit, cursor,
+                                         APPLICATION_CODEC.projection)
+    return await expanded_response(docs, next_cursor, expand, "applicant", "applicant_id",
+                                   APPLICATION_CODEC, EXPANDED_APPLICATION_CODEC, users)
+
+@api_router.get("/applications/job/{job_id}/export")
+async def export_job_applications(job_id: str, format: str = "ndjson", status: Optional[str] = None,
+                                  since: Optional[datetime] = None, until: Optional[datetime] = None,
+                                  current_user: Principal = Depends(get_current_principal)):
+    await jobs_repo.get_owned(job_id, current_user.id)
+    query = export_query({"job_id": job_id}, status, since, until)
+    return export_response(db.applications, query, APPLICATION_CODEC, format, f"applications-{job_id}")
+
+@api_router.put("/applications/bulk/status", response_model=BulkStatusResult)
+async def bulk_update_application_status(bulk: BulkStatusUpdate, current_user: Principal = Depends(get_current_principal)):
+    return await bulk_update_status("job", bulk, current_user)
 
 @api_router.put("/applications/{application_id}")
-async def update_application_status(application_id: str, status_data: ApplicationUpdate, current_user: User = Depends(get_current_user)):
-    application = await db.applications.find_one({"id": application_id})
-    if not application: raise HTTPException(status_code=404, detail="Application not found")
-    job = await db.jobs.find_one({"id": application['job_id']})
-    # Optional: Check ownership
-    # if not job or job['employer_id'] != current_user.id: raise HTTPException(status_code=403, detail="Not authorized")
-    await db.applications.update_one({"id": application_id}, {"$set": {"status": status_data.status, "updated_at": datetime.now(timezone.utc).isoformat()}})
+async def update_application_status(application_id: str, status_data: ApplicationUpdate, current_user: Principal = Depends(get_current_principal)):
+    now = datetime.now(timezone.utc)
+    previous = await applications_repo.set_status(application_id, current_user.id, status_data.status, now)
+    await record_status_change("job", previous['job_id'], previous['status'], status_data.status, now)
+    if previous['status'] != status_data.status:
+        domain_events.publish(status_changed_event("job", application_id, status_data.status))
     return {"message": "Status updated"}
 
 # ============ Proposal Routes ============
 
 @api_router.post("/proposals", response_model=Proposal)
-async def create_proposal(prop_data: ProposalCreate, current_user: User = Depends(get_current_user)):
+async def create_proposal(prop_data: ProposalCreate, current_user: Principal = Depends(get_current_principal)):
     if current_user.user_type != 'freelancer':
         raise HTTPException(status_code=403, detail="Only freelancers can submit proposals")
-    existing = await db.proposals.find_one({"project_id": prop_data.project_id, "freelancer_id": current_user.id})
-    if existing: raise HTTPException(status_code=400, detail="Already submitted proposal")
     proposal = Proposal(freelancer_id=current_user.id, **prop_data.model_dump())
     prop_dict = proposal.model_dump()
-    prop_dict['created_at'] = prop_dict['created_at'].isoformat()
-    prop_dict['updated_at'] = prop_dict['updated_at'].isoformat()
-    await db.proposals.insert_one(prop_dict)
-    await db.projects.update_one({"id": prop_data.project_id}, {"$inc": {"proposals_count": 1}})
+    # Counted first: the same write returns the client, stored on the proposal for status changes
+    project = await record_submission("project", prop_data.project_id, prop_dict['status'], prop_dict['created_at'])
+    if project is None: raise HTTPException(status_code=404, detail="Project not found")
+    prop_dict['client_id'] = project['client_id']
+    # The unique (project_id, freelancer_id) index rejects duplicates, even concurrent ones
+    try:
+        await db.proposals.insert_one(prop_dict)
+    except DuplicateKeyError:
+        await record_submission("project", prop_data.project_id, prop_dict['status'], prop_dict['created_at'],
+                                change=-1)
+        raise HTTPException(status_code=400, detail="Already submitted proposal")
+    domain_events.publish(submitted_event("project", prop_data.project_id, proposal.id))
     return proposal
 
-@api_router.get("/proposals/my", response_model=List[Proposal])
-async def get_my_proposals(current_user: User = Depends(get_current_user)):
-    proposals = await db.proposals.find({"freelancer_id": current_user.id}, {"_id": 0}).to_list(100)
-    for prop in proposals: serialize_doc(prop)
-    return proposals
-
-@api_router.get("/proposals/project/{project_id}", response_model=List[Proposal])
-async def get_project_proposals(project_id: str, current_user: User = Depends(get_current_user)):
-    project = await db.projects.find_one({"id": project_id})
-    if not project: raise HTTPException(status_code=404, detail="Project not found")
+@api_router.get("/proposals/my", response_model=List[ExpandedProposal])
+async def get_my_proposals(limit: int = MAX_PAGE_SIZE, cursor: Optional[str] = None, expand: Optional[str] = None,
+                           current_user: Principal = Depends(get_current_principal),
+                           users: UserLoader = Depends(UserLoader)):
+    docs, next_cursor = await fetch_page(db.proposals, {"freelancer_id": current_user.id}, limit, cursor,
+                                         PROPOSAL_CODEC.projection)
+    return await expanded_response(docs, next_cursor, expand, "freelancer", "freelancer_id",
+                                   PROPOSAL_CODEC, EXPANDED_PROPOSAL_CODEC, users)
+
+@api_router.get("/proposals/project/{project_id}", response_model=List[ExpandedProposal])
+async def get_project_proposals(project_id: str, limit: int = MAX_PAGE_SIZE, cursor: Optional[str] = None,
+                                expand: Optional[str] = None, current_user: Principal = Depends(get_current_principal),
+                                users: UserLoader = Depends(UserLoader)):
+    if not await projects_repo.exists(project_id): raise HTTPException(status_code=404, detail="Project not found")
     # Optional: check client ownership
-    proposals = await db.proposals.find({"project_id": project_id}, {"_id": 0}).to_list(100)
-    for prop in proposals: serialize_doc(prop)
-    return proposals
+    docs, next_cursor = await fetch_page(db.proposals, {"project_id": project_id}, limit, cursor,
+                                         PROPOSAL_CODEC.projection)
+    return await expanded_response(docs, next_cursor, expand, "freelancer", "freelancer_id",
+                                   PROPOSAL_CODEC, EXPANDED_PROPOSAL_CODEC, users)
+
+@api_router.get("/proposals/project/{project_id}/export")
+async def export_project_proposals(project_id: str, format: str = "ndjson", status: Optional[str] = None,
+                                   since: Optional[datetime] = None, until: Optional[datetime] = None,
+                                   current_user: Principal = Depends(get_current_principal)):
+    await projects_repo.get_owned(project_id, current_user.id)
+    query = export_query({"project_id": project_id}, status, since, until)
+    return export_response(db.proposals, query, PROPOSAL_CODEC, format, f"proposals-{project_id}")
+
+@api_router.put("/proposals/bulk/status", response_model=BulkStatusResult)
+async def bulk_update_proposal_status(bulk: BulkStatusUpdate, current_user: Principal = Depends(get_current_principal)):
+    return await bulk_update_status("project", bulk, current_user)
 
 # NEW: Update Proposal Status Endpoint
 @api_router.put("/proposals/{proposal_id}")
-async def update_proposal_status(proposal_id: str, status_data: ProposalUpdate, current_user: User = Depends(get_current_user)):
-    proposal = await db.proposals.find_one({"id": proposal_id})
-    if not proposal: raise HTTPException(status_code=404, detail="Proposal not found")
-    
-    project = await db.projects.find_one({"id": proposal['project_id']})
-    # Optional: Check ownership
-    # if not project or project['client_id'] != current_user.id:
-    #     raise HTTPException(status_code=403, detail="Not authorized to update this proposal")
-
-    await db.proposals.update_one(
-        {"id": proposal_id},
-        {"$set": {"status": status_data.status, "updated_at": datetime.now(timezone.utc).isoformat()}}
-    )
+async def update_proposal_status(proposal_id: str, status_data: ProposalUpdate, current_user: Principal = Depends(get_current_principal)):
+    now = datetime.now(timezone.utc)
+    previous = await proposals_repo.set_status(proposal_id, current_user.id, status_data.status, now)
+    await record_status_change("project", previous['project_id'], previous['status'], status_data.status, now)
+    if previous['status'] != status_data.status:
+        domain_events.publish(status_changed_event("project", proposal_id, status_data.status))
     return {"message": "Proposal status updated"}
 
+# ============ Dashboard Routes ============
+
+POSTING_SUMMARY_PROJECTION = {"_id": 0, "id": 1, "title": 1, "status": 1, "views": 1, "created_at": 1,
+                              "applicants_count": 1, "proposals_count": 1, "status_counts": 1, "last_activity_at": 1}
+
+@api_router.get("/dashboard", response_model=Dashboard)
+async def get_dashboard(current_user: Principal = Depends(get_current_principal)):
+    dashboard = Dashboard(user_type=current_user.user_type)
+    if current_user.user_type in ['employer', 'client']:
+        jobs = await db.jobs.find({"employer_id": current_user.id}, POSTING_SUMMARY_PROJECTION) \
+            .sort("created_at", -1).to_list(DASHBOARD_MAX_POSTINGS)
+        projects = await db.projects.find({"client_id": current_user.id}, POSTING_SUMMARY_PROJECTION) \
+            .sort("created_at", -1).to_list(DASHBOARD_MAX_POSTINGS)
+        dashboard.postings = await posting_summaries("job", jobs) + await posting_summaries("project", projects)
+        activity = await recent_submissions(db.applications, "application", {"job_id": {"$in": [j["id"] for j in jobs]}}) \
+            + await recent_submissions(db.proposals, "proposal", {"project_id": {"$in": [p["id"] for p in projects]}})
+    else:
+        dashboard.submissions = {
+            "applications": await status_counts(db.applications, {"applicant_id": current_user.id}),
+            "proposals": await status_counts(db.proposals, {"freelancer_id": current_user.id}),
+        }
+        activity = await recent_submissions(db.applications, "application", {"applicant_id": current_user.id}) \
+            + await recent_submissions(db.proposals, "proposal", {"freelancer_id": current_user.id})
+    activity.sort(key=lambda doc: (doc["created_at"], doc["id"]), reverse=True)
+    dashboard.recent_activity = activity[:DASHBOARD_RECENT_ACTIVITY]
+    return dashboard
+
 # ============ Notification Routes ============
 
 @api_router.get("/notifications", response_model=List[Notification])
-async def get_notifications(current_user: User = Depends(get_current_user)):
-    notifications = await db.notifications.find({"user_id": current_user.id}, {"_id": 0}).sort("created_at", -1).to_list(50)
-    for notif in notifications: serialize_doc(notif)
-    return notifications
+async def get_notifications(current_user: Principal = Depends(get_current_principal)):
+    notifications = await db.notifications.find({"user_id": current_user.id}, NOTIFICATION_CODEC.projection).sort("created_at", -1).to_list(50)
+    return NOTIFICATION_CODEC.response(notifications)
+
+@api_router.get("/notifications/stream")
+async def stream_notifications(request: Request, access_token: Optional[str] = None, last_id: Optional[str] = None,
+                               credentials: Optional[HTTPAuthorizationCredentials] = Depends(optional_security)):
+    # EventSource cannot send headers, so the token may also arrive as ?access_token=
+    if credentials is None:
+        if not access_token:
+            raise HTTPException(status_code=401, detail="Not authenticated")
+        credentials = HTTPAuthorizationCredentials(scheme="Bearer", credentials=access_token)
+    user_id = decode_token(credentials)["sub"]
+    last_event_id = request.headers.get("last-event-id") or last_id
+    return StreamingResponse(
+        notification_stream(request, user_id, last_event_id),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"},
+    )
+
+@api_router.get("/notifications/unread-count")
+async def get_unread_count(current_user: Principal = Depends(get_current_principal)):
+    count = await db.notifications.count_documents({"user_id": current_user.id, "is_read": False})
+    return {"unread": count}
+
+@api_router.put("/notifications/read-all")
+async def mark_all_notifications_read(current_user: Principal = Depends(get_current_principal)):
+    result = await db.notifications.update_many({"user_id": current_user.id, "is_read": False},
+                                                {"$set": {"is_read": True, "read_at": datetime.now(timezone.utc)}})
+    return {"message": "Marked all as read", "updated": result.modified_count}
 
 @api_router.put("/notifications/{notification_id}/read")
-async def mark_notification_read(notification_id: str, current_user: User = Depends(get_current_user)):
-    await db.notifications.update_one({"id": notification_id, "user_id": current_user.id}, {"$set": {"is_read": True}})
+async def mark_notification_read(notification_id: str, current_user: Principal = Depends(get_current_principal)):
+    await db.notifications.update_one({"id": notification_id, "user_id": current_user.id, "is_read": False},
+                                      {"$set": {"is_read": True, "read_at": datetime.now(timezone.utc)}})
     return {"message": "Marked as read"}
 
+# ============ Search Routes ============
+
+@api_router.get("/search", response_model=List[SearchHit])
+async def search(q: str, type: Optional[str] = None, limit: int = 20):
+    if type not in (None, "job", "project"):
+        raise HTTPException(status_code=400, detail="type must be 'job' or 'project'")
+    hits = search_index.search(q, kind=type, limit=max(1, min(limit, SEARCH_MAX_RESULTS)))
+    ids = {"job": [], "project": []}
+    for _, kind, doc_id in hits:
+        ids[kind].append(doc_id)
+    docs = {}
+    for kind, collection in (("job", db.jobs), ("project", db.projects)):
+        if ids[kind]:
+            async for doc in collection.find({"id": {"$in": ids[kind]}}, {"_id": 0}):
+                docs[(kind, doc["id"])] = serialize_doc(doc)
+    return [SearchHit(type=kind, score=score, item=docs[(kind, doc_id)])
+            for score, kind, doc_id in hits if (kind, doc_id) in docs]
+
+# ============ Stats ============
+
+def collect_stats() -> dict:
+    return {
+        "password_pool": password_pool.stats(),
+        "principal_cache": principal_cache.stats(),
+        "search_index": search_index.stats(),
+        "view_counter": view_counter.stats(),
+        "listing_cache": listing_cache.stats(),
+        "facet_cache": facet_cache.stats(),
+        "notification_hub": notification_hub.stats(),
+        "domain_events": domain_events.stats(),
+        "freelancer_matcher": freelancer_matcher.stats(),
+    }
+
+@api_router.get("/stats")
+async def get_stats():
+    return collect_stats()
+
+@api_router.get("/metrics", response_class=PlainTextResponse)
+async def get_metrics():
+    return PlainTextResponse(metrics.render(collect_stats()), media_type="text/plain; version=0.0.4")
+
 # Include router and run
 app.include_router(api_router)
 
@@ -509,11 +2575,52 @@ app.add_middleware(
     allow_origins=os.environ.get('CORS_ORIGINS', '*').split(','),
     allow_methods=["*"],
     allow_headers=["*"],
+    expose_headers=["X-Next-Cursor", "ETag"],
 )
-
-logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(name)s - %(levelname)s - %(message)s')
-logger = logging.getLogger(__name__)
+app.add_middleware(MetricsMiddleware)
+
+@app.on_event("startup")
+async def create_indexes():
+    if CREATE_INDEXES_ON_STARTUP:
+        names = await ensure_indexes(db)
+        logger.info("Ensured %d indexes", len(names))
+    missing = await missing_unique_indexes(db)
+    if missing:
+        raise RuntimeError(f"Missing unique indexes: {', '.join(missing)}. Duplicate rows block building "
+                           "them; run migrate_dates.py, which removes duplicate submissions and lists "
+                           "duplicate emails, then restart")
+
+@app.on_event("startup")
+async def load_search_index():
+    if SEARCH_INDEX_ON_STARTUP:
+        try:
+            await build_search_index(db)
+        except ServerSelectionTimeoutError:
+            logger.exception("MongoDB unreachable, search index starts empty")
+        logger.info("Search index loaded: %s", search_index.stats())
+
+@app.on_event("startup")
+async def load_freelancer_matcher():
+    if MATCH_INDEX_ON_STARTUP:
+        try:
+            await build_freelancer_matcher(db)
+        except ServerSelectionTimeoutError:
+            logger.exception("MongoDB unreachable, freelancer matcher starts empty")
+        logger.info("Freelancer matcher loaded: %s", freelancer_matcher.stats())
+
+@app.on_event("startup")
+async def start_view_counter():
+    view_counter.start(db)
+
+@app.on_event("startup")
+async def start_domain_events():
+    domain_events.start()
 
 @app.on_event("shutdown")
 async def shutdown_db_client():
+    # Flushed side by side, so a failure in one cannot strand the other's buffer
+    for result in await asyncio.gather(view_counter.stop(db), domain_events.stop(), return_exceptions=True):
+        if isinstance(result, Exception):
+            logger.error("Shutdown flush failed", exc_info=result)
+    password_pool.shutdown()
     client.close()
\ No newline at end of file
@@ -0,0 +1,131 @@
+"""Domain-event queue: handlers only enqueue, the consumer writes notifications, stop() drains."""
+import asyncio
+import os
+import sys
+from pathlib import Path
+
+import pytest
+
+BACKEND = Path(__file__).resolve().parent.parent / "backend"
+sys.path[:0] = [str(BACKEND), str(BACKEND / "benchmarks")]
+# Environment wins over backend/.env; nothing here talks to a real MongoDB
+os.environ.setdefault("MONGO_URL", "mongodb://localhost:27017")
+os.environ.setdefault("DB_NAME", "wallxy_test")
+
+import server  # noqa: E402
+from fake_mongo import FakeDatabase  # noqa: E402
+
+
+@pytest.fixture
+def fake_db(monkeypatch):
+    database = FakeDatabase()
+    monkeypatch.setattr(server, "db", database)
+    return database
+
+
+async def seed(database, jobs=1):
+    await database.jobs.insert_many([{"id": f"job-{i}", "employer_id": "employer", "title": f"Job {i}"}
+                                     for i in range(jobs)])
+
+
+async def stopped_within(queue, timeout):
+    # asyncio.wait reports a hang instead of cancelling into it the way wait_for would
+    done, _ = await asyncio.wait({asyncio.ensure_future(queue.stop())}, timeout=timeout)
+    return bool(done)
+
+
+def submitted(i, job="job-0"):
+    return server.submitted_event("job", job, f"application-{i}")
+
+
+def test_consumer_writes_notifications_in_the_background(fake_db):
+    async def scenario():
+        await seed(fake_db)
+        await fake_db.applications.insert_one({"id": "application-0", "job_id": "job-0", "applicant_id": "seeker"})
+        queue = server.DomainEventQueue(batch_size=10, flush_interval=0.01)
+        queue.start()
+        queue.publish(submitted(0))
+        queue.publish(server.status_changed_event("job", "application-0", "accepted"))
+        for _ in range(200):
+            if await fake_db.notifications.count_documents({}) == 2:
+                break
+            await asyncio.sleep(0.005)
+        notifications = await fake_db.notifications.find({}, {"_id": 0}).to_list(None)
+        await queue.stop()
+        return queue, notifications
+
+    queue, notifications = asyncio.run(scenario())
+    assert sorted((n["user_id"], n["type"]) for n in notifications) == [
+        ("employer", "application"), ("seeker", "application_status")]
+    assert queue.stats()["batches"] == 1
+
+
+def test_stop_drains_queued_events_in_bounded_batches(fake_db):
+    async def scenario():
+        await seed(fake_db)
+        queue = server.DomainEventQueue(batch_size=25, flush_interval=10)
+        queue.start()
+        for i in range(110):
+            queue.publish(submitted(i))
+        assert await stopped_within(queue, 5)
+        return queue, await fake_db.notifications.count_documents({})
+
+    queue, written = asyncio.run(scenario())
+    stats = queue.stats()
+    assert written == 110
+    assert stats["depth"] == 0 and stats["processed"] == 110
+    assert stats["max_batch_size"] <= 25
+
+
+@pytest.mark.parametrize("ticks", [0, 1, 2, 5])
+def test_stop_right_after_publish_does_not_hang(fake_db, ticks):
+    async def scenario():
+        await seed(fake_db)
+        queue = server.DomainEventQueue(batch_size=10, flush_interval=0.05)
+        queue.start()
+        queue.publish(submitted(0))
+        for _ in range(ticks):
+            await asyncio.sleep(0)
+        queue.publish(submitted(1))
+        assert await stopped_within(queue, 2)
+        return await fake_db.notifications.count_documents({})
+
+    assert asyncio.run(scenario()) == 2
+
+
+def test_stop_without_start_processes_the_backlog(fake_db):
+    async def scenario():
+        await seed(fake_db)
+        queue = server.DomainEventQueue(batch_size=10)
+        queue.publish(submitted(0))
+        await queue.stop()
+        return await fake_db.notifications.count_documents({})
+
+    assert asyncio.run(scenario()) == 1
+
+
+def test_full_queue_drops_and_counts(fake_db):
+    queue = server.DomainEventQueue(maxsize=2)
+    for i in range(3):
+        queue.publish(submitted(i))
+    assert queue.stats()["dropped"] == 1 and queue.depth == 2
+
+
+def test_apply_only_enqueues(fake_db, monkeypatch):
+    queue = server.DomainEventQueue()
+    monkeypatch.setattr(server, "domain_events", queue)
+
+    async def scenario():
+        await seed(fake_db)
+        application = await server.create_application(server.JobApplicationCreate(job_id="job-0"),
+                                                       server.Principal(id="seeker", user_type="jobseeker"))
+        before = await fake_db.notifications.count_documents({})
+        depth = queue.depth
+        await queue.stop()
+        notification = await fake_db.notifications.find_one({}, {"_id": 0})
+        return application, before, depth, notification
+
+    application, before, depth, notification = asyncio.run(scenario())
+    assert before == 0 and depth == 1
+    assert notification["user_id"] == "employer" and notification["link"] == "/jobs/job-0"
+    assert application.job_id == "job-0"
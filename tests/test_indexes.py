@@ -0,0 +1,58 @@
+"""Startup refuses to run without the unique indexes; migrate_dates.py clears what blocks them."""
+import asyncio
+import os
+import sys
+from pathlib import Path
+
+import pytest
+
+BACKEND = Path(__file__).resolve().parent.parent / "backend"
+sys.path[:0] = [str(BACKEND), str(BACKEND / "benchmarks")]
+os.environ.setdefault("MONGO_URL", "mongodb://localhost:27017")
+os.environ.setdefault("DB_NAME", "wallxy_test")
+
+import migrate_dates  # noqa: E402
+import server  # noqa: E402
+from fake_mongo import FakeDatabase  # noqa: E402
+
+
+@pytest.fixture
+def fake_db(monkeypatch):
+    database = FakeDatabase()
+    monkeypatch.setattr(server, "db", database)
+    return database
+
+
+async def seed_duplicates(database):
+    await database.jobs.insert_one({"id": "job-0", "employer_id": "employer", "applicants_count": 2,
+                                    "status_counts": {"pending": 2}})
+    await database.applications.insert_many([
+        {"id": f"application-{i}", "job_id": "job-0", "applicant_id": "seeker", "status": "pending", "created_at": i}
+        for i in range(2)])
+
+
+def test_startup_fails_when_index_creation_is_off(fake_db, monkeypatch):
+    monkeypatch.setattr(server, "CREATE_INDEXES_ON_STARTUP", False)
+    with pytest.raises(RuntimeError, match=r"users\(email\)"):
+        asyncio.run(server.create_indexes())
+
+
+def test_startup_fails_when_duplicates_block_a_unique_index(fake_db):
+    asyncio.run(seed_duplicates(fake_db))
+    with pytest.raises(RuntimeError, match=r"applications\(job_id, applicant_id\)"):
+        asyncio.run(server.create_indexes())
+
+
+def test_migration_removes_duplicate_submissions(fake_db):
+    async def scenario():
+        await seed_duplicates(fake_db)
+        problems = await migrate_dates.migrate(fake_db, 100, dry_run=False)
+        await server.create_indexes()
+        remaining = await fake_db.applications.find({}, {"_id": 0, "id": 1}).to_list(None)
+        job = await fake_db.jobs.find_one({"id": "job-0"}, server.POSTING_SUMMARY_PROJECTION)
+        return problems, remaining, await server.posting_summaries("job", [job])
+
+    problems, remaining, (summary,) = asyncio.run(scenario())
+    assert problems == 0
+    assert remaining == [{"id": "application-0"}]
+    assert summary.total == 1 and summary.counts == {"pending": 1}
@@ -0,0 +1,80 @@
+"""Listing pages are served from the cache with ETags and dropped only by writes that touch them."""
+import asyncio
+import os
+import sys
+from pathlib import Path
+
+import orjson
+import pytest
+from starlette.requests import Request
+
+BACKEND = Path(__file__).resolve().parent.parent / "backend"
+sys.path[:0] = [str(BACKEND), str(BACKEND / "benchmarks")]
+os.environ.setdefault("MONGO_URL", "mongodb://localhost:27017")
+os.environ.setdefault("DB_NAME", "wallxy_test")
+
+import server  # noqa: E402
+from fake_mongo import FakeDatabase  # noqa: E402
+
+EMPLOYER = server.Principal(id="employer", user_type="employer")
+
+
+@pytest.fixture
+def fake_db(monkeypatch):
+    database = FakeDatabase()
+    monkeypatch.setattr(server, "db", database)
+    monkeypatch.setattr(server, "listing_cache", server.ListingCache())
+    monkeypatch.setattr(server, "facet_cache", server.FacetCache())
+    monkeypatch.setattr(server, "search_index", server.SearchIndex())
+    return database
+
+
+def list_jobs(category=None, etag=None):
+    headers = [(b"if-none-match", etag.encode())] if etag else []
+    request = Request({"type": "http", "method": "GET", "path": "/api/jobs", "headers": headers, "query_string": b""})
+    return server.get_jobs(request, category=category, location=None, skills=None)
+
+
+def post_job(category):
+    return server.create_job(server.JobCreate(
+        title="Site architect", company_name="Studio", description="Plans", requirements=[], category=category,
+        job_type="Full-time", experience_level="Senior", salary_min=1.0, salary_max=2.0, location="Pune", skills=[],
+    ), EMPLOYER)
+
+
+def test_matching_etag_is_a_304_served_from_the_cache(fake_db):
+    async def scenario():
+        await post_job("Architecture")
+        first = await list_jobs()
+        return first, await list_jobs(etag=first.headers["etag"])
+
+    first, second = asyncio.run(scenario())
+    assert first.status_code == 200 and first.headers["cache-control"] == "no-cache"
+    assert second.status_code == 304 and second.headers["etag"] == first.headers["etag"]
+    assert server.listing_cache.stats()["hits"] == 1 and server.listing_cache.not_modified == 1
+
+
+def test_new_job_replaces_the_pages_it_belongs_to(fake_db):
+    async def scenario():
+        await post_job("Architecture")
+        everything, design = await list_jobs(), await list_jobs("Design")
+        await post_job("Architecture")
+        return (everything, await list_jobs(etag=everything.headers["etag"]),
+                design, await list_jobs("Design", etag=design.headers["etag"]))
+
+    everything, after, design, design_after = asyncio.run(scenario())
+    assert after.status_code == 200 and after.headers["etag"] != everything.headers["etag"]
+    # The Design page does not match the new job, so it is still cached and still current
+    assert design_after.status_code == 304
+
+
+def test_closing_a_job_drops_pages_filtering_on_status(fake_db):
+    async def scenario():
+        job = await post_job("Architecture")
+        before = await list_jobs("Architecture")
+        await server.update_job(job.id, {"status": "closed"}, EMPLOYER)
+        return before, await list_jobs("Architecture")
+
+    before, after = asyncio.run(scenario())
+    assert len(orjson.loads(before.body)) == 1
+    assert orjson.loads(after.body) == []
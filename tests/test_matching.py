@@ -0,0 +1,33 @@
+"""Freelancer matching against the budget types and experience levels the app stores."""
+import os
+import sys
+from pathlib import Path
+
+BACKEND = Path(__file__).resolve().parent.parent / "backend"
+sys.path[:0] = [str(BACKEND)]
+os.environ.setdefault("MONGO_URL", "mongodb://localhost:27017")
+os.environ.setdefault("DB_NAME", "wallxy_test")
+
+import server  # noqa: E402
+
+
+def ranked(freelancers, project):
+    matcher = server.FreelancerMatcher()
+    for i, (rate, level) in enumerate(freelancers):
+        matcher.upsert({"id": f"f{i}", "user_type": "freelancer", "skills": ["Revit"],
+                        "hourly_rate": rate, "experience_level": level})
+    return {user_id: (budget, experience) for user_id, _, _, budget, experience in matcher.rank(project, limit=10)}
+
+
+def test_hourly_budget_type_is_matched_case_insensitively():
+    scores = ranked([(10.0, "Senior"), (500.0, "Senior")],
+                    {"skills": ["Revit"], "budget_type": "Hourly", "budget_min": 5, "budget_max": 20})
+    assert scores["f0"][0] == 1.0
+    assert scores["f1"][0] < 0.5
+
+
+def test_app_experience_levels_are_ordered():
+    scores = ranked([(None, "Entry-level"), (None, "Mid-level"), (None, "Senior"), (None, "Lead")],
+                    {"skills": ["Revit"], "budget_type": "Fixed"})
+    experience = [scores[f"f{i}"][1] for i in range(4)]
+    assert experience == sorted(experience) and len(set(experience)) == 4
@@ -0,0 +1,27 @@
+"""Request metrics cover responses Starlette sends for unhandled exceptions."""
+import asyncio
+import os
+import sys
+from pathlib import Path
+
+import pytest
+
+BACKEND = Path(__file__).resolve().parent.parent / "backend"
+sys.path[:0] = [str(BACKEND), str(BACKEND / "benchmarks")]
+os.environ.setdefault("MONGO_URL", "mongodb://localhost:27017")
+os.environ.setdefault("DB_NAME", "wallxy_test")
+
+import server  # noqa: E402
+from bench_api import call  # noqa: E402
+
+
+def test_unhandled_exception_is_counted_as_500(monkeypatch):
+    def broken(*args, **kwargs):
+        raise RuntimeError("boom")
+
+    monkeypatch.setattr(server.search_index, "search", broken)
+    key = ("GET", "/api/search", "500")
+    before = server.metrics.request_status.get(key, 0)
+    with pytest.raises(RuntimeError):
+        asyncio.run(call(server.app, "GET", "/api/search", query={"q": "revit"}))
+    assert server.metrics.request_status.get(key, 0) == before + 1
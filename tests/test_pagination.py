@@ -0,0 +1,100 @@
+"""Keyset paging on (created_at, id), including rows migrate_dates.py has not converted yet."""
+import asyncio
+import os
+import sys
+from datetime import datetime, timedelta, timezone
+from pathlib import Path
+
+import pytest
+
+BACKEND = Path(__file__).resolve().parent.parent / "backend"
+sys.path[:0] = [str(BACKEND), str(BACKEND / "benchmarks")]
+os.environ.setdefault("MONGO_URL", "mongodb://localhost:27017")
+os.environ.setdefault("DB_NAME", "wallxy_test")
+
+import server  # noqa: E402
+from fake_mongo import FakeDatabase  # noqa: E402
+
+START = datetime(2024, 1, 1, tzinfo=timezone.utc)
+
+
+@pytest.fixture
+def fake_db(monkeypatch):
+    database = FakeDatabase()
+    monkeypatch.setattr(server, "db", database)
+    return database
+
+
+def mixed_rows(prefix, strings, dates, **fields):
+    """``strings`` rows with ISO-string created_at (older) followed by ``dates`` native-date rows."""
+    rows = [{"id": f"{prefix}-s{i}", "created_at": (START + timedelta(minutes=i)).isoformat(), **fields}
+            for i in range(strings)]
+    return rows + [{"id": f"{prefix}-d{i}", "created_at": START + timedelta(days=1, minutes=i), **fields}
+                   for i in range(dates)]
+
+
+async def all_pages(collection, limit):
+    ids, cursor = [], None
+    while True:
+        docs, cursor = await server.fetch_page(collection, {"status": "active"}, limit, cursor)
+        ids += [doc["id"] for doc in docs]
+        if cursor is None:
+            return ids
+
+
+@pytest.mark.parametrize("limit", [1, 2, 3, 10])
+def test_pages_cover_date_rows_then_string_rows_once(fake_db, limit):
+    async def scenario():
+        await fake_db.jobs.insert_many(mixed_rows("job", 4, 3, status="active"))
+        return await all_pages(fake_db.jobs, limit)
+
+    assert asyncio.run(scenario()) == ["job-d2", "job-d1", "job-d0", "job-s3", "job-s2", "job-s1", "job-s0"]
+
+
+def test_rows_sharing_created_at_are_split_by_id(fake_db):
+    async def scenario():
+        await fake_db.jobs.insert_many([{"id": f"job-{i}", "status": "active", "created_at": START} for i in range(5)])
+        return await all_pages(fake_db.jobs, 2)
+
+    assert asyncio.run(scenario()) == ["job-4", "job-3", "job-2", "job-1", "job-0"]
+
+
+def test_page_size_is_capped(fake_db):
+    async def scenario():
+        await fake_db.jobs.insert_many(mixed_rows("job", 0, server.MAX_PAGE_SIZE + 5, status="active"))
+        return await server.fetch_page(fake_db.jobs, {"status": "active"}, 10_000, None)
+
+    docs, cursor = asyncio.run(scenario())
+    assert len(docs) == server.MAX_PAGE_SIZE and cursor is not None
+
+
+def test_malformed_cursor_is_a_400(fake_db):
+    with pytest.raises(server.HTTPException) as error:
+        asyncio.run(server.fetch_page(fake_db.jobs, {}, 10, "not-a-cursor"))
+    assert error.value.status_code == 400
+
+
+class Disconnected:
+    async def is_disconnected(self):
+        return True
+
+
+async def replay(user_id, last_event_id):
+    ids = []
+    async for chunk in server.notification_stream(Disconnected(), user_id, last_event_id):
+        if chunk.startswith(b"id: "):
+            ids.append(chunk.split(b"\n", 1)[0][4:].decode())
+    return ids
+
+
+def test_stream_replays_date_rows_after_a_string_row(fake_db, monkeypatch):
+    monkeypatch.setattr(server, "SSE_HEARTBEAT_INTERVAL", 0.01)
+
+    async def scenario():
+        await fake_db.notifications.insert_many(mixed_rows("n", 3, 2, user_id="u", title="t", message="m",
+                                                           type="application", is_read=False))
+        return await replay("u", "n-s1"), await replay("u", "n-d0")
+
+    from_string, from_date = asyncio.run(scenario())
+    assert from_string == ["n-s2", "n-d0", "n-d1"]
+    assert from_date == ["n-d1"]
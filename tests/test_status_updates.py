@@ -0,0 +1,134 @@
+"""Only the owner of a posting may change the status of its applications, singly or in bulk."""
+import asyncio
+import os
+import sys
+from pathlib import Path
+
+import pytest
+
+BACKEND = Path(__file__).resolve().parent.parent / "backend"
+sys.path[:0] = [str(BACKEND), str(BACKEND / "benchmarks")]
+os.environ.setdefault("MONGO_URL", "mongodb://localhost:27017")
+os.environ.setdefault("DB_NAME", "wallxy_test")
+
+import server  # noqa: E402
+from fake_mongo import FakeDatabase  # noqa: E402
+
+OWNER = server.Principal(id="owner", user_type="employer")
+OTHER_EMPLOYER = server.Principal(id="other", user_type="employer")
+SEEKER = server.Principal(id="seeker", user_type="jobseeker")
+
+
+@pytest.fixture
+def fake_db(monkeypatch):
+    database = FakeDatabase()
+    monkeypatch.setattr(server, "db", database)
+    monkeypatch.setattr(server, "domain_events", server.DomainEventQueue())
+    asyncio.run(server.ensure_indexes(database))
+    return database
+
+
+async def seed(database):
+    """One application on each employer's job, plus one sent before submissions carried the owner."""
+    await database.jobs.insert_many([{"id": "job-owned", "employer_id": "owner", "title": "Owned"},
+                                     {"id": "job-other", "employer_id": "other", "title": "Other"}])
+    owned = await server.create_application(server.JobApplicationCreate(job_id="job-owned"), SEEKER)
+    other = await server.create_application(server.JobApplicationCreate(job_id="job-other"), SEEKER)
+    await database.applications.insert_one({"id": "legacy", "job_id": "job-owned", "applicant_id": "early",
+                                            "status": "pending"})
+    return owned.id, other.id
+
+
+def set_status(application_id, principal, status_name="accepted"):
+    return server.update_application_status(application_id, server.ApplicationUpdate(status=status_name), principal)
+
+
+def status_error(database, principal, target):
+    async def scenario():
+        ids = dict(zip(("owned", "other"), await seed(database)))
+        try:
+            await set_status(ids.get(target, target), principal)
+        except server.HTTPException as error:
+            return error.status_code
+    return asyncio.run(scenario())
+
+
+@pytest.mark.parametrize("principal, target, code", [
+    (SEEKER, "owned", 403),
+    (OTHER_EMPLOYER, "owned", 403),
+    (OWNER, "other", 403),
+    (OTHER_EMPLOYER, "legacy", 403),
+    (OWNER, "missing", 404),
+])
+def test_single_update_is_refused(fake_db, principal, target, code):
+    assert status_error(fake_db, principal, target) == code
+
+
+def test_owner_updates_status_and_posting_counts(fake_db):
+    async def scenario():
+        owned, _ = await seed(fake_db)
+        await set_status(owned, OWNER)
+        job = await fake_db.jobs.find_one({"id": "job-owned"}, {"_id": 0, "status_counts": 1})
+        await set_status("legacy", OWNER, "reviewed")
+        statuses = {doc["id"]: (doc["status"], doc.get("employer_id"))
+                    async for doc in fake_db.applications.find({"job_id": "job-owned"}, {"_id": 0})}
+        return owned, statuses, job
+
+    owned, statuses, job = asyncio.run(scenario())
+    # The legacy application gets its owner stamped on the way
+    assert statuses == {owned: ("accepted", "owner"), "legacy": ("reviewed", "owner")}
+    assert job["status_counts"] == {"pending": 0, "accepted": 1}
+
+
+def test_update_on_a_deleted_job_is_a_404(fake_db):
+    async def scenario():
+        await seed(fake_db)
+        await fake_db.jobs.delete_one({"id": "job-owned"})
+        try:
+            await set_status("legacy", OWNER)
+        except server.HTTPException as error:
+            return error.status_code, error.detail
+
+    assert asyncio.run(scenario()) == (404, "Job not found")
+
+
+def bulk(principal, *changes):
+    update = server.BulkStatusUpdate(updates=[{"id": i, "status": s} for i, s in changes])
+    return server.bulk_update_application_status(update, principal)
+
+
+def test_bulk_update_by_a_job_seeker_is_a_403(fake_db):
+    async def scenario():
+        owned, _ = await seed(fake_db)
+        try:
+            await bulk(SEEKER, (owned, "withdrawn"))
+        except server.HTTPException as error:
+            return error.status_code
+
+    assert asyncio.run(scenario()) == 403
+
+
+def test_bulk_update_skips_other_postings_and_missing_ids(fake_db):
+    async def scenario():
+        owned, other = await seed(fake_db)
+        result = await bulk(OWNER, (owned, "shortlisted"), (other, "rejected"), ("legacy", "rejected"),
+                            ("missing", "rejected"))
+        statuses = {doc["id"]: doc["status"] async for doc in fake_db.applications.find({}, {"_id": 0})}
+        job = await fake_db.jobs.find_one({"id": "job-owned"}, {"_id": 0, "status_counts": 1, "applicants_count": 1})
+        return owned, other, result, statuses, job
+
+    owned, other, result, statuses, job = asyncio.run(scenario())
+    assert (result.matched, result.modified) == (2, 2)
+    assert statuses == {owned: "shortlisted", other: "pending", "legacy": "rejected"}
+    # Rebuilt from the applications themselves, the legacy one included
+    assert job == {"status_counts": {"shortlisted": 1, "rejected": 1}, "applicants_count": 2}
+
+
+def test_bulk_update_of_only_foreign_applications_changes_nothing(fake_db):
+    async def scenario():
+        owned, _ = await seed(fake_db)
+        result = await bulk(OTHER_EMPLOYER, (owned, "rejected"), ("legacy", "rejected"))
+        return result, await fake_db.applications.count_documents({"status": "pending"})
+
+    result, pending = asyncio.run(scenario())
+    assert (result.matched, result.modified) == (0, 0) and pending == 3
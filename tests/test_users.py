@@ -0,0 +1,51 @@
+"""Sign-up and profile updates against the unique email index."""
+import asyncio
+import os
+import sys
+from pathlib import Path
+
+import pytest
+
+BACKEND = Path(__file__).resolve().parent.parent / "backend"
+sys.path[:0] = [str(BACKEND), str(BACKEND / "benchmarks")]
+os.environ.setdefault("MONGO_URL", "mongodb://localhost:27017")
+os.environ.setdefault("DB_NAME", "wallxy_test")
+
+import server  # noqa: E402
+from fake_mongo import FakeDatabase  # noqa: E402
+
+
+@pytest.fixture
+def fake_db(monkeypatch):
+    database = FakeDatabase()
+    monkeypatch.setattr(server, "db", database)
+    asyncio.run(server.ensure_indexes(database))
+    return database
+
+
+def sign_up(email):
+    return server.register(server.UserCreate(email=email, password="secret-password", full_name="A",
+                                             user_type="freelancer"))
+
+
+def test_concurrent_sign_ups_with_one_email_get_a_400(fake_db):
+    async def scenario():
+        return await asyncio.gather(sign_up("a@wallxy-test.com"), sign_up("a@wallxy-test.com"),
+                                    return_exceptions=True)
+
+    results = asyncio.run(scenario())
+    errors = [r for r in results if isinstance(r, Exception)]
+    assert len(errors) == 1
+    assert isinstance(errors[0], server.HTTPException) and errors[0].status_code == 400
+
+
+def test_changing_email_to_a_taken_one_is_a_400(fake_db):
+    async def scenario():
+        first = await sign_up("a@wallxy-test.com")
+        await sign_up("b@wallxy-test.com")
+        principal = server.Principal(id=first.user.id, user_type="freelancer")
+        with pytest.raises(server.HTTPException) as error:
+            await server.update_user(first.user.id, {"email": "b@wallxy-test.com"}, principal)
+        return error.value
+
+    assert asyncio.run(scenario()).status_code == 400